@@ -1,3 +1,17 @@
-from .db_engine import create_async_db_engine
+from .db_engine import (
+    DbSessionFactory,
+    configure_sqlite_connections,
+    create_async_db_engine,
+    create_db_session_factory,
+    get_db_size,
+    vacuum_db,
+)
 
-__all__ = ["create_async_db_engine"]
+__all__ = [
+    "DbSessionFactory",
+    "configure_sqlite_connections",
+    "create_async_db_engine",
+    "create_db_session_factory",
+    "get_db_size",
+    "vacuum_db",
+]
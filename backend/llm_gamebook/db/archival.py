@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from .crud.archive import ArchiveStats, archive_inactive_sessions
+from .db_engine import create_async_db_engine, create_db_session_factory, get_db_size, vacuum_db
+
+
+@dataclass(frozen=True)
+class ArchiveReport:
+    stats: ArchiveStats
+    size_before: int
+    size_after: int
+    """Size of the database file after archiving, and vacuuming if requested."""
+
+    def format(self) -> str:
+        stats = self.stats
+        ratio = stats.json_size / stats.compressed_size if stats.compressed_size else 0.0
+        reclaimed = self.size_before - self.size_after
+        sizes = (
+            f"{_format_size(stats.json_size)} compressed to {_format_size(stats.compressed_size)}"
+        )
+        db_sizes = f"{_format_size(self.size_before)} -> {_format_size(self.size_after)}"
+        return "\n".join([
+            f"Archived {stats.sessions} sessions with {stats.messages} messages",
+            f"Transcripts: {sizes} ({ratio:.1f}x)",
+            f"Database: {db_sizes}, {_format_size(reclaimed)} reclaimed",
+        ])
+
+
+async def archive_database(
+    inactive_for: timedelta, database_path: Path | None = None, *, vacuum: bool = True
+) -> ArchiveReport:
+    """Archive the sessions without messages for `inactive_for` and report the space reclaimed.
+
+    Without vacuuming, the freed pages are reused by new rows but the file doesn't shrink.
+    """
+    async with create_async_db_engine(database_path) as db_engine:
+        size_before = await get_db_size(db_engine)
+        db_sessions = create_db_session_factory(db_engine)
+        async with db_sessions() as db_session:
+            stats = await archive_inactive_sessions(db_session, datetime.now(UTC) - inactive_for)
+        if vacuum and stats.sessions:
+            await vacuum_db(db_engine)
+        size_after = await get_db_size(db_engine)
+
+    return ArchiveReport(stats, size_before, size_after)
+
+
+def _format_size(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MiB"
@@ -0,0 +1,140 @@
+import json
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import cast
+from uuid import UUID
+
+from sqlmodel import col, delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db.models import Message, Part, Session, SessionArchive, Usage
+
+from .message import get_messages
+
+
+@dataclass
+class ArchiveStats:
+    sessions: int = 0
+    messages: int = 0
+    json_size: int = 0
+    """Bytes of the uncompressed transcripts."""
+
+    compressed_size: int = 0
+
+
+async def get_archivable_session_ids(
+    db_session: AsyncDbSession, inactive_since: datetime, limit: int
+) -> Sequence[UUID]:
+    """Sessions with messages, but none since `inactive_since`, that aren't archived yet."""
+    stmt = (
+        select(col(Session.id))
+        .where(
+            col(Session.archived_at).is_(None),
+            col(Session.message_count) > 0,
+            col(Session.last_message_at) < inactive_since,
+        )
+        .order_by(col(Session.last_message_at))
+        .limit(limit)
+    )
+    result = await db_session.exec(stmt)
+    return result.all()
+
+
+async def archive_session(db_session: AsyncDbSession, session_id: UUID) -> SessionArchive | None:
+    """Move the messages of a session into a compressed archive, in a single transaction.
+
+    The session itself stays, with its counters, so it's still listed. The archive keeps the
+    usage totals for the usage reports.
+    """
+    messages = await get_messages(db_session, session_id)
+    if not messages:
+        return None
+
+    transcript = json.dumps(
+        [_dump_message(message) for message in messages], separators=(",", ":")
+    ).encode()
+    usages = [message.usage for message in messages if message.usage]
+    archive = SessionArchive(
+        session_id=session_id,
+        data=zlib.compress(transcript, level=9),
+        message_count=len(messages),
+        json_size=len(transcript),
+        requests=len(usages),
+        input_tokens=sum(usage.input_tokens for usage in usages),
+        output_tokens=sum(usage.output_tokens for usage in usages),
+        cache_write_tokens=sum(usage.cache_write_tokens for usage in usages),
+        cache_read_tokens=sum(usage.cache_read_tokens for usage in usages),
+    )
+    db_session.add(archive)
+    # The parts and usage are deleted by the database, drop the loaded ones too
+    for message in messages:
+        for part in message.parts:
+            db_session.expunge(part)
+        if message.usage:
+            db_session.expunge(message.usage)
+        db_session.expunge(message)
+    await db_session.exec(delete(Message).where(col(Message.session_id) == session_id))
+    await db_session.exec(
+        update(Session).where(col(Session.id) == session_id).values(archived_at=archive.timestamp)
+    )
+    await db_session.commit()
+    return archive
+
+
+async def archive_inactive_sessions(
+    db_session: AsyncDbSession, inactive_since: datetime, batch_size: int = 100
+) -> ArchiveStats:
+    """Archive all sessions without messages since `inactive_since`, a transaction per session."""
+    stats = ArchiveStats()
+    while session_ids := await get_archivable_session_ids(db_session, inactive_since, batch_size):
+        archives = [
+            archive
+            for session_id in session_ids
+            if (archive := await archive_session(db_session, session_id))
+        ]
+        # Stop at sessions counting messages that aren't there, rather than selecting them again
+        if not archives:
+            break
+        for archive in archives:
+            stats.sessions += 1
+            stats.messages += archive.message_count
+            stats.json_size += archive.json_size
+            stats.compressed_size += len(archive.data)
+        # Don't hold on to the compressed transcripts
+        db_session.expunge_all()
+    return stats
+
+
+async def restore_session(db_session: AsyncDbSession, session_id: UUID) -> bool:
+    """Move the messages of an archived session back, returns whether it was archived."""
+    archive = await db_session.get(SessionArchive, session_id)
+    if archive is None:
+        return False
+
+    for data in json.loads(zlib.decompress(archive.data)):
+        db_session.add(_load_message(data))
+    await db_session.delete(archive)
+    await db_session.exec(
+        update(Session).where(col(Session.id) == session_id).values(archived_at=None)
+    )
+    await db_session.commit()
+    return True
+
+
+def _dump_message(message: Message) -> dict[str, object]:
+    return {
+        **message.model_dump(mode="json"),
+        "parts": [part.model_dump(mode="json") for part in message.parts],
+        "usage": message.usage.model_dump(mode="json") if message.usage else None,
+    }
+
+
+def _load_message(data: dict[str, object]) -> Message:
+    parts = cast("list[dict[str, object]]", data.pop("parts"))
+    usage = data.pop("usage")
+    message = Message.model_validate(data)
+    message.parts = [Part.model_validate(part) for part in parts]
+    message.usage = Usage.model_validate(usage) if usage else None
+    return message
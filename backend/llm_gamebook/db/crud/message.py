@@ -1,10 +1,10 @@
 from collections.abc import Iterable, Sequence
 from uuid import UUID
 
-from sqlmodel import asc, desc, func, select
+from sqlmodel import asc, col, desc, func, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
-from llm_gamebook.db.models import Message
+from llm_gamebook.db.models import Message, Session
 
 
 async def get_message_count(db_session: AsyncDbSession, session_id: UUID) -> int:
@@ -14,39 +14,86 @@ async def get_message_count(db_session: AsyncDbSession, session_id: UUID) -> int
     return result.one()
 
 
-async def get_messages(db_session: AsyncDbSession, session_id: UUID) -> Sequence[Message]:
-    stmt = (
-        select(Message)
-        .where(Message.session_id == session_id)
-        .order_by(asc(Message.timestamp).nulls_last())
-    )
+async def get_messages(
+    db_session: AsyncDbSession,
+    session_id: UUID,
+    after_seq: int | None = None,
+    limit: int | None = None,
+) -> Sequence[Message]:
+    """Messages of a session in order, optionally a page of them after a sequence number."""
+    stmt = select(Message).where(Message.session_id == session_id)
+
+    if after_seq is not None:
+        stmt = stmt.where(col(Message.seq) > after_seq)
 
+    stmt = stmt.order_by(asc(Message.seq)).limit(limit)
     result = await db_session.exec(stmt)
     return result.all()
 
 
 async def create_message(db_session: AsyncDbSession, message: Message) -> Message:
     db_session.add(message)
+    await _append_to_sessions(db_session, [message])
     await db_session.commit()
     await db_session.refresh(message)
     return message
 
 
 async def create_messages(db_session: AsyncDbSession, messages: Iterable[Message]) -> None:
+    messages = list(messages)
     db_session.add_all(messages)
+    await _append_to_sessions(db_session, messages)
     await db_session.commit()
 
 
+async def _append_to_sessions(db_session: AsyncDbSession, messages: Sequence[Message]) -> None:
+    """Number new messages and their parts, and add them to the counters of their sessions.
+
+    The sessions are updated in the same transaction. The updated message count is the sequence
+    number of the last new message, as messages are only ever appended.
+    """
+    by_session: dict[UUID, list[Message]] = {}
+    for message in messages:
+        for seq, part in enumerate(message.parts):
+            part.seq = seq
+        # Messages can be added to a session by relationship, before the ID is set
+        session_id = message.session_id or (message.session.id if message.session else None)
+        if session_id is not None:
+            by_session.setdefault(session_id, []).append(message)
+
+    for session_id, new_messages in by_session.items():
+        last_at = max(message.timestamp for message in new_messages)
+        usages = [message.usage for message in new_messages if message.usage]
+        stmt = (
+            update(Session)
+            .where(col(Session.id) == session_id)
+            .values(
+                message_count=Session.message_count + len(new_messages),
+                # Two-argument max() is SQLite's scalar maximum
+                last_message_at=func.max(func.coalesce(Session.last_message_at, last_at), last_at),
+                input_tokens=Session.input_tokens + sum(u.input_tokens for u in usages),
+                output_tokens=Session.output_tokens + sum(u.output_tokens for u in usages),
+            )
+            .returning(col(Session.message_count))
+            # Keep loaded sessions in step with the new counters
+            .execution_options(synchronize_session="fetch")
+        )
+        # Insert the messages after they're numbered
+        with db_session.no_autoflush:
+            result = await db_session.exec(stmt)
+        last_seq = result.scalar_one()
+        for seq, message in enumerate(new_messages, start=last_seq - len(new_messages) + 1):
+            message.seq = seq
+
+
 async def get_latest_message_with_state(
     db_session: AsyncDbSession, session_id: UUID
 ) -> Message | None:
     stmt = (
         select(Message)
-        .where(Message.session_id == session_id)
-        .order_by(desc(Message.timestamp).nulls_last())
+        .where(Message.session_id == session_id, col(Message.state).is_not(None))
+        .order_by(desc(Message.seq))
+        .limit(1)
     )
     result = await db_session.exec(stmt)
-    for msg in result.all():
-        if msg.state is not None:
-            return msg
-    return None
+    return result.first()
@@ -1,12 +1,19 @@
 from collections.abc import Sequence
 from uuid import UUID
 
-from sqlmodel import func, select
+from sqlmodel import col, func, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+from sqlmodel.sql.expression import Select
 
-from llm_gamebook.db.models import ModelConfig
+from llm_gamebook.db.models import ModelConfig, Session
+from llm_gamebook.providers import ModelProvider
 from llm_gamebook.web.schemas.model_config import ModelConfigUpdate
 
+type ModelConfigListRow = tuple[
+    UUID, str, ModelProvider, str, str | None, str | None, int, int, float, float, float, float, int
+]
+"""The model config columns and the total number of model configs."""
+
 
 async def create_model_config(db_session: AsyncDbSession, config: ModelConfig) -> ModelConfig:
     db_session.add(config)
@@ -23,6 +30,39 @@ async def get_model_configs(
     return result.all()
 
 
+async def get_model_config_list(
+    db_session: AsyncDbSession, skip: int = 0, limit: int = 100
+) -> tuple[Sequence[ModelConfigListRow], int]:
+    """A page of model config columns without loading the sessions using them, and the total
+    model config count.
+
+    The count is a window function of the same query, a single round trip.
+    """
+    # select() is only typed up to four columns
+    stmt: Select[ModelConfigListRow] = Select(
+        col(ModelConfig.id),
+        col(ModelConfig.name),
+        col(ModelConfig.provider),
+        col(ModelConfig.model_name),
+        col(ModelConfig.base_url),
+        col(ModelConfig.api_key),
+        col(ModelConfig.context_window),
+        col(ModelConfig.max_tokens),
+        col(ModelConfig.temperature),
+        col(ModelConfig.top_p),
+        col(ModelConfig.presence_penalty),
+        col(ModelConfig.frequency_penalty),
+        func.count().over().label("total"),
+    )
+    result = await db_session.exec(stmt.offset(skip).limit(limit))
+    rows = result.all()
+    if rows:
+        return rows, rows[0][-1]
+
+    # Past the last page there's no row to carry the count
+    return rows, await get_model_config_count(db_session) if skip else 0
+
+
 async def get_model_config_count(db_session: AsyncDbSession) -> int:
     stmt = select(func.count()).select_from(ModelConfig)
     result = await db_session.exec(stmt)
@@ -56,5 +96,11 @@ async def update_model_config(
 async def delete_model_config(db_session: AsyncDbSession, config_id: str) -> None:
     db_config = await db_session.get(ModelConfig, UUID(config_id))
     if db_config:
+        # Sessions using it as their model are nullified by the relationship, not as fallback
+        await db_session.exec(
+            update(Session)
+            .where(col(Session.fallback_config_id) == db_config.id)
+            .values(fallback_config_id=None)
+        )
         await db_session.delete(db_config)
         await db_session.commit()
@@ -1,17 +1,50 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Final
 from uuid import UUID
 
-from sqlalchemy.orm import with_expression
-from sqlmodel import col, desc, func, select
+from sqlalchemy import UnaryExpression
+from sqlmodel import col, delete, desc, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
-
-from llm_gamebook.db.models import Message, ModelConfig, Session
+from sqlmodel.sql.expression import Select
+
+from llm_gamebook.db.models import ModelConfig, Session
+
+type SessionListRow = tuple[
+    UUID,
+    str | None,
+    str,
+    UUID | None,
+    UUID | None,
+    float,
+    datetime,
+    int,
+    datetime | None,
+    int,
+    int,
+    int,
+]
+"""ID, title, project ID, model config IDs, hedge delay, timestamp, message count, last message
+timestamp, token totals and the total number of sessions listed."""
+
+# Most recently played first, the never played ones last. SQLite sorts NULLs last when
+# descending, so this matches the `ix_session_last_activity` index.
+_LAST_ACTIVITY_ORDER: Final[tuple[UnaryExpression[datetime | None], UnaryExpression[datetime]]] = (
+    desc(Session.last_message_at),
+    desc(Session.timestamp),
+)
 
 
 async def create_session(
-    db_session: AsyncDbSession, model_config: ModelConfig, project_id: str, title: str | None = None
+    db_session: AsyncDbSession,
+    model_config: ModelConfig,
+    project_id: str,
+    title: str | None = None,
+    fallback_config: ModelConfig | None = None,
 ) -> Session:
-    session = Session(title=title, project_id=project_id, config=model_config)
+    session = Session(
+        title=title, project_id=project_id, config=model_config, fallback_config=fallback_config
+    )
     db_session.add(session)
     await db_session.commit()
     await db_session.refresh(session)
@@ -21,27 +54,49 @@ async def create_session(
 async def get_sessions(
     db_session: AsyncDbSession, project_id: str | None, skip: int, limit: int
 ) -> Sequence[Session]:
-    stmt = (
-        select(Session)
-        .outerjoin(Message, col(Message.session_id) == Session.id)
-        .group_by(col(Session.id))
-        .order_by(desc(Session.timestamp).nulls_last())
-        .offset(skip)
-        .limit(limit)
-    )
+    stmt = select(Session).order_by(*_LAST_ACTIVITY_ORDER).offset(skip).limit(limit)
 
     if project_id:
         stmt = stmt.where(Session.project_id == project_id)
 
-    stmt = stmt.options(
-        with_expression(
-            Session.message_count,
-            func.count(col(Message.id)),
-        )
+    result = await db_session.exec(stmt)
+    return result.all()
+
+
+async def get_session_list(
+    db_session: AsyncDbSession, project_id: str | None, skip: int, limit: int
+) -> tuple[Sequence[SessionListRow], int]:
+    """A page of session list columns without loading entities, and the total session count.
+
+    The count is a window function of the same query, a single round trip.
+    """
+    # select() is only typed up to four columns
+    stmt: Select[SessionListRow] = Select(
+        col(Session.id),
+        col(Session.title),
+        col(Session.project_id),
+        col(Session.config_id),
+        col(Session.fallback_config_id),
+        col(Session.hedge_after_seconds),
+        col(Session.timestamp),
+        col(Session.message_count),
+        col(Session.last_message_at),
+        col(Session.input_tokens),
+        col(Session.output_tokens),
+        func.count().over().label("total"),
     )
 
+    if project_id:
+        stmt = stmt.where(Session.project_id == project_id)
+
+    stmt = stmt.order_by(*_LAST_ACTIVITY_ORDER).offset(skip).limit(limit)
     result = await db_session.exec(stmt)
-    return result.all()
+    rows = result.all()
+    if rows:
+        return rows, rows[0][-1]
+
+    # Past the last page there's no row to carry the count
+    return rows, await get_session_count(db_session, project_id) if skip else 0
 
 
 async def get_session_count(db_session: AsyncDbSession, project_id: str | None) -> int:
@@ -55,21 +110,18 @@ async def get_session_count(db_session: AsyncDbSession, project_id: str | None)
 
 
 async def get_session(db_session: AsyncDbSession, session_id: UUID) -> Session | None:
-    stmt = (
-        select(Session)
-        .where(Session.id == session_id)
-        .outerjoin(Message, col(Message.session_id) == Session.id)
-        .group_by(col(Session.id))
-        .options(
-            with_expression(
-                Session.message_count,
-                func.count(col(Message.id)),
-            )
-        )
-    )
+    return await db_session.get(Session, session_id)
 
+
+async def get_session_titles(
+    db_session: AsyncDbSession, session_ids: Iterable[UUID]
+) -> Sequence[tuple[UUID, str | None, str]]:
+    """ID, title and project ID of sessions, without loading messages."""
+    stmt = select(col(Session.id), col(Session.title), col(Session.project_id)).where(
+        col(Session.id).in_(list(session_ids))
+    )
     result = await db_session.exec(stmt)
-    return result.one_or_none()
+    return result.all()
 
 
 async def update_session_model_config(
@@ -81,7 +133,67 @@ async def update_session_model_config(
         await db_session.commit()
 
 
-async def delete_session(db_session: AsyncDbSession, session_id: UUID) -> None:
+async def update_session_fallback_config(
+    db_session: AsyncDbSession,
+    session_id: UUID,
+    config_id: UUID | None,
+    hedge_after_seconds: float | None = None,
+) -> None:
     session = await db_session.get(Session, session_id)
-    await db_session.delete(session)
+    if session:
+        session.fallback_config_id = config_id
+        if hedge_after_seconds is not None:
+            session.hedge_after_seconds = hedge_after_seconds
+        await db_session.commit()
+
+
+async def delete_session(db_session: AsyncDbSession, session_id: UUID) -> bool:
+    """Delete a session without loading it, the database cascades to its messages.
+
+    Returns whether the session existed.
+    """
+    stmt = delete(Session).where(col(Session.id) == session_id)
+    result = await db_session.exec(stmt)
     await db_session.commit()
+    return result.rowcount > 0
+
+
+async def purge_sessions(
+    db_session: AsyncDbSession,
+    *,
+    project_id: str | None = None,
+    created_before: datetime | None = None,
+    inactive_since: datetime | None = None,
+    chunk_size: int = 500,
+) -> list[UUID]:
+    """Delete all sessions matching every given filter, returns the IDs of the deleted sessions.
+
+    Sessions are deleted in chunks, each a transaction of its own, so that other writers aren't
+    blocked for the whole purge. Sessions without messages are inactive since their creation.
+    """
+    if project_id is None and created_before is None and inactive_since is None:
+        msg = "At least one filter is required to purge sessions"
+        raise ValueError(msg)
+
+    ids = select(col(Session.id))
+    if project_id is not None:
+        ids = ids.where(Session.project_id == project_id)
+    if created_before is not None:
+        ids = ids.where(col(Session.timestamp) < created_before)
+    if inactive_since is not None:
+        last_activity = func.coalesce(col(Session.last_message_at), col(Session.timestamp))
+        ids = ids.where(last_activity < inactive_since)
+
+    deleted: list[UUID] = []
+    while True:
+        stmt = (
+            delete(Session)
+            .where(col(Session.id).in_(ids.limit(chunk_size).scalar_subquery()))
+            .returning(col(Session.id))
+        )
+        result = await db_session.exec(stmt)
+        chunk = result.scalars().all()
+        await db_session.commit()
+        deleted.extend(chunk)
+        if len(chunk) < chunk_size:
+            return deleted
@@ -0,0 +1,32 @@
+from uuid import UUID
+
+from sqlmodel import col, delete, desc, select
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db.models import Summary
+
+
+async def get_latest_summary(db_session: AsyncDbSession, session_id: UUID) -> Summary | None:
+    stmt = (
+        select(Summary)
+        .where(Summary.session_id == session_id)
+        .order_by(desc(Summary.timestamp))
+        .limit(1)
+    )
+    result = await db_session.exec(stmt)
+    return result.one_or_none()
+
+
+async def create_summary(db_session: AsyncDbSession, summary: Summary) -> Summary:
+    """Store a summary, replacing older summaries of the session."""
+    stmt = delete(Summary).where(col(Summary.session_id) == summary.session_id)
+    await db_session.exec(stmt)
+    db_session.add(summary)
+    await db_session.commit()
+    await db_session.refresh(summary)
+    return summary
+
+
+async def delete_summary(db_session: AsyncDbSession, summary: Summary) -> None:
+    await db_session.delete(summary)
+    await db_session.commit()
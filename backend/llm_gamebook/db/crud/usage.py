@@ -0,0 +1,123 @@
+from uuid import UUID
+
+from sqlalchemy import literal, union_all
+from sqlalchemy.orm import Mapped
+from sqlmodel import col, func
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+from sqlmodel.sql.expression import Select
+
+from llm_gamebook.db.models import Message, ModelConfig, Session, SessionArchive, Usage
+from llm_gamebook.db.models.usage import UsageBase
+from llm_gamebook.providers import ModelProvider
+
+
+class UsageSum(UsageBase):
+    """Usage summed over model requests."""
+
+    requests: int
+
+
+type UsageRow[K] = tuple[K, ModelProvider | None, str | None, UsageSum]
+"""Grouping key, provider and model name of the session's model config, and the summed usage."""
+
+type _UsageSumRow[K] = tuple[K, ModelProvider | None, str | None, int, int, int, int, int]
+
+type _SessionUsageRow = tuple[UUID | None, int, int, int, int, int]
+
+
+async def get_usage_by_session(
+    db_session: AsyncDbSession, project_id: str | None = None, session_id: UUID | None = None
+) -> list[UsageRow[UUID]]:
+    stmt = _sum_usage(col(Session.id))
+
+    if project_id:
+        stmt = stmt.where(Session.project_id == project_id)
+    if session_id:
+        stmt = stmt.where(Session.id == session_id)
+
+    return await _exec_sum(db_session, stmt)
+
+
+async def get_usage_by_project(db_session: AsyncDbSession) -> list[UsageRow[str]]:
+    return await _exec_sum(db_session, _sum_usage(col(Session.project_id)))
+
+
+async def get_usage_by_model_config(db_session: AsyncDbSession) -> list[UsageRow[UUID | None]]:
+    return await _exec_sum(db_session, _sum_usage(col(Session.config_id)))
+
+
+def _sum_usage[K](key: Mapped[K]) -> Select[_UsageSumRow[K]]:
+    """Sum usage in the database, grouped by `key` and model, the model determines the price.
+
+    Archived sessions contribute the usage totals kept with their archive.
+    """
+    # select() is only typed up to four columns
+    usages: Select[_SessionUsageRow] = Select(
+        col(Message.session_id),
+        literal(1).label("requests"),
+        col(Usage.input_tokens),
+        col(Usage.output_tokens),
+        col(Usage.cache_write_tokens),
+        col(Usage.cache_read_tokens),
+    )
+    archived: Select[_SessionUsageRow] = Select(
+        col(SessionArchive.session_id),
+        col(SessionArchive.requests),
+        col(SessionArchive.input_tokens),
+        col(SessionArchive.output_tokens),
+        col(SessionArchive.cache_write_tokens),
+        col(SessionArchive.cache_read_tokens),
+    )
+    usage = union_all(
+        usages.join(Message, col(Message.id) == Usage.message_id),
+        archived.where(col(SessionArchive.requests) > 0),
+    ).subquery()
+    provider = col(ModelConfig.provider)
+    model_name = col(ModelConfig.model_name)
+    stmt: Select[_UsageSumRow[K]] = Select(
+        key,
+        provider,
+        model_name,
+        func.sum(usage.c.requests),
+        func.sum(usage.c.input_tokens),
+        func.sum(usage.c.output_tokens),
+        func.sum(usage.c.cache_write_tokens),
+        func.sum(usage.c.cache_read_tokens),
+    )
+    return (
+        stmt
+        .select_from(usage)
+        .join(Session, col(Session.id) == usage.c.session_id)
+        .outerjoin(ModelConfig, col(ModelConfig.id) == Session.config_id)
+        .group_by(key, provider, model_name)
+    )
+
+
+async def _exec_sum[K](
+    db_session: AsyncDbSession, stmt: Select[_UsageSumRow[K]]
+) -> list[UsageRow[K]]:
+    result = await db_session.exec(stmt)
+    return [
+        (
+            key,
+            provider,
+            model_name,
+            UsageSum(
+                requests=requests,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cache_write_tokens=cache_write_tokens,
+                cache_read_tokens=cache_read_tokens,
+            ),
+        )
+        for (
+            key,
+            provider,
+            model_name,
+            requests,
+            input_tokens,
+            output_tokens,
+            cache_write_tokens,
+            cache_read_tokens,
+        ) in result
+    ]
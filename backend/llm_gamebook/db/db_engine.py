@@ -1,22 +1,42 @@
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from pathlib import Path
+from time import perf_counter
 
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
-from sqlmodel import SQLModel, text
+from sqlalchemy import Connection, event
+from sqlalchemy.engine.interfaces import DBAPIConnection, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
 from llm_gamebook.constants import PROJECT_NAME, USER_DATA_PATH
 from llm_gamebook.logger import logger
+from llm_gamebook.metrics import DB_QUERY_SECONDS
+
+from .migrations import create_or_migrate_schema
 
 log = logger.getChild("database")
 
+type DbSessionFactory = async_sessionmaker[AsyncDbSession]
+"""Opens a database session per unit of work, instead of holding one for a connection."""
+
 
 @asynccontextmanager
-async def create_async_db_engine() -> AsyncIterator[AsyncEngine]:
+async def create_async_db_engine(
+    sqlite_database_path: Path | None = None,
+) -> AsyncIterator[AsyncEngine]:
     # Make sure all models are imported
-    from .models import Message, ModelConfig, Part, Session, Usage  # noqa: F401, PLC0415
+    from .models import (  # noqa: F401, PLC0415
+        Message,
+        ModelConfig,
+        Part,
+        Session,
+        SessionArchive,
+        Summary,
+        Usage,
+    )
 
-    sqlite_file_name = f"{PROJECT_NAME}.db"
-    sqlite_database_path = USER_DATA_PATH / sqlite_file_name
+    if sqlite_database_path is None:
+        sqlite_database_path = USER_DATA_PATH / f"{PROJECT_NAME}.db"
     sqlite_url = f"sqlite+aiosqlite:///{sqlite_database_path}"
 
     log_verb = "Using" if sqlite_database_path.exists() else "Creating"
@@ -24,6 +44,8 @@ async def create_async_db_engine() -> AsyncIterator[AsyncEngine]:
 
     try:
         db_engine = create_async_engine(sqlite_url)
+        configure_sqlite_connections(db_engine)
+        instrument_db_engine(db_engine)
         await _create_db_and_tables(db_engine)
         yield db_engine
     finally:
@@ -31,8 +53,61 @@ async def create_async_db_engine() -> AsyncIterator[AsyncEngine]:
         await db_engine.dispose()
 
 
+def create_db_session_factory(db_engine: AsyncEngine) -> DbSessionFactory:
+    """Loaded objects stay usable after their session is closed, nothing is expired on commit."""
+    return async_sessionmaker(db_engine, class_=AsyncDbSession, expire_on_commit=False)
+
+
 async def _create_db_and_tables(db_engine: AsyncEngine) -> None:
     async with db_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-        # Enable foreign key support in SQLite
-        await conn.execute(text("PRAGMA foreign_keys=ON"))
+        await conn.run_sync(create_or_migrate_schema)
+
+
+def configure_sqlite_connections(db_engine: AsyncEngine) -> None:
+    """Enforce foreign keys on every connection, deletes cascade in the database."""
+    event.listen(db_engine.sync_engine, "connect", _enable_foreign_keys)
+
+
+def _enable_foreign_keys(dbapi_connection: DBAPIConnection, _record: object) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+async def vacuum_db(db_engine: AsyncEngine) -> None:
+    """Rebuild the database file, returning the pages freed by deletes to the file system."""
+    async with db_engine.connect() as conn:
+        # VACUUM can't run inside a transaction
+        autocommit_conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await autocommit_conn.exec_driver_sql("VACUUM")
+    log.info("Vacuumed database")
+
+
+async def get_db_size(db_engine: AsyncEngine) -> int:
+    """Size of the database file in bytes, including free pages."""
+    async with db_engine.connect() as conn:
+        page_count: int = (await conn.exec_driver_sql("PRAGMA page_count")).scalar_one()
+        page_size: int = (await conn.exec_driver_sql("PRAGMA page_size")).scalar_one()
+    return page_count * page_size
+
+
+def instrument_db_engine(db_engine: AsyncEngine) -> None:
+    """Record query latencies in `DB_QUERY_SECONDS`."""
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(db_engine.sync_engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn: Connection, *_: object) -> None:
+    conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, _cursor: object, statement: str, *_: object) -> None:
+    duration = perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_SECONDS.observe(duration, statement.split(maxsplit=1)[0].upper())
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # Failed statements don't reach `after_cursor_execute`, drop their start time
+    if context.connection is not None and (starts := context.connection.info.get("query_start")):
+        starts.pop()
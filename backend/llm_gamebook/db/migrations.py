@@ -0,0 +1,194 @@
+import json
+import zlib
+from collections.abc import Callable, Iterable, Sequence
+from typing import Final
+
+from sqlalchemy import Connection, inspect
+from sqlmodel import SQLModel, text
+
+from llm_gamebook.logger import logger
+
+type Migration = Callable[[Connection], None]
+
+log = logger.getChild("migrations")
+
+
+def backfill_session_counters(conn: Connection) -> None:
+    """Recompute the denormalised message counters of all sessions from their messages."""
+    conn.execute(
+        text("""
+            UPDATE session SET
+                message_count = (
+                    SELECT count(*) FROM message WHERE message.session_id = session.id
+                ),
+                last_message_at = (
+                    SELECT max(message.timestamp) FROM message
+                    WHERE message.session_id = session.id
+                ),
+                input_tokens = (
+                    SELECT coalesce(sum(usage.input_tokens), 0) FROM usage
+                    JOIN message ON message.id = usage.message_id
+                    WHERE message.session_id = session.id
+                ),
+                output_tokens = (
+                    SELECT coalesce(sum(usage.output_tokens), 0) FROM usage
+                    JOIN message ON message.id = usage.message_id
+                    WHERE message.session_id = session.id
+                )
+        """)
+    )
+
+
+def _add_session_counters(conn: Connection) -> None:
+    """Add message count, last activity and token totals to sessions."""
+    for column in (
+        "message_count INTEGER NOT NULL DEFAULT 0",
+        "last_message_at DATETIME",
+        "input_tokens INTEGER NOT NULL DEFAULT 0",
+        "output_tokens INTEGER NOT NULL DEFAULT 0",
+    ):
+        conn.execute(text(f"ALTER TABLE session ADD COLUMN {column}"))
+    conn.execute(
+        text("CREATE INDEX ix_session_last_activity ON session (last_message_at, timestamp)")
+    )
+    backfill_session_counters(conn)
+
+
+def _add_message_seq(conn: Connection) -> None:
+    """Number messages per session and parts per message."""
+    conn.execute(text("ALTER TABLE message ADD COLUMN seq INTEGER"))
+    conn.execute(text("ALTER TABLE part ADD COLUMN seq INTEGER NOT NULL DEFAULT 0"))
+    # Stored messages keep their random IDs, the order is the best guess of the old ordering
+    conn.execute(
+        text("""
+            UPDATE message SET seq = numbered.seq
+            FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY session_id ORDER BY timestamp, rowid
+                ) AS seq
+                FROM message
+            ) AS numbered
+            WHERE message.id = numbered.id
+        """)
+    )
+    conn.execute(
+        text("""
+            UPDATE part SET seq = numbered.seq
+            FROM (
+                SELECT id, row_number() OVER (PARTITION BY message_id ORDER BY rowid) - 1 AS seq
+                FROM part
+            ) AS numbered
+            WHERE part.id = numbered.id
+        """)
+    )
+    conn.execute(text("CREATE UNIQUE INDEX ix_message_session_seq ON message (session_id, seq)"))
+    conn.execute(text("CREATE INDEX ix_part_message_seq ON part (message_id, seq)"))
+
+
+def _add_session_archived_at(conn: Connection) -> None:
+    """Mark archived sessions, the archive table itself is new."""
+    conn.execute(text("ALTER TABLE session ADD COLUMN archived_at DATETIME"))
+
+
+def _add_message_timings(conn: Connection) -> None:
+    """Add time to first token, throughput and timings to messages."""
+    _add_missing_columns(
+        conn, "message", ("ttft_seconds FLOAT", "tokens_per_second FLOAT", "timings JSON")
+    )
+
+
+def _add_session_fallback_config(conn: Connection) -> None:
+    """Add the fallback model config and hedge delay to sessions."""
+    _add_missing_columns(
+        conn,
+        "session",
+        (
+            "fallback_config_id CHAR(32) REFERENCES modelconfig (id)",
+            "hedge_after_seconds FLOAT NOT NULL DEFAULT 5.0",
+        ),
+    )
+
+
+def _add_archive_usage(conn: Connection) -> None:
+    """Sum up the usage of archived sessions, it's no longer in the usage table."""
+    _add_missing_columns(
+        conn,
+        "sessionarchive",
+        (
+            "input_tokens INTEGER NOT NULL DEFAULT 0",
+            "output_tokens INTEGER NOT NULL DEFAULT 0",
+            "cache_write_tokens INTEGER NOT NULL DEFAULT 0",
+            "cache_read_tokens INTEGER NOT NULL DEFAULT 0",
+            "requests INTEGER NOT NULL DEFAULT 0",
+        ),
+    )
+    # The usage of existing archives is only in their transcripts
+    archives = conn.execute(text("SELECT session_id, data FROM sessionarchive")).all()
+    for session_id, data in archives:
+        transcript = json.loads(zlib.decompress(data))
+        usages = [usage for message in transcript if (usage := message["usage"])]
+        conn.execute(
+            text("""
+                UPDATE sessionarchive SET
+                    input_tokens = :input_tokens,
+                    output_tokens = :output_tokens,
+                    cache_write_tokens = :cache_write_tokens,
+                    cache_read_tokens = :cache_read_tokens,
+                    requests = :requests
+                WHERE session_id = :session_id
+            """),
+            {
+                "session_id": session_id,
+                "requests": len(usages),
+                **{
+                    column: sum(usage[column] for usage in usages)
+                    for column in (
+                        "input_tokens",
+                        "output_tokens",
+                        "cache_write_tokens",
+                        "cache_read_tokens",
+                    )
+                },
+            },
+        )
+
+
+MIGRATIONS: Final[Sequence[Migration]] = (
+    _add_session_counters,
+    _add_message_seq,
+    _add_session_archived_at,
+    _add_message_timings,
+    _add_session_fallback_config,
+    _add_archive_usage,
+)
+"""Schema changes of existing databases in order, the SQLite `user_version` counts the applied
+ones."""
+
+
+def create_or_migrate_schema(conn: Connection) -> None:
+    """Create a new database, or add missing tables and apply pending migrations."""
+    is_new = not inspect(conn).has_table("session")
+    SQLModel.metadata.create_all(conn)
+
+    if is_new:
+        _set_version(conn, len(MIGRATIONS))
+        return
+
+    version = conn.execute(text("PRAGMA user_version")).scalar_one()
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        log.info("Migrating database to version %d: %s", number, migration.__doc__)
+        migration(conn)
+        _set_version(conn, number)
+
+
+def _set_version(conn: Connection, version: int) -> None:
+    # PRAGMA doesn't take bound parameters
+    conn.execute(text(f"PRAGMA user_version = {version:d}"))
+
+
+def _add_missing_columns(conn: Connection, table: str, columns: Iterable[str]) -> None:
+    """Add columns by their definition, databases created in between may have some already."""
+    existing = {column["name"] for column in inspect(conn).get_columns(table)}
+    for column in columns:
+        if column.split(maxsplit=1)[0] not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column}"))
@@ -2,6 +2,8 @@ from .message import Message, MessageBase
 from .model_config import ModelConfig, ModelConfigBase
 from .part import Part, PartBase
 from .session import Session, SessionBase
+from .session_archive import SessionArchive
+from .summary import Summary
 from .usage import Usage, UsageBase
 
 __all__ = [
@@ -12,7 +14,9 @@ __all__ = [
     "Part",
     "PartBase",
     "Session",
+    "SessionArchive",
     "SessionBase",
+    "Summary",
     "Usage",
     "UsageBase",
 ]
@@ -1,15 +1,17 @@
 import enum
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Optional, Self
-from uuid import UUID, uuid4
+from uuid import UUID
 
 from pydantic import TypeAdapter
 from pydantic_ai import ModelMessage, ModelRequest, ModelResponse, RequestUsage
 from sqlalchemy import JSON, Column, Enum, String
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
+
+from llm_gamebook.utils import uuid7
 
 from .part import Part
-from .usage import Usage
+from .usage import Usage, UsageBase
 
 if TYPE_CHECKING:
     from .session import Session
@@ -28,6 +30,7 @@ class FinishReason(enum.StrEnum):
     CONTENT_FILTER = "content_filter"
     TOOL_CALL = "tool_call"
     ERROR = "error"
+    CANCELLED = "cancelled"  # not known to Pydantic AI
 
 
 class MessageBase(SQLModel):
@@ -37,18 +40,31 @@ class MessageBase(SQLModel):
 
 
 class Message(MessageBase, table=True):
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    # History is read in sequence order
+    __table_args__ = (Index("ix_message_session_seq", "session_id", "seq", unique=True),)
+
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
     # "Session | None" would not be resolvable by SQLAlchemy
     session: Optional["Session"] = Relationship(back_populates="messages")
     session_id: UUID | None = Field(default=None, foreign_key="session.id", ondelete="CASCADE")
+    # Position in the session, counting from 1, assigned when the message is stored
+    seq: int | None = None
     parts: list[Part] = Relationship(
-        back_populates="message", passive_deletes="all", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="message",
+        passive_deletes="all",
+        sa_relationship_kwargs={"lazy": "selectin", "order_by": "Part.seq"},
     )
     usage: Usage | None = Relationship(
         back_populates="message", passive_deletes="all", sa_relationship_kwargs={"lazy": "selectin"}
     )
     instructions: str | None = Field(default=None, sa_column=Column(String))
     state: dict[str, object] | None = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
+    # Latency of a response: time to first token, throughput and phase durations in seconds
+    ttft_seconds: float | None = None
+    tokens_per_second: float | None = None
+    timings: dict[str, float] | None = Field(
+        default=None, sa_column=Column(JSON(none_as_null=True))
+    )
 
     @classmethod
     def from_model_request(cls, session_id: UUID, request: ModelRequest) -> Self:
@@ -72,11 +88,13 @@ class Message(MessageBase, table=True):
 
     def to_model_message(self) -> ModelMessage:
         msg_dict = self.model_dump(mode="json", exclude={"parts", "usage", "session"})
+        if self.finish_reason == FinishReason.CANCELLED:
+            msg_dict["finish_reason"] = None
         msg = ModelMessageTypeAdapter.validate_python({**msg_dict, "parts": []})
 
         if isinstance(msg, ModelResponse):
             if self.usage:
-                usage = self.usage.model_dump(mode="json", exclude={"message"})
+                usage = self.usage.model_dump(mode="json", include=set(UsageBase.model_fields))
                 msg.usage = RequestUsage(**usage)
             if self.parts:
                 msg.parts = [p.to_model_response_part() for p in self.parts]
@@ -32,5 +32,5 @@ class ModelConfig(ModelConfigBase, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     sessions: list["Session"] = Relationship(
         back_populates="config",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "selectin", "foreign_keys": "[Session.config_id]"},
     )
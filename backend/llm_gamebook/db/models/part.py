@@ -2,7 +2,7 @@ import enum
 import json
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Final, Self
-from uuid import UUID, uuid4
+from uuid import UUID
 
 from pydantic import TypeAdapter
 from pydantic_ai import ModelRequestPart, RetryPromptPart
@@ -15,7 +15,9 @@ from pydantic_ai.messages import (
     UserPromptPart,
 )
 from sqlalchemy import Column, Enum
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
+
+from llm_gamebook.utils import uuid7
 
 if TYPE_CHECKING:
     from llm_gamebook.db.models.message import Message
@@ -65,9 +67,13 @@ class PartBase(SQLModel):
 
 
 class Part(PartBase, table=True):
-    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    __table_args__ = (Index("ix_part_message_seq", "message_id", "seq"),)
+
+    id: UUID = Field(default_factory=uuid7, primary_key=True)
     message: "Message" = Relationship(back_populates="parts")
     message_id: UUID | None = Field(default=None, foreign_key="message.id", ondelete="CASCADE")
+    # Position in the message, assigned when the message is stored
+    seq: int = 0
 
     @classmethod
     def from_model_request_part(cls, request_part: ModelRequestPart) -> Self:
@@ -1,9 +1,8 @@
 from datetime import datetime
-from typing import ClassVar
 from uuid import UUID, uuid4
 
-from sqlalchemy.orm import Mapped, MappedSQLExpression, query_expression
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy.orm import Mapped
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 from .message import Message
 from .model_config import ModelConfig
@@ -14,15 +13,32 @@ class SessionBase(SQLModel):
 
 
 class Session(SessionBase, table=True):
+    # Sessions are listed by last activity
+    __table_args__ = (Index("ix_session_last_activity", "last_message_at", "timestamp"),)
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     title: str | None
     project_id: str
-    config: Mapped[ModelConfig | None] = Relationship(back_populates="sessions")
+    config: Mapped[ModelConfig | None] = Relationship(
+        back_populates="sessions",
+        sa_relationship_kwargs={"foreign_keys": "[Session.config_id]"},
+    )
     config_id: UUID | None = Field(default=None, foreign_key="modelconfig.id")
+    fallback_config: Mapped[ModelConfig | None] = Relationship(
+        sa_relationship_kwargs={"foreign_keys": "[Session.fallback_config_id]"},
+    )
+    fallback_config_id: UUID | None = Field(default=None, foreign_key="modelconfig.id")
+    hedge_after_seconds: float = Field(default=5.0, gt=0)
     messages: list[Message] = Relationship(
         back_populates="session",
         passive_deletes="all",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "selectin", "order_by": "Message.seq"},
     )
 
-    message_count: ClassVar[MappedSQLExpression[int]] = query_expression()
+    # Denormalised from the messages, kept up to date when messages are stored
+    message_count: int = 0
+    last_message_at: datetime | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    # Set while the messages are moved to a `SessionArchive`
+    archived_at: datetime | None = None
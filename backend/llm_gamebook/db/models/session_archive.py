@@ -0,0 +1,23 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import Field
+
+from .usage import UsageBase
+
+
+class SessionArchive(UsageBase, table=True):
+    """Transcript of an archived session, moved out of the message, part and usage tables.
+
+    The usage of the archived messages is kept summed up, so it's still reported.
+    """
+
+    session_id: UUID = Field(primary_key=True, foreign_key="session.id", ondelete="CASCADE")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    # zlib compressed JSON of the messages with their parts and usage
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    message_count: int
+    json_size: int
+    requests: int = 0
+    """Number of summed up usages, one per model request."""
@@ -0,0 +1,18 @@
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import Column, Text
+from sqlmodel import Field, SQLModel
+
+
+class Summary(SQLModel, table=True):
+    """Rolling summary of the oldest story turns of a session."""
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    session_id: UUID = Field(foreign_key="session.id", ondelete="CASCADE", index=True)
+    content: str = Field(sa_column=Column(Text, nullable=False))
+    # The summarised span of the message history, used to detect stale summaries
+    start_message_id: UUID
+    end_message_id: UUID
+    message_count: int
@@ -1,4 +1,5 @@
+from ._model_factory import create_recording_model_factory
 from .engine import StoryEngine
 from .manager import EngineManager
 
-__all__ = ["EngineManager", "StoryEngine"]
+__all__ = ["EngineManager", "StoryEngine", "create_recording_model_factory"]
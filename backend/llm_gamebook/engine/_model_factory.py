@@ -1,25 +1,18 @@
 import json
+from collections.abc import Callable
+from pathlib import Path
 
 import httpx
 from pydantic_ai.models import Model
-from pydantic_ai.models.anthropic import AnthropicModel
-from pydantic_ai.models.google import GoogleModel
-from pydantic_ai.models.mistral import MistralModel
-from pydantic_ai.models.openai import OpenAIChatModel
-from pydantic_ai.models.openrouter import OpenRouterModel
-from pydantic_ai.models.xai import XaiModel
-from pydantic_ai.providers.anthropic import AnthropicProvider
-from pydantic_ai.providers.deepseek import DeepSeekProvider
-from pydantic_ai.providers.google import GoogleProvider
-from pydantic_ai.providers.mistral import MistralProvider
-from pydantic_ai.providers.ollama import OllamaProvider
-from pydantic_ai.providers.openai import OpenAIProvider
-from pydantic_ai.providers.openrouter import OpenRouterProvider
-from pydantic_ai.providers.xai import XaiProvider
 
 from llm_gamebook.logger import logger
 from llm_gamebook.providers import ModelProvider
 
+from .recording import RecordingModel, ReplayModel
+
+type ModelFactory = Callable[[str, ModelProvider, str | None, str | None], Model]
+"""Creates a model from `(model_name, provider, base_url, api_key)`."""
+
 
 def _get_logging_http_client(timeout: float = 10.0, connect: float = 5.0) -> httpx.AsyncClient:
     async def log_request(request: httpx.Request) -> None:
@@ -49,48 +42,112 @@ def create_model_from_db_config(
     http_client = _get_logging_http_client()
     model: Model
 
+    # Provider SDKs are imported on first use, most of them are slow to import and only one or
+    # two are used by any installation.
     match provider:
         case ModelProvider.ANTHROPIC:
-            an_prov = AnthropicProvider(base_url=base_url, api_key=api_key, http_client=http_client)
-            model = AnthropicModel(model_name, provider=an_prov)
+            model = _create_anthropic_model(model_name, base_url, api_key, http_client)
 
         case ModelProvider.DEEPSEEK:
+            from pydantic_ai.models.openai import OpenAIChatModel  # noqa: PLC0415
+            from pydantic_ai.providers.deepseek import DeepSeekProvider  # noqa: PLC0415
+
             ds_prov = DeepSeekProvider(api_key=api_key, http_client=http_client)
             model = OpenAIChatModel(model_name, provider=ds_prov)
 
         case ModelProvider.GOOGLE:
+            from pydantic_ai.models.google import GoogleModel  # noqa: PLC0415
+            from pydantic_ai.providers.google import GoogleProvider  # noqa: PLC0415
+
             goog_prov = GoogleProvider(base_url=base_url, api_key=api_key, http_client=http_client)
             model = GoogleModel(model_name, provider=goog_prov)
 
         case ModelProvider.MISTRAL:
+            from pydantic_ai.models.mistral import MistralModel  # noqa: PLC0415
+            from pydantic_ai.providers.mistral import MistralProvider  # noqa: PLC0415
+
             mis_prov = MistralProvider(api_key=api_key, http_client=http_client)
             model = MistralModel(model_name, provider=mis_prov)
 
         case ModelProvider.OLLAMA:
+            from pydantic_ai.models.openai import OpenAIChatModel  # noqa: PLC0415
+            from pydantic_ai.providers.ollama import OllamaProvider  # noqa: PLC0415
+
             ollama_prov = OllamaProvider(base_url, api_key, http_client=http_client)
             model = OpenAIChatModel(model_name, provider=ollama_prov)
 
         case ModelProvider.OPENAI_COMPATIBLE:
+            from pydantic_ai.models.openai import OpenAIChatModel  # noqa: PLC0415
+            from pydantic_ai.providers.openai import OpenAIProvider  # noqa: PLC0415
+
             openai_prov = OpenAIProvider(base_url, api_key, http_client=http_client)
             model = OpenAIChatModel(model_name, provider=openai_prov)
 
         case ModelProvider.OPENAI:
+            from pydantic_ai.models.openai import OpenAIChatModel  # noqa: PLC0415
+            from pydantic_ai.providers.openai import OpenAIProvider  # noqa: PLC0415
+
             openai_prov = OpenAIProvider(api_key, http_client=http_client)
             model = OpenAIChatModel(model_name, provider=openai_prov)
 
         case ModelProvider.OPENROUTER:
+            from pydantic_ai.models.openrouter import OpenRouterModel  # noqa: PLC0415
+            from pydantic_ai.providers.openrouter import OpenRouterProvider  # noqa: PLC0415
+
             or_prov = OpenRouterProvider(api_key=api_key, http_client=http_client)
             model = OpenRouterModel(model_name, provider=or_prov)
 
+        case ModelProvider.REPLAY:
+            model = ReplayModel.from_url(base_url or "", model_name)
+
         case ModelProvider.XAI:
-            if not api_key:
-                msg = "x.AI needs API key"
-                raise ValueError(msg)
-            xai_prov = XaiProvider(api_key=api_key)
-            model = XaiModel(model_name, provider=xai_prov)
+            model = _create_xai_model(model_name, api_key)
 
         case _:
             msg = f"Unsupported provider: {provider}"
             raise ValueError(msg)
 
     return model
+
+
+def _create_anthropic_model(
+    model_name: str, base_url: str | None, api_key: str | None, http_client: httpx.AsyncClient
+) -> Model:
+    from pydantic_ai.models.anthropic import (  # noqa: PLC0415
+        AnthropicModel,
+        AnthropicModelSettings,
+    )
+    from pydantic_ai.providers.anthropic import AnthropicProvider  # noqa: PLC0415
+
+    provider = AnthropicProvider(base_url=base_url, api_key=api_key, http_client=http_client)
+    # Mark tools, instructions and history as cacheable. Other providers cache
+    # matching prompt prefixes automatically.
+    settings = AnthropicModelSettings(
+        anthropic_cache_tool_definitions=True,
+        anthropic_cache_instructions=True,
+        anthropic_cache_messages=True,
+    )
+    return AnthropicModel(model_name, provider=provider, settings=settings)
+
+
+def _create_xai_model(model_name: str, api_key: str | None) -> Model:
+    if not api_key:
+        msg = "x.AI needs API key"
+        raise ValueError(msg)
+
+    from pydantic_ai.models.xai import XaiModel  # noqa: PLC0415
+    from pydantic_ai.providers.xai import XaiProvider  # noqa: PLC0415
+
+    return XaiModel(model_name, provider=XaiProvider(api_key=api_key))
+
+
+def create_recording_model_factory(path: Path) -> ModelFactory:
+    """Model factory recording all requests and responses to `path`."""
+
+    def create_model(
+        model_name: str, provider: ModelProvider, base_url: str | None, api_key: str | None
+    ) -> Model:
+        model = create_model_from_db_config(model_name, provider, base_url, api_key)
+        return model if isinstance(model, ReplayModel) else RecordingModel(model, path)
+
+    return create_model
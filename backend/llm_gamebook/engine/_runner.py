@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import Iterable, Sequence
 from time import time
 from typing import assert_never
@@ -5,7 +6,8 @@ from uuid import UUID
 
 import pydantic_ai as pai
 
-from llm_gamebook.db.models import Message, Part
+from llm_gamebook.db.models import Message, Part, Usage
+from llm_gamebook.db.models.message import FinishReason
 from llm_gamebook.db.models.part import PartKind
 from llm_gamebook.logger import logger
 from llm_gamebook.message_bus import MessageBus
@@ -20,6 +22,7 @@ from .message import (
     ToolArgsDelta,
     ToolNameDelta,
 )
+from .timing import Timeline, get_tokens_per_second
 
 type Run = pai.AgentRun[StoryContext, str]
 type Agent = pai.Agent[StoryContext]
@@ -27,10 +30,13 @@ type ModelRequestNode = pai.ModelRequestNode[StoryContext, str]
 
 
 class _ModelRequestHandler:
-    def __init__(self, session_id: UUID, bus: MessageBus, debounce: float) -> None:
+    def __init__(
+        self, session_id: UUID, bus: MessageBus, debounce: float, timeline: Timeline
+    ) -> None:
         self._session_id = session_id
         self._bus = bus
         self._debounce = debounce
+        self._timeline = timeline
 
         self._log = logger.getChild(f"stream-runner.model-request-handler({session_id})")
 
@@ -48,19 +54,50 @@ class _ModelRequestHandler:
     async def handle(self, node: ModelRequestNode, run: Run, context: StoryContext) -> Message:
         req_message = Message.from_model_request(self._session_id, node.request)
         self._bus.publish(StreamMessageMessage(self._session_id, req_message))
+        start = self._timeline.elapsed()
+        first_event: float | None = None
 
         async with node.stream(run.ctx) as req_stream:
             self._resp_msg = Message.from_model_response(self._session_id, req_stream.response)
             self._bus.publish(StreamMessageMessage(self._session_id, self._resp_msg))
 
             async for event in req_stream:
+                if first_event is None:
+                    first_event = self._timeline.elapsed()
+                    self._timeline.mark("first_token")
                 self._handle_request_stream(event)
 
+            # Usage of this response only, the run usage would count earlier tool-call
+            # responses again once the per-message totals are summed up
+            usage = req_stream.response.usage
+            self._set_timing(start, first_event, usage.output_tokens)
+            self._resp_msg.usage = Usage.from_request_usage(usage)
+            self._log.debug(
+                "Usage: input=%d (cache read=%d, write=%d) output=%d",
+                usage.input_tokens,
+                usage.cache_read_tokens,
+                usage.cache_write_tokens,
+                usage.output_tokens,
+            )
+
         if not context.session_state.is_empty():
             self._resp_msg.state = context.session_state.data.model_dump()
 
         return self._resp_msg
 
+    def _set_timing(self, start: float, first_event: float | None, output_tokens: int) -> None:
+        assert self._resp_msg is not None
+
+        end = self._timeline.elapsed()
+        stream = end - first_event if first_event is not None else 0.0
+        self._timeline.add("model_request", end - start)
+        self._timeline.add("stream", stream)
+
+        if first_event is not None:
+            self._resp_msg.ttft_seconds = first_event - start
+        self._resp_msg.tokens_per_second = get_tokens_per_second(output_tokens, stream)
+        self._resp_msg.timings = {"model_request": end - start, "stream": stream}
+
     def _handle_request_stream(self, event: pai.ModelResponseStreamEvent) -> None:
         if isinstance(event, pai.PartStartEvent):
             self._log.debug("%s", event)
@@ -127,25 +164,34 @@ class _ModelRequestHandler:
         assert self._part is not None
 
         if isinstance(event.part, pai.TextPart | pai.ThinkingPart | pai.ToolCallPart):
-            if isinstance(event.part, pai.TextPart):
-                self._content += self._content_delta
-                self._part.content = self._content
+            self._finish_part()
+            self._part = None
+
+    def _finish_part(self) -> None:
+        assert self._resp_msg is not None
+        assert self._part is not None
 
-            elif isinstance(event.part, pai.ThinkingPart):
-                self._content += self._content_delta
-                self._part.content = self._content
-                self._part.duration_seconds = int(time() - self._part.timestamp.timestamp())
+        if self._part.kind == PartKind.TEXT:
+            self._content += self._content_delta
+            self._part.content = self._content
 
-            elif isinstance(event.part, pai.ToolCallPart):
-                self._args += self._args_delta
-                self._part.args = self._args
-                self._tool_name += self._tool_name_delta
-                self._part.tool_name = self._tool_name
+        elif self._part.kind == PartKind.THINKING:
+            self._content += self._content_delta
+            self._part.content = self._content
+            self._part.duration_seconds = int(time() - self._part.timestamp.timestamp())
+
+        elif self._part.kind == PartKind.TOOL_CALL:
+            self._args += self._args_delta
+            self._part.args = self._args
+            self._tool_name += self._tool_name_delta
+            self._part.tool_name = self._tool_name
 
+        # Setting `Part.message` may have added it already
+        if all(part is not self._part for part in self._resp_msg.parts):
             self._resp_msg.parts.append(self._part)
 
-            # Make sure last delta is sent
-            self._publish_delta()
+        # Make sure last delta is sent
+        self._publish_delta()
 
     def _drain_delta(self, event_delta: pai.ModelResponsePartDelta) -> None:
         if isinstance(event_delta, pai.TextPartDelta | pai.ThinkingPartDelta):
@@ -183,6 +229,18 @@ class _ModelRequestHandler:
             )
             self._bus.publish(delta_msg)
 
+    def cancel(self) -> Message | None:
+        """Finish the partially streamed response after the run was cancelled."""
+        if self._resp_msg is None:
+            return None
+
+        # Flush the pending deltas into the part that was still streaming
+        if self._part is not None:
+            self._finish_part()
+
+        self._resp_msg.finish_reason = FinishReason.CANCELLED
+        return self._resp_msg
+
     def reset(self) -> None:
         self._reset_part()
         self._resp_msg = None
@@ -199,11 +257,19 @@ class _ModelRequestHandler:
 
 
 class StreamRunner:
-    def __init__(self, agent: Agent, session_id: UUID, bus: MessageBus, debounce: float) -> None:
+    def __init__(
+        self,
+        agent: Agent,
+        session_id: UUID,
+        bus: MessageBus,
+        debounce: float,
+        timeline: Timeline | None = None,
+    ) -> None:
         self._agent = agent
         self._session_id = session_id
         self._bus = bus
         self._debounce = debounce
+        self._timeline = timeline or Timeline()
 
         self._messages: list[Message] = []
 
@@ -212,9 +278,32 @@ class StreamRunner:
     async def run(
         self, msg_history: Sequence[pai.ModelMessage], context: StoryContext
     ) -> Iterable[Message]:
-        handler = _ModelRequestHandler(self._session_id, self._bus, self._debounce)
+        handler = _ModelRequestHandler(self._session_id, self._bus, self._debounce, self._timeline)
 
         # Run agent
+        try:
+            await self._run_agent(handler, msg_history, context)
+        except asyncio.CancelledError:
+            # Leaving the agent run closes the upstream stream, keep what we got so far
+            partial = handler.cancel()
+            if partial is not None and all(msg is not partial for msg in self._messages):
+                self._messages.append(partial)
+            raise
+
+        # Store messages
+        return self._messages
+
+    @property
+    def messages(self) -> Sequence[Message]:
+        """Response messages streamed so far, including a cancelled partial response."""
+        return self._messages
+
+    async def _run_agent(
+        self,
+        handler: _ModelRequestHandler,
+        msg_history: Sequence[pai.ModelMessage],
+        context: StoryContext,
+    ) -> None:
         async with self._agent.iter(message_history=msg_history, deps=context) as run:
             async for node in run:
                 if pai.Agent.is_user_prompt_node(node):
@@ -228,14 +317,20 @@ class StreamRunner:
 
                 elif pai.Agent.is_call_tools_node(node):
                     self._log.debug("CallToolsNode: %s", node.model_response)
+                    start = self._timeline.elapsed()
                     await self._handle_call_tools_node(node, run)
+                    self._add_tools_timing(self._timeline.elapsed() - start)
 
                 elif pai.Agent.is_end_node(node):
                     self._log.debug("End: %s", run.result)
                     break
 
-        # Store messages
-        return self._messages
+    def _add_tools_timing(self, seconds: float) -> None:
+        """Tool calls are attributed to the response that requested them."""
+        self._timeline.add("tools", seconds)
+        if self._messages:
+            message = self._messages[-1]
+            message.timings = {**(message.timings or {}), "tools": seconds}
 
     async def _handle_call_tools_node(
         self, node: pai.CallToolsNode[StoryContext, str], run: Run
@@ -0,0 +1,84 @@
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import Discriminator
+from pydantic_ai import (
+    ModelResponseStreamEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+    TextPartDelta,
+    ThinkingPartDelta,
+    ToolCallPartDelta,
+)
+from pydantic_ai.models import ModelRequestParameters, StreamedResponse
+
+type StreamEvent = Annotated[PartStartEvent | PartDeltaEvent, Discriminator("event_kind")]
+
+
+class PartEventStreamedResponse(StreamedResponse):
+    """Rebuilds a response from `PartStartEvent` and `PartDeltaEvent`s."""
+
+    def _apply(self, event: StreamEvent) -> Iterator[ModelResponseStreamEvent]:
+        if isinstance(event, PartStartEvent):
+            yield self._parts_manager.handle_part(vendor_part_id=event.index, part=event.part)
+
+        elif isinstance(event.delta, TextPartDelta):
+            yield from self._parts_manager.handle_text_delta(
+                vendor_part_id=event.index, content=event.delta.content_delta
+            )
+
+        elif isinstance(event.delta, ThinkingPartDelta):
+            yield from self._parts_manager.handle_thinking_delta(
+                vendor_part_id=event.index,
+                content=event.delta.content_delta,
+                signature=event.delta.signature_delta,
+            )
+
+        elif isinstance(event.delta, ToolCallPartDelta):
+            maybe_event = self._parts_manager.handle_tool_call_delta(
+                vendor_part_id=event.index,
+                tool_name=event.delta.tool_name_delta,
+                args=event.delta.args_delta,
+                tool_call_id=event.delta.tool_call_id,
+            )
+            if maybe_event is not None:
+                yield maybe_event
+
+
+class WrappedStreamedResponse(PartEventStreamedResponse):
+    """Re-streams the part events of another response, e.g. to observe or delay them."""
+
+    def __init__(
+        self, model_request_parameters: ModelRequestParameters, wrapped: StreamedResponse
+    ) -> None:
+        super().__init__(model_request_parameters)
+        self._wrapped = wrapped
+
+    def _forward(self, event: ModelResponseStreamEvent) -> Iterator[ModelResponseStreamEvent]:
+        # Final result and part end events are emitted again by our own iterator
+        if isinstance(event, PartStartEvent | PartDeltaEvent):
+            yield from self._apply(event)
+        self._usage = self._wrapped.usage()
+
+    def _finish(self) -> None:
+        self._usage = self._wrapped.usage()
+        self.provider_response_id = self._wrapped.provider_response_id
+        self.provider_details = self._wrapped.provider_details
+        self.finish_reason = self._wrapped.finish_reason
+
+    @property
+    def model_name(self) -> str:
+        return self._wrapped.model_name
+
+    @property
+    def provider_name(self) -> str | None:
+        return self._wrapped.provider_name
+
+    @property
+    def provider_url(self) -> str | None:
+        return self._wrapped.provider_url
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._wrapped.timestamp
@@ -0,0 +1,121 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
+from llm_gamebook.logger import logger
+
+type Generate = Callable[[], Awaitable[None]]
+
+
+class GenerationCoordinator:
+    """Runs at most one response generation per session at a time.
+
+    Submissions are keyed by request ID. Duplicate submissions of the same request (e.g. one
+    per connected viewer) share a single run. Requests arriving while a generation is running
+    are coalesced into one follow-up run, which picks them all up from the message history.
+
+    A running generation can be cancelled, its waiters return normally and a queued follow-up
+    run still starts.
+    """
+
+    def __init__(self, session_id: UUID, history_size: int = 32) -> None:
+        self._log = logger.getChild(f"coordinator({session_id})")
+        self._runs: dict[UUID, asyncio.Future[None]] = {}
+        self._finished: deque[UUID] = deque(maxlen=history_size)
+        self._task: asyncio.Task[None] | None = None
+        self._generation: asyncio.Future[None] | None = None
+        self._queued: tuple[asyncio.Future[None], Generate] | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def submit(self, request_id: UUID, generate: Generate) -> None:
+        """Generate a response for `request_id` and wait until it's done."""
+        if request_id in self._finished:
+            self._log.debug("Request %s already answered, ignoring", request_id)
+            return
+
+        if (future := self._runs.get(request_id)) is None:
+            future = self._schedule(generate)
+            self._runs[request_id] = future
+        else:
+            self._log.debug("Request %s already scheduled, joining", request_id)
+
+        await asyncio.shield(future)
+
+    def cancel(self) -> bool:
+        """Cancel the running generation, returns `False` if there is none."""
+        if self._generation is None or self._generation.done():
+            return False
+
+        self._log.info("Cancelling generation")
+        self._generation.cancel()
+        return True
+
+    def _schedule(self, generate: Generate) -> asyncio.Future[None]:
+        loop = asyncio.get_running_loop()
+
+        if not self.is_running:
+            future = loop.create_future()
+            self._task = asyncio.create_task(self._run(future, generate))
+            return future
+
+        if self._queued is None:
+            self._log.debug("Generation running, queueing follow-up run")
+            self._queued = (loop.create_future(), generate)
+        else:
+            self._log.debug("Generation running, coalescing into queued run")
+
+        return self._queued[0]
+
+    async def _run(self, future: asyncio.Future[None], generate: Generate) -> None:
+        while True:
+            self._generation = asyncio.ensure_future(generate())
+            try:
+                await self._generation
+            except asyncio.CancelledError:
+                if not self._is_cancelled_generation():
+                    self._cancel_pending(future)
+                    raise
+                future.set_result(None)
+            except Exception as err:  # noqa: BLE001
+                future.set_exception(err)
+                future.exception()  # mark as retrieved, waiters may be gone
+            else:
+                future.set_result(None)
+            finally:
+                self._generation = None
+
+            self._finish(future)
+
+            if self._queued is None:
+                return
+            future, generate = self._queued
+            self._queued = None
+
+    def _is_cancelled_generation(self) -> bool:
+        """Whether only the generation was cancelled, not the run itself."""
+        task = asyncio.current_task()
+        if task is None or task.cancelling():
+            return False
+        return self._generation is not None and self._generation.cancelled()
+
+    def _finish(self, future: asyncio.Future[None]) -> None:
+        for request_id, run in list(self._runs.items()):
+            if run is future:
+                del self._runs[request_id]
+                self._finished.append(request_id)
+
+    def _cancel_pending(self, future: asyncio.Future[None]) -> None:
+        futures = [future]
+        if self._queued is not None:
+            futures.append(self._queued[0])
+            self._queued = None
+
+        for fut in futures:
+            fut.cancel()
+            for request_id, run in list(self._runs.items()):
+                if run is fut:
+                    del self._runs[request_id]
@@ -1,6 +1,7 @@
+import asyncio
 import logging
 import random
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from contextlib import suppress
 from uuid import UUID
 
@@ -17,16 +18,29 @@ from pydantic_ai import (
 from pydantic_ai.models import Model
 from pydantic_ai.settings import ModelSettings
 from pydantic_ai.tools import ToolDefinition
-from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
+from llm_gamebook.db import DbSessionFactory
 from llm_gamebook.db.crud.message import create_messages
+from llm_gamebook.db.models import Message
 from llm_gamebook.logger import logger
 from llm_gamebook.message_bus import MessageBus
+from llm_gamebook.metrics import GENERATION_SECONDS, GENERATIONS, TTFT_SECONDS
 from llm_gamebook.story.context import StoryContext
 
 from ._runner import StreamRunner
-from .message import ResponseErrorMessage, ResponseStartedMessage, ResponseStoppedMessage
+from .coordinator import GenerationCoordinator
+from .history import DEFAULT_HISTORY_FRACTION, HistoryWindow
+from .message import (
+    HistoryWindowMessage,
+    ResponseCancelledMessage,
+    ResponseErrorMessage,
+    ResponseStartedMessage,
+    ResponseStoppedMessage,
+    ResponseTimingMessage,
+)
 from .session_adapter import SessionAdapter
+from .summarizer import HistorySummarizer
+from .timing import Timeline, get_tokens_per_second
 
 
 class StoryEngine:
@@ -37,19 +51,41 @@ class StoryEngine:
         context: StoryContext,
         bus: MessageBus,
         stream_debounce: float = 0.5,
+        context_window: int | None = None,
     ) -> None:
         self._context = context
         self._session_adapter = SessionAdapter(session_id, context, bus)
+        self._summarizer = HistorySummarizer(self._session_adapter)
         self._bus = bus
         self._log = logger.getChild(f"engine({session_id})")
         self._stream_debounce = stream_debounce
+        self._coordinator = GenerationCoordinator(session_id)
+        self._context_window = context_window
+        self.history_fraction = DEFAULT_HISTORY_FRACTION  # context window share for history
+        self._timeline = Timeline()
+        self._model: Model | None = None
         self._agent: Agent[StoryContext, str] | None
         if model:
-            self.set_model(model)
+            self.set_model(model, context_window)
+
+    async def request_response(self, db_sessions: DbSessionFactory, request_id: UUID) -> None:
+        """Generate a response to a request, at most one generation per session at a time."""
+        await self._coordinator.submit(request_id, lambda: self.generate_response(db_sessions))
+
+    def cancel_response(self) -> bool:
+        """Cancel the response in progress, returns `False` if there is none."""
+        return self._coordinator.cancel()
 
-    async def generate_response(self, db_session: AsyncDbSession) -> None:
+    async def generate_response(self, db_sessions: DbSessionFactory) -> None:
+        """Stream a response and store it.
+
+        Database sessions are only held while loading the history and storing the response, not
+        while the model is streaming.
+        """
         self._log.info("Generating new response")
         self._bus.publish(ResponseStartedMessage(self._session_adapter.session_id))
+        runner: StreamRunner | None = None
+        self._timeline = timeline = Timeline()
 
         try:
             if not self._agent:
@@ -59,19 +95,20 @@ class StoryEngine:
                 self._bus.publish(ResponseErrorMessage(self._session_adapter.session_id, err))
                 raise err
 
-            msg_history = [
-                msg async for msg in self._session_adapter.get_message_history(db_session)
-            ]
-
-            if self._log.level <= logging.DEBUG:
-                self._log_messages(msg_history)
+            window = await self._get_history_window(db_sessions)
 
             runner = StreamRunner(
-                self._agent, self._session_adapter.session_id, self._bus, self._stream_debounce
+                self._agent,
+                self._session_adapter.session_id,
+                self._bus,
+                self._stream_debounce,
+                timeline,
             )
 
-            new_messages = await runner.run(msg_history, self._context)
-            await create_messages(db_session, new_messages)
+            with timeline.span("agent_run"):
+                new_messages = await runner.run(window.messages, self._context)
+            with timeline.span("commit"):
+                await self._save_messages(db_sessions, new_messages)
 
         except (httpx.RequestError, OpenAIError, AgentRunError, ModelAPIError) as err:
             self._log.exception("Request failed. The exception was:")
@@ -81,9 +118,76 @@ class StoryEngine:
                         message = err.body["message"]
                 self._log.error("The error message:\n%s", message)
             self._bus.publish(ResponseErrorMessage(self._session_adapter.session_id, err))
+            GENERATIONS.inc("error")
+        except asyncio.CancelledError:
+            self._log.info("Response cancelled")
+            GENERATIONS.inc("cancelled")
+            if runner and runner.messages:
+                # Persist the partial response
+                await self._save_messages(db_sessions, runner.messages)
+            self._bus.publish(ResponseCancelledMessage(self._session_adapter.session_id))
+            raise
+        else:
+            GENERATIONS.inc("ok")
+            self._publish_timing(timeline, new_messages)
+
+            # Including the new turn
+            if self._summarizer.is_due(window.turns + 1):
+                self._summarizer.schedule(db_sessions)
         finally:
+            GENERATION_SECONDS.observe(timeline.elapsed())
             self._bus.publish(ResponseStoppedMessage(self._session_adapter.session_id))
 
+    async def _get_history_window(self, db_sessions: DbSessionFactory) -> HistoryWindow:
+        budget = int(self._context_window * self.history_fraction) if self._context_window else None
+        with self._timeline.span("history"):
+            async with db_sessions() as db_session:
+                window = await self._session_adapter.get_history_window(db_session, budget)
+
+        if self._log.level <= logging.DEBUG:
+            self._log_messages(window.messages)
+
+        if window.trimmed_messages:
+            self._log.info(
+                "Trimmed %d messages (~%d tokens) from history, sending ~%d tokens",
+                window.trimmed_messages,
+                window.trimmed_tokens,
+                window.tokens,
+            )
+        self._bus.publish(
+            HistoryWindowMessage(
+                self._session_adapter.session_id,
+                window.tokens,
+                window.trimmed_tokens,
+                window.trimmed_messages,
+            )
+        )
+        return window
+
+    @staticmethod
+    async def _save_messages(db_sessions: DbSessionFactory, messages: Iterable[Message]) -> None:
+        async with db_sessions() as db_session:
+            await create_messages(db_session, messages)
+
+    def _publish_timing(self, timeline: Timeline, messages: Iterable[Message]) -> None:
+        output_tokens = sum(msg.usage.output_tokens for msg in messages if msg.usage)
+        spans = {**timeline.spans, "total": timeline.elapsed()}
+        message = ResponseTimingMessage(
+            self._session_adapter.session_id,
+            ttft_seconds=timeline.get_mark("first_token"),
+            tokens_per_second=get_tokens_per_second(output_tokens, spans.get("stream", 0.0)),
+            spans=spans,
+        )
+        if message.ttft_seconds is not None:
+            TTFT_SECONDS.observe(message.ttft_seconds)
+        self._log.info(
+            "Timing: ttft=%s tokens/s=%s %s",
+            _format_seconds(message.ttft_seconds),
+            f"{message.tokens_per_second:.1f}" if message.tokens_per_second else "-",
+            " ".join(f"{name}={_format_seconds(sec)}" for name, sec in spans.items()),
+        )
+        self._bus.publish(message)
+
     async def _prepare_tools(
         self,
         ctx: RunContext[StoryContext],
@@ -96,20 +200,36 @@ class StoryEngine:
     def session_adapter(self) -> SessionAdapter:
         return self._session_adapter
 
-    def set_model(self, model: Model) -> None:
+    @property
+    def model(self) -> Model | None:
+        return self._model
+
+    @property
+    def context_window(self) -> int | None:
+        return self._context_window
+
+    def set_model(self, model: Model, context_window: int | None = None) -> None:
+        self._model = model
+        self._context_window = context_window
+        self._summarizer.set_model(model)
         self._agent = Agent[StoryContext, str](
             model,
             deps_type=StoryContext,
-            instructions=self._instructions,
+            # Static prefix first, so state changes don't invalidate prompt caches
+            instructions=[self._instructions_prefix, self._instructions_state],
             model_settings=ModelSettings(seed=random.randint(0, 10000), temperature=0.8),
             output_type=str,
             tools=list(self._context.get_tools()),
             prepare_tools=self._prepare_tools,
         )
 
-    @staticmethod
-    async def _instructions(run_context: RunContext[StoryContext]) -> str:
-        return await run_context.deps.get_system_prompt()
+    async def _instructions_prefix(self, run_context: RunContext[StoryContext]) -> str:
+        with self._timeline.span("prompt"):
+            return await run_context.deps.get_system_prompt_prefix()
+
+    async def _instructions_state(self, run_context: RunContext[StoryContext]) -> str:
+        with self._timeline.span("prompt"):
+            return await run_context.deps.get_state_prompt()
 
     def _log_messages(self, messages: Sequence[ModelMessage]) -> None:
         for idx, msg in enumerate(messages):
@@ -117,3 +237,7 @@ class StoryEngine:
             for pidx, part in enumerate(msg.parts):
                 content = part.content if hasattr(part, "content") else "- NO CONTENT -"
                 self._log.debug("   %03d: %-20s %.250s", pidx, type(part).__name__, content)
+
+
+def _format_seconds(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
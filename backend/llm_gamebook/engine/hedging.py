@@ -0,0 +1,310 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, suppress
+from enum import StrEnum
+from typing import Literal
+
+from pydantic_ai import ModelAPIError, ModelMessage, ModelResponse, RunContext
+from pydantic_ai.messages import ModelResponseStreamEvent
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from llm_gamebook.logger import logger
+from llm_gamebook.metrics import CIRCUIT_BREAKER_TRIPS, HEDGED_REQUESTS
+
+from ._streamed_response import WrappedStreamedResponse
+
+type BreakerKey = tuple[str, str | None, str]
+"""Circuit breakers are kept per model and provider endpoint: `(system, base_url, model_name)`."""
+
+type Hedge = Literal["none", "slow", "error", "breaker"]
+"""Why the fallback model was asked: not at all, slow or failed primary, or open breaker."""
+
+type StreamOpener = Callable[[Model], AbstractAsyncContextManager[StreamedResponse]]
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Tracks failures of one model at a provider endpoint.
+
+    The breaker opens after `failure_threshold` consecutive failures, requests are then routed
+    around the endpoint for `cooldown` seconds. Afterwards it is half-open and lets one trial
+    request through per cooldown, until a success closes it again.
+    """
+
+    def __init__(self, key: BreakerKey, failure_threshold: int = 3, cooldown: float = 30.0) -> None:
+        self._log = logger.getChild(f"circuit-breaker({key[0]})")
+        self.key = key
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> BreakerState:
+        if self._opened_at is None:
+            return BreakerState.CLOSED
+        if time.monotonic() - self._opened_at < self._cooldown:
+            return BreakerState.OPEN
+        return BreakerState.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a request may be sent, a half-open breaker admits a single trial."""
+        state = self.state
+        if state is BreakerState.HALF_OPEN:
+            # The next trial has to wait for another cooldown
+            self._opened_at = time.monotonic()
+        return state is not BreakerState.OPEN
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            self._log.info("%s recovered, closing circuit", self.key[2])
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures < self._failure_threshold:
+            return
+        if self._opened_at is None:
+            self._log.warning(
+                "%s failed %d times, opening circuit for %.0fs",
+                self.key[2],
+                self._failures,
+                self._cooldown,
+            )
+            CIRCUIT_BREAKER_TRIPS.inc(self.key[0])
+        self._opened_at = time.monotonic()
+
+
+class CircuitBreakers:
+    """Circuit breakers of all models, shared by the sessions using them."""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0) -> None:
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._breakers: dict[BreakerKey, CircuitBreaker] = {}
+
+    def get(self, model: Model) -> CircuitBreaker:
+        key = (model.system, model.base_url, model.model_name)
+        if (breaker := self._breakers.get(key)) is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                key, self._failure_threshold, self._cooldown
+            )
+        return breaker
+
+
+class _PeekedStreamedResponse(WrappedStreamedResponse):
+    """A response whose first event was already read to measure the time to first token."""
+
+    def __init__(
+        self,
+        model_request_parameters: ModelRequestParameters,
+        wrapped: StreamedResponse,
+        stream: AsyncIterator[ModelResponseStreamEvent],
+        first: ModelResponseStreamEvent | None,
+    ) -> None:
+        super().__init__(model_request_parameters, wrapped)
+        self._stream = stream
+        self._first = first
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        if self._first is not None:
+            for forwarded in self._forward(self._first):
+                yield forwarded
+        async for event in self._stream:
+            for forwarded in self._forward(event):
+                yield forwarded
+
+        self._finish()
+
+
+class _Attempt:
+    """Opens a response stream in a task and holds it open until closed or cancelled."""
+
+    def __init__(self, model: Model, open_stream: StreamOpener) -> None:
+        self.model = model
+        self.ready: asyncio.Future[StreamedResponse] = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._run(open_stream))
+
+    async def close(self) -> None:
+        self._closing.set()
+        await self._task
+
+    async def cancel(self) -> None:
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        if self.ready.done() and not self.ready.cancelled():
+            self.ready.exception()  # mark as retrieved, the loser's error doesn't matter
+
+    async def _run(self, open_stream: StreamOpener) -> None:
+        try:
+            async with open_stream(self.model) as response:
+                stream = aiter(response)
+                first = await anext(stream, None)
+                self.ready.set_result(
+                    _PeekedStreamedResponse(
+                        response.model_request_parameters, response, stream, first
+                    )
+                )
+                await self._closing.wait()
+        except Exception as err:
+            if self.ready.done():
+                raise
+            self.ready.set_exception(err)
+        finally:
+            if not self.ready.done():
+                self.ready.cancel()
+
+
+class HedgedModel(WrapperModel):
+    """Model wrapper that hedges slow or failing requests with a fallback model.
+
+    If the first token of a streamed response doesn't arrive within `hedge_after` seconds, the
+    same request is sent to the fallback model. Whichever answers first is streamed, the other
+    request is cancelled. Failed requests fail over to the fallback right away, and models
+    whose circuit breaker is open are skipped.
+    """
+
+    def __init__(
+        self,
+        wrapped: Model,
+        fallback: Model,
+        hedge_after: float,
+        breakers: CircuitBreakers | None = None,
+    ) -> None:
+        super().__init__(wrapped)
+        self.fallback = fallback
+        self.hedge_after = hedge_after
+        self._breakers = breakers or CircuitBreakers()
+        self._log = logger.getChild("hedged-model")
+
+    def with_primary(self, model: Model) -> "HedgedModel":
+        return HedgedModel(model, self.fallback, self.hedge_after, self._breakers)
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        # Without a stream there's no first token to wait for, only fail over
+        primary_breaker = self._breakers.get(self.wrapped)
+        fallback_breaker = self._breakers.get(self.fallback)
+        hedge: Hedge = "breaker"
+
+        if primary_breaker.allow() or not fallback_breaker.allow():
+            try:
+                response = await self.wrapped.request(
+                    messages, model_settings, model_request_parameters
+                )
+            except ModelAPIError:
+                primary_breaker.record_failure()
+                if not fallback_breaker.allow():
+                    raise
+                hedge = "error"
+            else:
+                primary_breaker.record_success()
+                HEDGED_REQUESTS.inc("none", "primary")
+                return response
+
+        try:
+            response = await self.fallback.request(
+                messages, model_settings, model_request_parameters
+            )
+        except ModelAPIError:
+            fallback_breaker.record_failure()
+            raise
+        fallback_breaker.record_success()
+        HEDGED_REQUESTS.inc(hedge, "fallback")
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[object] | None = None,
+    ) -> AsyncGenerator[StreamedResponse]:
+        def open_stream(model: Model) -> AbstractAsyncContextManager[StreamedResponse]:
+            return model.request_stream(
+                messages, model_settings, model_request_parameters, run_context
+            )
+
+        attempts: list[_Attempt] = []
+        winner: _Attempt | None = None
+        try:
+            winner = await self._race(open_stream, attempts)
+        finally:
+            # The losers still hold a scheduler slot and a connection
+            for attempt in attempts:
+                if attempt is not winner:
+                    await attempt.cancel()
+
+        try:
+            yield winner.ready.result()
+        finally:
+            await winner.close()
+
+    async def _race(self, open_stream: StreamOpener, attempts: list[_Attempt]) -> _Attempt:
+        primary_breaker = self._breakers.get(self.wrapped)
+        fallback_breaker = self._breakers.get(self.fallback)
+        primary: _Attempt | None = None
+        hedge: Hedge = "breaker"
+
+        if primary_breaker.allow() or not fallback_breaker.allow():
+            primary = _Attempt(self.wrapped, open_stream)
+            attempts.append(primary)
+            done, _ = await asyncio.wait([primary.ready], timeout=self.hedge_after)
+            if done and (error := primary.ready.exception()) is not None:
+                primary_breaker.record_failure()
+                if not fallback_breaker.allow():
+                    raise error
+                hedge = "error"
+            elif done or not fallback_breaker.allow():
+                # In time, or nowhere to route to and we stick with the slow primary
+                return self._won(await self._first_ready([primary]), "none")
+            else:
+                hedge = "slow"
+
+        self._log.info("Hedging %s with %s (%s)", self.model_name, self.fallback.model_name, hedge)
+        fallback = _Attempt(self.fallback, open_stream)
+        attempts.append(fallback)
+        winner = await self._first_ready([fallback] if hedge == "error" else attempts)
+        if primary is not None and not primary.ready.done():
+            # Lost the race without an outcome of its own, it's cancelled for being too slow
+            primary_breaker.record_failure()
+        return self._won(winner, hedge)
+
+    async def _first_ready(self, attempts: list[_Attempt]) -> _Attempt:
+        """The first attempt that streams a token, raises the last error if all of them fail.
+
+        The outcome of each finished attempt is recorded by its circuit breaker.
+        """
+        pending = {attempt.ready: attempt for attempt in attempts}
+        while True:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                attempt = pending.pop(future)
+                breaker = self._breakers.get(attempt.model)
+                if (error := future.exception()) is None:
+                    breaker.record_success()
+                    return attempt
+                breaker.record_failure()
+                if not pending:
+                    raise error
+
+    def _won(self, attempt: _Attempt, hedge: Hedge) -> _Attempt:
+        winner = "primary" if attempt.model is self.wrapped else "fallback"
+        HEDGED_REQUESTS.inc(hedge, winner)
+        return attempt
@@ -0,0 +1,113 @@
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import starmap
+from typing import Final
+from uuid import UUID
+
+from pydantic_ai import ModelMessage, ModelRequest, ModelResponse, TextPart, UserPromptPart
+
+from llm_gamebook.metrics import CACHE_LOOKUPS
+
+DEFAULT_HISTORY_FRACTION: Final = 0.5
+"""Share of the context window available for the message history."""
+
+CHARS_PER_TOKEN: Final = 4.0
+MESSAGE_OVERHEAD_TOKENS: Final = 4
+
+
+class TokenEstimator:
+    """Fast, provider-agnostic token estimate, cached per message ID.
+
+    Persisted messages never change, so each message is only measured once per session.
+    """
+
+    def __init__(self, chars_per_token: float = CHARS_PER_TOKEN) -> None:
+        self._chars_per_token = chars_per_token
+        self._cache: dict[UUID, int] = {}
+
+    def estimate(self, message_id: UUID, message: ModelMessage) -> int:
+        if (tokens := self._cache.get(message_id)) is None:
+            CACHE_LOOKUPS.inc("token_estimate", "miss")
+            chars = sum(len(_get_part_text(part)) for part in message.parts)
+            tokens = math.ceil(chars / self._chars_per_token) + MESSAGE_OVERHEAD_TOKENS
+            self._cache[message_id] = tokens
+        else:
+            CACHE_LOOKUPS.inc("token_estimate", "hit")
+        return tokens
+
+
+@dataclass(frozen=True)
+class HistoryWindow:
+    """Message history trimmed to a token budget."""
+
+    messages: list[ModelMessage]
+    tokens: int
+    trimmed_tokens: int
+    trimmed_messages: int
+    turns: int  # after the pinned messages, before trimming
+
+
+def apply_history_window(
+    messages: Sequence[tuple[UUID, ModelMessage]],
+    estimator: TokenEstimator,
+    budget: int | None,
+    pinned: int | None = None,
+) -> HistoryWindow:
+    """Keep the introduction and the most recent turns within `budget` tokens.
+
+    The first `pinned` messages are always kept, by default the introduction: everything up to
+    and including the first response (the intro request and the opening narration). The
+    remaining history is trimmed by whole turns, oldest first. The latest turn is always kept,
+    even if it exceeds the budget on its own.
+    """
+    tokens = list(starmap(estimator.estimate, messages))
+    total = sum(tokens)
+    model_messages = [msg for _, msg in messages]
+    head_end = get_intro_end(model_messages) if pinned is None else pinned
+    turn_starts = get_turn_starts(model_messages, head_end)
+
+    if budget is None or total <= budget:
+        return HistoryWindow(model_messages, total, 0, 0, len(turn_starts))
+
+    remaining = budget - sum(tokens[:head_end])
+
+    # Walk turns backwards from the newest one
+    start = len(model_messages)
+    for turn_start in reversed(turn_starts):
+        turn_tokens = sum(tokens[turn_start:start])
+        if turn_tokens > remaining and start < len(model_messages):
+            break
+        remaining -= turn_tokens
+        start = turn_start
+
+    kept = model_messages[:head_end] + model_messages[start:]
+    trimmed_tokens = sum(tokens[head_end:start])
+    return HistoryWindow(
+        kept, total - trimmed_tokens, trimmed_tokens, start - head_end, len(turn_starts)
+    )
+
+
+def get_intro_end(messages: Sequence[ModelMessage]) -> int:
+    """Index after the introduction (the intro request and the opening narration)."""
+    return next(
+        (idx + 1 for idx, msg in enumerate(messages) if isinstance(msg, ModelResponse)),
+        len(messages),
+    )
+
+
+def get_turn_starts(messages: Sequence[ModelMessage], start: int) -> list[int]:
+    """Indices from `start` on where a turn (a request and the responses to it) starts."""
+    return [
+        idx
+        for idx in range(start, len(messages))
+        if idx == start or isinstance(messages[idx], ModelRequest)
+    ]
+
+
+def _get_part_text(part: object) -> str:
+    if isinstance(part, TextPart):
+        return part.content
+    if isinstance(part, UserPromptPart):
+        return part.content if isinstance(part.content, str) else str(part.content)
+    return ""
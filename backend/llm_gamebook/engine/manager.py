@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
+from llm_gamebook.db.crud.archive import restore_session
 from llm_gamebook.db.crud.message import get_latest_message_with_state
 from llm_gamebook.db.models import Session
 from llm_gamebook.logger import logger
@@ -21,22 +22,40 @@ from llm_gamebook.story.project_manager import ProjectManager
 from llm_gamebook.story.schemas.project import Project
 from llm_gamebook.story.state import SessionStateData
 
-from ._model_factory import create_model_from_db_config
+from ._model_factory import ModelFactory, create_model_from_db_config
 from .engine import StoryEngine
-from .message import EngineCreated, SessionDeleted, SessionModelConfigChangedMessage
+from .hedging import CircuitBreakers, HedgedModel
+from .message import (
+    EngineCreated,
+    SessionDeleted,
+    SessionFallbackConfigChangedMessage,
+    SessionModelConfigChangedMessage,
+)
+from .scheduler import RequestScheduler
 
 
 class EngineManager(BusSubscriber):
-    def __init__(self, bus: MessageBus, max_idle_seconds: int = 600) -> None:
+    def __init__(
+        self,
+        bus: MessageBus,
+        max_idle_seconds: int = 600,
+        scheduler: RequestScheduler | None = None,
+        model_factory: ModelFactory | None = None,
+    ) -> None:
         self._log = logger.getChild("engine-manager")
 
         self._bus = bus
+        self._scheduler = scheduler or RequestScheduler(bus)
+        self._model_factory = model_factory or create_model_from_db_config
+        self._breakers = CircuitBreakers()
         self._engines: dict[UUID, tuple[StoryEngine, float]] = {}  # engine, last_used
+        self._pending: dict[UUID, asyncio.Future[StoryEngine]] = {}  # in-flight creations
         self._max_idle = max_idle_seconds
         self._evict_task = asyncio.create_task(self._evict_idle())
 
         self._subscribe(SessionDeleted, self._on_session_deleted)
         self._subscribe(SessionModelConfigChangedMessage, self._on_model_config_changed)
+        self._subscribe(SessionFallbackConfigChangedMessage, self._on_fallback_config_changed)
 
     async def __aenter__(self) -> Self:
         return self
@@ -52,6 +71,10 @@ class EngineManager(BusSubscriber):
             with suppress(asyncio.CancelledError):
                 await self._evict_task
 
+    @property
+    def engine_count(self) -> int:
+        return len(self._engines)
+
     def get(self, session_id: UUID) -> StoryEngine:
         engine, _ = self._engines[session_id]
         self._engines[session_id] = (engine, time.time())  # bump last used
@@ -63,19 +86,39 @@ class EngineManager(BusSubscriber):
         db_session: AsyncDbSession,
         project_manager: ProjectManager,
     ) -> StoryEngine:
-        created: bool = False
-        try:
-            engine, _ = self._engines[session_id]
-        except KeyError:
-            result = await self._create_model_and_context(session_id, db_session, project_manager)
-            model, context = result
-            engine = StoryEngine(session_id, model, context, self._bus)
-            created = True
+        with suppress(KeyError):
+            return self.get(session_id)
 
+        # Another caller is already creating this engine: wait for its result
+        if pending := self._pending.get(session_id):
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            # The creating caller was cancelled, try again
+            return await self.get_or_create(session_id, db_session, project_manager)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[session_id] = future
+        try:
+            model, context, context_window = await self._create_model_and_context(
+                session_id, db_session, project_manager
+            )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            future.exception()  # mark as retrieved, the error is raised below anyway
+            raise
+        finally:
+            del self._pending[session_id]
+
+        engine = StoryEngine(session_id, model, context, self._bus, context_window=context_window)
         self._engines[session_id] = (engine, time.time())
-
-        if created:
-            self._bus.publish(EngineCreated(session_id))
+        future.set_result(engine)
+        self._bus.publish(EngineCreated(session_id))
 
         return engine
 
@@ -84,9 +127,12 @@ class EngineManager(BusSubscriber):
         session_id: UUID,
         db_session: AsyncDbSession,
         project_manager: ProjectManager,
-    ) -> tuple[Model | None, StoryContext]:
+    ) -> tuple[Model | None, StoryContext, int | None]:
+        # Bring back the messages of an archived session before loading it
+        await restore_session(db_session, session_id)
+
         stmt = select(Session).where(Session.id == session_id)
-        stmt = stmt.options(selectinload(Session.config))
+        stmt = stmt.options(selectinload(Session.config), selectinload(Session.fallback_config))
         result = await db_session.exec(stmt)
         session = result.one_or_none()
 
@@ -109,7 +155,8 @@ class EngineManager(BusSubscriber):
         context = StoryContext(project, session_state_data)
 
         model = (
-            create_model_from_db_config(
+            await self._create_model_from_config(
+                session_id,
                 model_name=session.config.model_name,
                 provider=session.config.provider,
                 base_url=session.config.base_url,
@@ -118,18 +165,29 @@ class EngineManager(BusSubscriber):
             if session.config
             else None
         )
+        if model and (fallback := session.fallback_config):
+            fallback_model = await self._create_model_from_config(
+                session_id,
+                model_name=fallback.model_name,
+                provider=fallback.provider,
+                base_url=fallback.base_url,
+                api_key=fallback.api_key,
+            )
+            model = HedgedModel(model, fallback_model, session.hedge_after_seconds, self._breakers)
+        context_window = session.config.context_window if session.config else None
 
-        return model, context
+        return model, context, context_window
 
     async def _create_model_from_config(
-        self, model_name: str, provider: ModelProvider, base_url: str | None, api_key: str | None
+        self,
+        session_id: UUID,
+        model_name: str,
+        provider: ModelProvider,
+        base_url: str | None,
+        api_key: str | None,
     ) -> Model:
-        return create_model_from_db_config(
-            model_name=model_name,
-            provider=provider,
-            base_url=base_url,
-            api_key=api_key,
-        )
+        model = self._model_factory(model_name, provider, base_url, api_key)
+        return self._scheduler.wrap(model, (provider, base_url), session_id)
 
     def _perform_eviction(self) -> None:
         cutoff = time.time() - self._max_idle
@@ -160,7 +218,31 @@ class EngineManager(BusSubscriber):
 
         self._log.info(f"Model config changed for session {session_id}, updating engine")
         engine, _ = self._engines[session_id]
-        new_model = await self._create_model_from_config(
-            message.model_name, message.provider, message.base_url, message.api_key
+        new_model: Model = await self._create_model_from_config(
+            session_id, message.model_name, message.provider, message.base_url, message.api_key
         )
-        engine.set_model(new_model)
+        if isinstance(engine.model, HedgedModel):
+            new_model = engine.model.with_primary(new_model)
+        engine.set_model(new_model, message.context_window)
+
+    async def _on_fallback_config_changed(
+        self, message: SessionFallbackConfigChangedMessage
+    ) -> None:
+        session_id = message.session_id
+        if session_id not in self._engines:
+            return
+
+        engine, _ = self._engines[session_id]
+        primary = engine.model.wrapped if isinstance(engine.model, HedgedModel) else engine.model
+        if primary is None:
+            self._log.debug(f"No model for session {session_id}, ignoring fallback change")
+            return
+
+        self._log.info(f"Fallback model changed for session {session_id}, updating engine")
+        new_model = primary
+        if message.model_name is not None and message.provider is not None:
+            fallback = await self._create_model_from_config(
+                session_id, message.model_name, message.provider, message.base_url, message.api_key
+            )
+            new_model = HedgedModel(primary, fallback, message.hedge_after_seconds, self._breakers)
+        engine.set_model(new_model, engine.context_window)
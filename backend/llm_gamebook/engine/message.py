@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from dataclasses import dataclass
 from typing import Annotated, Literal
 from uuid import UUID
@@ -22,6 +23,7 @@ class SessionDeleted(BaseMessage):
 @dataclass(frozen=True)
 class ResponseUserRequestMessage(BaseMessage):
     session_id: UUID
+    message_id: UUID
 
 
 @dataclass(frozen=True)
@@ -34,6 +36,34 @@ class ResponseStoppedMessage(BaseMessage):
     session_id: UUID
 
 
+@dataclass(frozen=True)
+class ResponseCancelledMessage(BaseMessage):
+    session_id: UUID
+
+
+@dataclass(frozen=True)
+class ResponseQueuedMessage(BaseMessage):
+    session_id: UUID
+    position: int  # 0: left the queue
+    wait_seconds: float
+
+
+@dataclass(frozen=True)
+class HistoryWindowMessage(BaseMessage):
+    session_id: UUID
+    tokens: int  # estimated
+    trimmed_tokens: int
+    trimmed_messages: int
+
+
+@dataclass(frozen=True)
+class ResponseTimingMessage(BaseMessage):
+    session_id: UUID
+    ttft_seconds: float | None
+    tokens_per_second: float | None
+    spans: Mapping[str, float]  # phase durations in seconds
+
+
 @dataclass(frozen=True)
 class StreamMessageMessage(BaseMessage):
     session_id: UUID
@@ -89,3 +119,14 @@ class SessionModelConfigChangedMessage(BaseMessage):
     provider: ModelProvider
     base_url: str | None
     api_key: str | None
+    context_window: int | None = None
+
+
+@dataclass(frozen=True)
+class SessionFallbackConfigChangedMessage(BaseMessage):
+    session_id: UUID
+    hedge_after_seconds: float
+    model_name: str | None = None  # None: fallback removed
+    provider: ModelProvider | None = None
+    base_url: str | None = None
+    api_key: str | None = None
@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import BaseModel, Field
+from pydantic_ai import (
+    ModelAPIError,
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    ModelResponseStreamEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+    RetryPromptPart,
+    RunContext,
+    ToolCallPart,
+    ToolReturnPart,
+)
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from llm_gamebook.constants import RECORDINGS_PATH
+from llm_gamebook.logger import logger
+
+from ._streamed_response import PartEventStreamedResponse, StreamEvent, WrappedStreamedResponse
+
+_log = logger.getChild("recording")
+
+
+class RecordedEvent(BaseModel):
+    offset: float
+    """Seconds since the request was sent."""
+
+    event: StreamEvent
+
+
+class Recording(BaseModel):
+    """A model request and the response it produced."""
+
+    fingerprint: str
+    """Hash of the request, see `get_request_fingerprint`."""
+
+    model_name: str
+    events: list[RecordedEvent] = Field(default_factory=list)
+    """Timed part events of a streamed response, empty if the response wasn't streamed."""
+
+    response: ModelResponse
+
+
+def get_request_fingerprint(
+    messages: Sequence[ModelMessage], model_request_parameters: ModelRequestParameters
+) -> str:
+    """Hash of the request content, ignoring timestamps, IDs and other volatile fields."""
+    content = [
+        [
+            *([message.instructions or ""] if isinstance(message, ModelRequest) else []),
+            *(_get_part_key(part) for part in message.parts),
+        ]
+        for message in messages
+    ]
+    tools = sorted(tool.name for tool in model_request_parameters.function_tools)
+    data = json.dumps({"messages": content, "tools": tools}, ensure_ascii=False)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _get_part_key(part: object) -> str:
+    if isinstance(part, ToolCallPart):
+        value = f"{part.tool_name}({part.args_as_json_str()})"
+    elif isinstance(part, ToolReturnPart):
+        value = f"{part.tool_name}: {part.model_response_str()}"
+    elif isinstance(part, RetryPromptPart):
+        value = part.model_response()
+    else:
+        value = str(getattr(part, "content", ""))
+    return f"{getattr(part, 'part_kind', '')}:{value}"
+
+
+class _RecordingStreamedResponse(WrappedStreamedResponse):
+    def __init__(
+        self,
+        model_request_parameters: ModelRequestParameters,
+        wrapped: StreamedResponse,
+        started: float,
+    ) -> None:
+        super().__init__(model_request_parameters, wrapped)
+        self._started = started
+        self.events: list[RecordedEvent] = []
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        async for event in self._wrapped:
+            if isinstance(event, PartStartEvent | PartDeltaEvent):
+                offset = time.perf_counter() - self._started
+                self.events.append(RecordedEvent(offset=offset, event=event))
+            for forwarded in self._forward(event):
+                yield forwarded
+
+        self._finish()
+
+
+class RecordingModel(WrapperModel):
+    """Model wrapper that appends every request and its timed response stream to a file.
+
+    The file holds one JSON recording per line, `ReplayModel` plays them back.
+    """
+
+    def __init__(self, wrapped: Model, path: Path) -> None:
+        super().__init__(wrapped)
+        self._path = path
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        response = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        await self._write(messages, model_request_parameters, response)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[object] | None = None,
+    ) -> AsyncGenerator[StreamedResponse]:
+        started = time.perf_counter()
+        async with self.wrapped.request_stream(
+            messages, model_settings, model_request_parameters, run_context
+        ) as wrapped:
+            response = _RecordingStreamedResponse(model_request_parameters, wrapped, started)
+            yield response
+        await self._write(messages, model_request_parameters, wrapped.get(), response.events)
+
+    async def _write(
+        self,
+        messages: Sequence[ModelMessage],
+        model_request_parameters: ModelRequestParameters,
+        response: ModelResponse,
+        events: list[RecordedEvent] | None = None,
+    ) -> None:
+        recording = Recording(
+            fingerprint=get_request_fingerprint(messages, model_request_parameters),
+            model_name=self.model_name,
+            events=events or [],
+            response=response,
+        )
+        # Don't block the event loop on file I/O
+        await asyncio.to_thread(_append_line, self._path, recording.model_dump_json().encode())
+        _log.debug("Recorded response %s", recording.fingerprint)
+
+
+def _append_line(path: Path, line: bytes) -> None:
+    with path.open("ab") as fp:
+        fp.write(line + b"\n")
+
+
+@lru_cache(maxsize=8)
+def _load_recordings(path: Path, mtime_ns: int) -> dict[str, list[Recording]]:
+    recordings: dict[str, list[Recording]] = {}
+    with path.open("rb") as fp:
+        for line in fp:
+            if line.strip():
+                recording = Recording.model_validate_json(line)
+                recordings.setdefault(recording.fingerprint, []).append(recording)
+    return recordings
+
+
+class _ReplayStreamedResponse(PartEventStreamedResponse):
+    def __init__(
+        self, model_request_parameters: ModelRequestParameters, recording: Recording, speed: float
+    ) -> None:
+        super().__init__(model_request_parameters)
+        self._recording = recording
+        self._speed = speed
+        self._timestamp = datetime.now(UTC)
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        started = time.perf_counter()
+        for recorded in self._recording.events:
+            delay = recorded.offset / self._speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            for event in self._apply(recorded.event):
+                yield event
+
+        response = self._recording.response
+        self._usage = response.usage
+        self.provider_response_id = response.provider_response_id
+        self.provider_details = response.provider_details
+        self.finish_reason = response.finish_reason
+
+    @property
+    def model_name(self) -> str:
+        return self._recording.model_name
+
+    @property
+    def provider_name(self) -> str | None:
+        return self._recording.response.provider_name
+
+    @property
+    def provider_url(self) -> str | None:
+        return self._recording.response.provider_url
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._timestamp
+
+
+class ReplayModel(Model):
+    """Plays back responses captured by `RecordingModel`, without any network access.
+
+    Requests are matched by fingerprint. Repeated requests play the matching recordings in
+    order, the last one is repeated once they run out. A `speed` of 2 streams twice as fast as
+    recorded, `inf` without any delay.
+    """
+
+    def __init__(self, path: Path, model_name: str = "replay", speed: float = 1.0) -> None:
+        super().__init__()
+        if speed <= 0:
+            msg = f"Replay speed must be positive, got {speed}"
+            raise ValueError(msg)
+        self._path = path
+        self._model_name = model_name
+        self._speed = speed
+        self._played: dict[str, int] = {}
+
+    @classmethod
+    def from_url(
+        cls, url: str, model_name: str = "replay", recordings_path: Path = RECORDINGS_PATH
+    ) -> "ReplayModel":
+        """Create from a recording file path or `file:` URL with an optional `speed` parameter.
+
+        The URL comes from the model config, so only files in `recordings_path` can be
+        replayed. Relative paths are resolved against it.
+        """
+        parts = urlsplit(url)
+        if not parts.path:
+            msg = "Replay needs the recording file as base URL"
+            raise ValueError(msg)
+
+        recordings_path = recordings_path.resolve()
+        path = (recordings_path / parts.path).resolve()
+        if not path.is_relative_to(recordings_path):
+            msg = f"Replay recordings must be in {recordings_path}"
+            raise ValueError(msg)
+
+        speed = parse_qs(parts.query).get("speed", ["1"])[0]
+        return cls(path, model_name, float(speed))
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def system(self) -> str:
+        return "replay"
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        recording = self._get_recording(messages, model_request_parameters)
+        return recording.response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[object] | None = None,
+    ) -> AsyncGenerator[StreamedResponse]:
+        recording = self._get_recording(messages, model_request_parameters)
+        yield _ReplayStreamedResponse(model_request_parameters, recording, self._speed)
+
+    def _get_recording(
+        self, messages: Sequence[ModelMessage], model_request_parameters: ModelRequestParameters
+    ) -> Recording:
+        try:
+            recordings = _load_recordings(self._path, self._path.stat().st_mtime_ns)
+        except OSError as err:
+            raise ModelAPIError(self._model_name, f"Can't read recording: {err}") from err
+
+        fingerprint = get_request_fingerprint(messages, model_request_parameters)
+        if not (matches := recordings.get(fingerprint)):
+            msg = f"No recording for request {fingerprint[:12]} in {self._path}"
+            raise ModelAPIError(self._model_name, msg)
+
+        index = self._played.get(fingerprint, 0)
+        self._played[fingerprint] = index + 1
+        return matches[min(index, len(matches) - 1)]
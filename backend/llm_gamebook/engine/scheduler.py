@@ -0,0 +1,387 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Mapping
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Final
+from uuid import UUID
+
+import httpx
+from pydantic_ai import ModelHTTPError, ModelMessage, ModelResponse, RunContext
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from llm_gamebook.logger import logger
+from llm_gamebook.message_bus import MessageBus
+from llm_gamebook.providers import ModelProvider
+
+from .message import ResponseQueuedMessage
+
+type SchedulerKey = tuple[ModelProvider, str | None]
+"""Requests are scheduled per provider endpoint: `(provider, base_url)`."""
+
+RETRYABLE_STATUS_CODES: Final = frozenset({429, 503, 529})
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Admission limits for one provider endpoint."""
+
+    requests_per_minute: float | None = None
+    """Token bucket refill rate, `None` disables rate limiting."""
+
+    burst: int = 1
+    """Token bucket capacity."""
+
+    max_in_flight: int | None = None
+    """Maximum number of concurrent requests, `None` disables the limit."""
+
+    max_retries: int = 3
+    """Maximum number of retries on rate limit or overload errors."""
+
+    backoff_base: float = 1.0
+    """Base delay in seconds for exponential backoff without `Retry-After`."""
+
+    backoff_max: float = 60.0
+    """Upper bound for any backoff delay in seconds."""
+
+
+DEFAULT_RATE_LIMITS: Final[Mapping[ModelProvider, RateLimits]] = {
+    # Local servers usually process only a few requests in parallel
+    ModelProvider.OLLAMA: RateLimits(max_in_flight=4),
+    ModelProvider.OPENAI_COMPATIBLE: RateLimits(max_in_flight=4),
+}
+
+
+class _TokenBucket:
+    def __init__(self, requests_per_minute: float, capacity: int) -> None:
+        self._rate = requests_per_minute / 60
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+
+    def take(self) -> None:
+        self._refill()
+        self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+@dataclass(eq=False)
+class _Waiter:
+    session_id: UUID
+    future: asyncio.Future[None]
+    enqueued: float = field(default_factory=time.monotonic)
+    position: int = 0
+
+
+class _ProviderQueue:
+    """Admission queue for one provider endpoint, round-robin across sessions."""
+
+    def __init__(self, key: SchedulerKey, limits: RateLimits, bus: MessageBus) -> None:
+        self._log = logger.getChild(f"scheduler({key[0]})")
+        self._bus = bus
+        self.limits = limits
+        self._bucket = (
+            _TokenBucket(limits.requests_per_minute, limits.burst)
+            if limits.requests_per_minute
+            else None
+        )
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._sessions: OrderedDict[UUID, deque[_Waiter]] = OrderedDict()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._sessions.values())
+
+    async def acquire(self, session_id: UUID) -> None:
+        waiter = _Waiter(session_id, asyncio.get_running_loop().create_future())
+        self._sessions.setdefault(session_id, deque()).append(waiter)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.cancelled():
+                self._remove(waiter)
+                self._publish_positions()
+            else:
+                # Admitted, but cancelled before we could use the slot
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def pause(self, delay: float) -> None:
+        """Hold back all requests to this endpoint for `delay` seconds."""
+        self._log.debug("Pausing admissions for %.1fs", delay)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def _dispatch(self) -> None:
+        max_in_flight = self.limits.max_in_flight
+        while self._sessions and (max_in_flight is None or self._in_flight < max_in_flight):
+            if (delay := self._admission_delay()) > 0:
+                self._schedule_dispatch(delay)
+                break
+
+            waiter = self._pop_next()
+            if waiter.future.done():
+                # Cancelled, its task hasn't run yet to leave the queue
+                continue
+            if self._bucket:
+                self._bucket.take()
+            self._in_flight += 1
+            waiter.future.set_result(None)
+
+            if waiter.position:
+                # Tell the client it left the queue
+                wait_seconds = time.monotonic() - waiter.enqueued
+                self._bus.publish(ResponseQueuedMessage(waiter.session_id, 0, wait_seconds))
+
+        self._publish_positions()
+
+    def _admission_delay(self) -> float:
+        delay = self._paused_until - time.monotonic()
+        if self._bucket:
+            delay = max(delay, self._bucket.delay())
+        return delay
+
+    def _schedule_dispatch(self, delay: float) -> None:
+        if self._timer:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _pop_next(self) -> _Waiter:
+        session_id, waiters = next(iter(self._sessions.items()))
+        waiter = waiters.popleft()
+        if waiters:
+            self._sessions.move_to_end(session_id)
+        else:
+            del self._sessions[session_id]
+        return waiter
+
+    def _remove(self, waiter: _Waiter) -> None:
+        # Cancelled waiters may have been dropped by `_dispatch` already
+        if (waiters := self._sessions.get(waiter.session_id)) and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._sessions[waiter.session_id]
+
+    def _publish_positions(self) -> None:
+        queues = list(self._sessions.values())
+        now = time.monotonic()
+
+        for session_idx, waiters in enumerate(queues):
+            for waiter_idx, waiter in enumerate(waiters):
+                position = _round_robin_position(queues, session_idx, waiter_idx)
+                if position != waiter.position:
+                    waiter.position = position
+                    message = ResponseQueuedMessage(
+                        waiter.session_id, position, now - waiter.enqueued
+                    )
+                    self._bus.publish(message)
+
+
+def _round_robin_position(queues: list[deque[_Waiter]], session_idx: int, waiter_idx: int) -> int:
+    """1-based queue position when serving one request per session and round."""
+    ahead = waiter_idx
+    for other_idx, other in enumerate(queues):
+        if other_idx != session_idx:
+            # Earlier rounds, plus the current round if served before us
+            ahead += min(len(other), waiter_idx)
+            if other_idx < session_idx and len(other) > waiter_idx:
+                ahead += 1
+    return ahead + 1
+
+
+class RequestScheduler:
+    """Admission control for LLM requests.
+
+    Requests are queued per provider endpoint with a token bucket rate limit and a limit on
+    concurrent requests. Sessions are served round-robin, so one busy session can't starve
+    the others. Queue positions are published on the bus as `ResponseQueuedMessage`.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        limits: Mapping[ModelProvider, RateLimits] | None = None,
+        default_limits: RateLimits | None = None,
+    ) -> None:
+        self._bus = bus
+        self._limits = DEFAULT_RATE_LIMITS if limits is None else limits
+        self._default_limits = default_limits or RateLimits(max_in_flight=16)
+        self._queues: dict[SchedulerKey, _ProviderQueue] = {}
+        self._log = logger.getChild("scheduler")
+
+    @asynccontextmanager
+    async def slot(self, key: SchedulerKey, session_id: UUID) -> AsyncIterator[None]:
+        """Wait for admission and hold a request slot."""
+        queue = self._get_queue(key)
+        await queue.acquire(session_id)
+        try:
+            yield
+        finally:
+            queue.release()
+
+    async def backoff(self, key: SchedulerKey, err: ModelHTTPError, attempt: int) -> bool:
+        """Wait before retrying a failed request, returns `False` if it should not be retried.
+
+        The caller must not hold a slot, so other sessions aren't blocked by the wait.
+        """
+        queue = self._get_queue(key)
+        limits = queue.limits
+
+        if err.status_code not in RETRYABLE_STATUS_CODES or attempt >= limits.max_retries:
+            return False
+
+        retry_after = _get_retry_after(err)
+        if retry_after is None:
+            delay = random.uniform(0, min(limits.backoff_max, limits.backoff_base * 2**attempt))
+        else:
+            delay = min(retry_after, limits.backoff_max)
+
+        self._log.warning(
+            "%s returned %d, retrying in %.1fs (attempt %d/%d)",
+            err.model_name,
+            err.status_code,
+            delay,
+            attempt + 1,
+            limits.max_retries,
+        )
+        queue.pause(delay)
+        await asyncio.sleep(delay)
+        return True
+
+    def wrap(self, model: Model, key: SchedulerKey, session_id: UUID) -> "ScheduledModel":
+        return ScheduledModel(model, self, key, session_id)
+
+    def _get_queue(self, key: SchedulerKey) -> _ProviderQueue:
+        if (queue := self._queues.get(key)) is None:
+            limits = self._limits.get(key[0], self._default_limits)
+            queue = self._queues[key] = _ProviderQueue(key, limits, self._bus)
+        return queue
+
+
+class ScheduledModel(WrapperModel):
+    """Model wrapper that routes requests through a `RequestScheduler`."""
+
+    def __init__(
+        self, wrapped: Model, scheduler: RequestScheduler, key: SchedulerKey, session_id: UUID
+    ) -> None:
+        super().__init__(wrapped)
+        self._scheduler = scheduler
+        self._key = key
+        self._session_id = session_id
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        attempt = 0
+        while True:
+            try:
+                async with self._scheduler.slot(self._key, self._session_id):
+                    return await self.wrapped.request(
+                        messages, model_settings, model_request_parameters
+                    )
+            except ModelHTTPError as err:
+                # Release the slot while backing off
+                if not await self._scheduler.backoff(self._key, err, attempt):
+                    raise
+                attempt += 1
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext[object] | None = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        attempt = 0
+        while True:
+            stack = AsyncExitStack()
+            try:
+                await stack.enter_async_context(self._scheduler.slot(self._key, self._session_id))
+                # Rate limit errors are raised before the first event is streamed
+                response = await stack.enter_async_context(
+                    self.wrapped.request_stream(
+                        messages, model_settings, model_request_parameters, run_context
+                    )
+                )
+            except ModelHTTPError as err:
+                # Release the slot while backing off
+                await stack.aclose()
+                if not await self._scheduler.backoff(self._key, err, attempt):
+                    raise
+                attempt += 1
+            except BaseException:
+                await stack.aclose()
+                raise
+            else:
+                break
+
+        async with stack:
+            yield response
+
+
+def _get_retry_after(err: ModelHTTPError) -> float | None:
+    """Extract `Retry-After` from the provider SDK exception that caused `err`."""
+    exc: BaseException | None = err
+    while exc is not None:
+        response = getattr(exc, "response", None)
+        if isinstance(response, httpx.Response):
+            return _parse_retry_after(response.headers)
+        exc = exc.__cause__
+    return None
+
+
+def _parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    if retry_after_ms := headers.get("retry-after-ms"):
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    if retry_after := headers.get("retry-after"):
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=UTC)
+        return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+    return None
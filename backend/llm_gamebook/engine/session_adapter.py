@@ -1,4 +1,4 @@
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Iterable, Sequence
 from logging import getLogger
 from typing import TYPE_CHECKING
 from uuid import UUID
@@ -20,9 +20,17 @@ from llm_gamebook.db.crud.message import (
     get_messages,
 )
 from llm_gamebook.db.crud.session import delete_session, get_session
-from llm_gamebook.db.models import Message, Session
+from llm_gamebook.db.crud.summary import create_summary, delete_summary, get_latest_summary
+from llm_gamebook.db.models import Message, Session, Summary
 from llm_gamebook.db.models.part import Part
+from llm_gamebook.engine.history import (
+    HistoryWindow,
+    TokenEstimator,
+    apply_history_window,
+    get_intro_end,
+)
 from llm_gamebook.engine.message import ResponseUserRequestMessage, SessionDeleted
+from llm_gamebook.engine.summarizer import apply_summary
 from llm_gamebook.story.state import SessionStateData
 
 logger = getLogger(__name__)
@@ -40,6 +48,7 @@ class SessionAdapter:
         self._session_id = session_id
         self._context = context
         self._bus = bus
+        self._token_estimator = TokenEstimator()
 
     async def get_session(self, db_session: AsyncDbSession) -> Session | None:
         return await get_session(db_session, self._session_id)
@@ -52,7 +61,40 @@ class SessionAdapter:
         return await get_message_count(db_session, self._session_id)
 
     async def get_message_history(self, db_session: AsyncDbSession) -> AsyncIterable[ModelMessage]:
-        # Message history
+        history, _ = await self._get_message_history(db_session)
+        for _, msg in history:
+            yield msg
+
+    async def get_history_window(
+        self, db_session: AsyncDbSession, budget: int | None
+    ) -> HistoryWindow:
+        """Message history trimmed to `budget` tokens (`None`: no limit)."""
+        history, pinned = await self._get_message_history(db_session)
+        return apply_history_window(history, self._token_estimator, budget, pinned)
+
+    async def load_history(self, db_session: AsyncDbSession) -> list[tuple[UUID, ModelMessage]]:
+        """Persisted message history, without summary."""
+        return self._to_history(await get_messages(db_session, self._session_id))
+
+    async def get_summary(
+        self, db_session: AsyncDbSession, history: Sequence[tuple[UUID, ModelMessage]]
+    ) -> Summary | None:
+        """Latest summary, stale summaries are deleted."""
+        summary = await get_latest_summary(db_session, self._session_id)
+        if summary is None or apply_summary(history, summary) is not None:
+            return summary
+
+        logger.info("Summary %s of session %s is stale", summary.id, self._session_id)
+        await delete_summary(db_session, summary)
+        return None
+
+    async def save_summary(self, db_session: AsyncDbSession, summary: Summary) -> Summary:
+        return await create_summary(db_session, summary)
+
+    async def _get_message_history(
+        self, db_session: AsyncDbSession
+    ) -> tuple[list[tuple[UUID, ModelMessage]], int]:
+        """Message history and the number of leading messages to always keep."""
         messages = await get_messages(db_session, self._session_id)
 
         if not messages:
@@ -60,21 +102,36 @@ class SessionAdapter:
             req = ModelRequest([UserPromptPart(content=await self._context.get_intro_message())])
             message = Message.from_model_request(self._session_id, req)
             await create_message(db_session, message)
-            yield req
-        else:
-            model_messages = (msg.to_model_message() for msg in messages)
-            for msg in model_messages:
-                # Keep only relevant parts
-                if isinstance(msg, ModelResponse):
-                    msg.parts = [p for p in msg.parts if isinstance(p, TextPart)]
-                else:  # ModelRequest
-                    msg.parts = [p for p in msg.parts if isinstance(p, UserPromptPart)]
-
-                # Skip empty messages
-                if len(msg.parts) == 0:
-                    continue
-
-                yield msg
+            return [(message.id, req)], 1
+
+        history = self._to_history(messages)
+        intro_end = get_intro_end([msg for _, msg in history])
+
+        # Replace summarised turns, the summary is kept along with the introduction
+        summary = await self.get_summary(db_session, history)
+        if summary and (summarised := apply_summary(history, summary)):
+            return summarised, intro_end + 1
+
+        return history, intro_end
+
+    @staticmethod
+    def _to_history(messages: Iterable[Message]) -> list[tuple[UUID, ModelMessage]]:
+        history: list[tuple[UUID, ModelMessage]] = []
+        for message in messages:
+            msg = message.to_model_message()
+
+            # Keep only relevant parts
+            if isinstance(msg, ModelResponse):
+                msg.parts = [p for p in msg.parts if isinstance(p, TextPart)]
+            else:  # ModelRequest
+                msg.parts = [p for p in msg.parts if isinstance(p, UserPromptPart)]
+
+            # Skip empty messages
+            if len(msg.parts) == 0:
+                continue
+
+            history.append((message.id, msg))
+        return history
 
     async def load_state(self, db_session: AsyncDbSession) -> SessionStateData | None:
         message = await get_latest_message_with_state(db_session, self._session_id)
@@ -101,7 +158,7 @@ class SessionAdapter:
             parts=[Part(**p.model_dump()) for p in message_in.parts],
         )
         message = await create_message(db_session, message)
-        self._bus.publish(ResponseUserRequestMessage(self._session_id))
+        self._bus.publish(ResponseUserRequestMessage(self._session_id, message.id))
         return message
 
     @property
@@ -0,0 +1,158 @@
+import asyncio
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Final
+from uuid import UUID
+
+from pydantic_ai import Agent, ModelMessage, ModelRequest, TextPart, UserPromptPart
+from pydantic_ai.models import Model
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db import DbSessionFactory
+from llm_gamebook.db.models import Summary
+from llm_gamebook.logger import logger
+
+from .history import get_intro_end, get_turn_starts
+
+if TYPE_CHECKING:
+    from .session_adapter import SessionAdapter
+
+type History = Sequence[tuple[UUID, ModelMessage]]
+
+SUMMARY_EVERY_TURNS: Final = 10
+"""Number of turns condensed into the summary at once."""
+
+SUMMARY_KEEP_TURNS: Final = 10
+"""Number of recent turns that are never summarised."""
+
+SUMMARY_HEADING: Final = "Summary of the story so far:"
+
+SUMMARY_INSTRUCTIONS: Final = """\
+You keep a running summary of an interactive story.
+
+Merge the previous summary and the new story turns into one concise summary of at most \
+300 words. Keep plot events, player decisions, characters, places, items and open threads. \
+Write in past tense and don't invent anything."""
+
+
+class HistorySummarizer:
+    """Condenses the oldest story turns into a rolling summary in the background.
+
+    Summaries are stored in the database and replace the summarised turns in the message
+    history. Summarising runs in its own database session, so it never blocks a response.
+    """
+
+    def __init__(
+        self,
+        session_adapter: "SessionAdapter",
+        every_turns: int = SUMMARY_EVERY_TURNS,
+        keep_turns: int = SUMMARY_KEEP_TURNS,
+    ) -> None:
+        self._session_adapter = session_adapter
+        self._every_turns = every_turns
+        self._keep_turns = keep_turns
+        self._model: Model | None = None
+        self._task: asyncio.Task[Summary | None] | None = None
+        self._log = logger.getChild(f"summarizer({session_adapter.session_id})")
+
+    def set_model(self, model: Model) -> None:
+        self._model = model
+
+    def is_due(self, turns: int) -> bool:
+        return turns >= self._every_turns + self._keep_turns
+
+    def schedule(self, db_sessions: DbSessionFactory) -> None:
+        """Summarise in the background, unless a summary is already being written."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(db_sessions))
+
+    async def _run(self, db_sessions: DbSessionFactory) -> Summary | None:
+        try:
+            async with db_sessions() as db_session:
+                return await self.summarize(db_session)
+        except Exception:  # noqa: BLE001
+            self._log.exception("Summarising failed")
+            return None
+
+    async def summarize(self, db_session: AsyncDbSession) -> Summary | None:
+        """Condense the oldest un-summarised turns, returns `None` if there are too few."""
+        if self._model is None:
+            return None
+
+        history = await self._session_adapter.load_history(db_session)
+        summary = await self._session_adapter.get_summary(db_session, history)
+
+        span = find_summary_span(history, summary, self._every_turns, self._keep_turns)
+        if span is None:
+            return None
+        start, end = span
+
+        self._log.info("Summarising messages %d to %d", start, end - 1)
+        agent = Agent[None, str](self._model, instructions=SUMMARY_INSTRUCTIONS, output_type=str)
+        result = await agent.run(_get_summary_prompt(summary, history[start:end]))
+
+        intro_end = get_intro_end([msg for _, msg in history])
+        new_summary = Summary(
+            session_id=self._session_adapter.session_id,
+            content=result.output,
+            start_message_id=history[intro_end][0],
+            end_message_id=history[end - 1][0],
+            message_count=end - intro_end,
+        )
+        return await self._session_adapter.save_summary(db_session, new_summary)
+
+
+def find_summary_span(
+    history: History, summary: Summary | None, every_turns: int, keep_turns: int
+) -> tuple[int, int] | None:
+    """The next span of `every_turns` turns to summarise, if enough turns are left."""
+    messages = [msg for _, msg in history]
+    start = get_intro_end(messages)
+
+    if summary is not None:
+        start = [message_id for message_id, _ in history].index(summary.end_message_id) + 1
+
+    turn_starts = get_turn_starts(messages, start)
+    if len(turn_starts) < every_turns + keep_turns:
+        return None
+
+    return start, turn_starts[every_turns]
+
+
+def apply_summary(history: History, summary: Summary) -> list[tuple[UUID, ModelMessage]] | None:
+    """Replace the summarised messages with the summary, `None` if the summary is stale.
+
+    A summary goes stale when the history it covers changed, e.g. after a rewind.
+    """
+    message_ids = [message_id for message_id, _ in history]
+    intro_end = get_intro_end([msg for _, msg in history])
+
+    try:
+        end = message_ids.index(summary.end_message_id)
+    except ValueError:
+        return None
+
+    if (
+        intro_end >= len(message_ids)
+        or message_ids[intro_end] != summary.start_message_id
+        or end + 1 - intro_end != summary.message_count
+    ):
+        return None
+
+    content = f"{SUMMARY_HEADING}\n\n{summary.content}"
+    summary_request = ModelRequest([UserPromptPart(content=content)])
+    return [*history[:intro_end], (summary.id, summary_request), *history[end + 1 :]]
+
+
+def _get_summary_prompt(summary: Summary | None, span: History) -> str:
+    lines: list[str] = []
+    for _, msg in span:
+        for part in msg.parts:
+            if isinstance(part, UserPromptPart) and isinstance(part.content, str):
+                lines.append(f"Player: {part.content}")
+            elif isinstance(part, TextPart):
+                lines.append(f"Narrator: {part.content}")
+
+    previous = summary.content if summary else "(none)"
+    turns = "\n\n".join(lines)
+    return f"# Previous summary\n\n{previous}\n\n# New story turns\n\n{turns}"
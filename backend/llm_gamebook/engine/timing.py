@@ -0,0 +1,47 @@
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class Timeline:
+    """Lightweight span recorder for one response generation.
+
+    Spans with the same name add up, e.g. all tool calls of a turn. Marks record when an event
+    first happened, relative to the start of the timeline.
+    """
+
+    def __init__(self) -> None:
+        self._start = perf_counter()
+        self._spans: dict[str, float] = {}
+        self._marks: dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Generator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        self._spans[name] = self._spans.get(name, 0.0) + seconds
+
+    def mark(self, name: str) -> None:
+        self._marks.setdefault(name, self.elapsed())
+
+    def get_mark(self, name: str) -> float | None:
+        return self._marks.get(name)
+
+    def elapsed(self) -> float:
+        return perf_counter() - self._start
+
+    @property
+    def spans(self) -> Mapping[str, float]:
+        return self._spans
+
+
+def get_tokens_per_second(output_tokens: int, seconds: float) -> float | None:
+    """Output throughput, `None` if nothing was measured."""
+    if output_tokens <= 0 or seconds <= 0:
+        return None
+    return output_tokens / seconds
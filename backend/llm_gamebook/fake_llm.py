@@ -0,0 +1,277 @@
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Final
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, JsonValue, model_validator
+
+from llm_gamebook.logger import logger
+
+type Chunk = dict[str, object]
+
+FILLER_TEXT: Final = (
+    "The corridor stretches ahead, lit only by the pale glow of a flickering bulb. "
+    "Somewhere behind the walls a pipe knocks twice, then falls silent. "
+    "You notice a faint draught carrying the smell of rain and old paper."
+)
+
+_log = logger.getChild("fake-llm")
+
+
+class ScriptStep(BaseModel):
+    """One scripted response, either text or a tool call."""
+
+    text: str | None = None
+    tool: str | None = None
+    """Name of the tool to call."""
+
+    args: dict[str, JsonValue] | None = None
+    """Arguments of the tool call."""
+
+    @model_validator(mode="after")
+    def _check_kind(self) -> "ScriptStep":
+        if (self.text is None) == (self.tool is None):
+            msg = "A script step needs either text or a tool"
+            raise ValueError(msg)
+        return self
+
+
+class _ChatMessage(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    role: str
+    content: JsonValue = None
+
+
+class _ChatFunction(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+
+
+class _ChatTool(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    function: _ChatFunction
+
+
+class _ChatRequest(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    model: str
+    messages: list[_ChatMessage]
+    stream: bool = False
+    tools: list[_ChatTool] = []
+
+
+@dataclass(frozen=True)
+class FakeLlmOptions:
+    ttft: float = 0.3
+    """Seconds before the first token."""
+
+    tokens_per_second: float = 30.0
+    """Output rate once streaming."""
+
+    response_tokens: int = 80
+    """Length of generated responses, in words."""
+
+    script: Sequence[ScriptStep] = ()
+    """Responses to cycle through, generated text if empty."""
+
+    rate_limit_rate: float = 0.0
+    """Share of requests answered with 429 Too Many Requests."""
+
+    server_error_rate: float = 0.0
+    """Share of requests answered with 500 Internal Server Error."""
+
+    stall_rate: float = 0.0
+    """Share of streams that stall halfway through."""
+
+    stall_seconds: float = 30.0
+    """Duration of a stall."""
+
+    seed: int | None = None
+
+
+class FakeLlm:
+    """Serves `/v1/chat/completions` like an OpenAI-compatible API, without a model.
+
+    Meant for load and soak tests of the real HTTP path. Responses come from a script or are
+    generated filler text, streamed at a fixed rate with optional injected errors and stalls.
+    """
+
+    def __init__(self, options: FakeLlmOptions) -> None:
+        self._options = options
+        self._random = random.Random(options.seed)
+        self._steps = itertools.count()
+        self.app = FastAPI(title="Fake LLM")
+        # FastAPI can't derive a response model from the union of response classes
+        self.app.add_api_route(
+            "/v1/chat/completions", self.create_completion, methods=["POST"], response_model=None
+        )
+        self.app.add_api_route("/v1/models", self.list_models, methods=["GET"])
+
+    async def list_models(self) -> JSONResponse:
+        return JSONResponse({"object": "list", "data": [{"id": "fake", "object": "model"}]})
+
+    async def create_completion(self, request: _ChatRequest) -> JSONResponse | StreamingResponse:
+        if error := self._get_injected_error():
+            return error
+
+        step = self._get_step(request)
+        completion_id = f"chatcmpl-{uuid4().hex}"
+        if request.stream:
+            return StreamingResponse(
+                self._stream(request, step, completion_id), media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(self._options.ttft + self._get_output_tokens(step) / self._rate)
+        return JSONResponse(self._get_completion(request, step, completion_id))
+
+    @property
+    def _rate(self) -> float:
+        return max(self._options.tokens_per_second, 1e-3)
+
+    def _get_injected_error(self) -> JSONResponse | None:
+        roll = self._random.random()
+        if roll < self._options.rate_limit_rate:
+            _log.debug("Injecting 429")
+            return _error_response(429, "rate_limit_exceeded", {"Retry-After": "1"})
+        if roll < self._options.rate_limit_rate + self._options.server_error_rate:
+            _log.debug("Injecting 500")
+            return _error_response(500, "server_error")
+        return None
+
+    def _get_step(self, request: _ChatRequest) -> ScriptStep:
+        if self._options.script:
+            step = self._options.script[next(self._steps) % len(self._options.script)]
+            tool_names = {tool.function.name for tool in request.tools}
+            # Tool calls are answered with text, otherwise the conversation never ends
+            if step.text is not None or (
+                step.tool in tool_names and request.messages[-1].role != "tool"
+            ):
+                return step
+        return ScriptStep(text=self._get_filler(self._options.response_tokens))
+
+    @staticmethod
+    def _get_filler(tokens: int) -> str:
+        words = itertools.cycle(FILLER_TEXT.split())
+        return " ".join(itertools.islice(words, tokens))
+
+    @staticmethod
+    def _get_output_tokens(step: ScriptStep) -> int:
+        if step.text is not None:
+            return len(_split_tokens(step.text))
+        return len(_split_tokens(json.dumps(step.args or {}))) + 1
+
+    def _get_usage(self, request: _ChatRequest, step: ScriptStep) -> Chunk:
+        prompt_chars = sum(len(json.dumps(message.content)) for message in request.messages)
+        prompt_tokens = math.ceil(prompt_chars / 4)
+        completion_tokens = self._get_output_tokens(step)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _get_completion(self, request: _ChatRequest, step: ScriptStep, completion_id: str) -> Chunk:
+        message: Chunk = {"role": "assistant", "content": step.text}
+        if step.tool is not None:
+            message["tool_calls"] = [_get_tool_call(step, json.dumps(step.args or {}))]
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.model,
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": _get_finish_reason(step)}
+            ],
+            "usage": self._get_usage(request, step),
+        }
+
+    async def _stream(
+        self, request: _ChatRequest, step: ScriptStep, completion_id: str
+    ) -> AsyncIterator[str]:
+        def chunk(delta: Chunk, finish_reason: str | None = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        await asyncio.sleep(self._options.ttft)
+        stall = self._random.random() < self._options.stall_rate
+        deltas = list(_get_deltas(step))
+
+        started = time.perf_counter()
+        for i, delta in enumerate(deltas):
+            if stall and i == len(deltas) // 2:
+                _log.debug("Injecting %.1fs stall", self._options.stall_seconds)
+                await asyncio.sleep(self._options.stall_seconds)
+                started += self._options.stall_seconds
+            # Pace against the start time, so sleep overhead doesn't add up
+            if (delay := started + i / self._rate - time.perf_counter()) > 0:
+                await asyncio.sleep(delay)
+            yield chunk(delta)
+
+        yield chunk({}, _get_finish_reason(step))
+        usage = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.model,
+            "choices": [],
+            "usage": self._get_usage(request, step),
+        }
+        yield f"data: {json.dumps(usage)}\n\n"
+        yield "data: [DONE]\n\n"
+
+
+def _get_deltas(step: ScriptStep) -> Iterator[Chunk]:
+    if step.text is not None:
+        for i, token in enumerate(_split_tokens(step.text)):
+            yield {"role": "assistant", "content": token} if i == 0 else {"content": token}
+        return
+
+    tool_call = _get_tool_call(step, "")
+    yield {"role": "assistant", "content": None, "tool_calls": [tool_call]}
+    for token in _split_tokens(json.dumps(step.args or {})):
+        yield {"tool_calls": [{"index": 0, "function": {"arguments": token}}]}
+
+
+def _get_tool_call(step: ScriptStep, arguments: str) -> Chunk:
+    return {
+        "index": 0,
+        "id": f"call_{uuid4().hex[:24]}",
+        "type": "function",
+        "function": {"name": step.tool, "arguments": arguments},
+    }
+
+
+def _get_finish_reason(step: ScriptStep) -> str:
+    return "stop" if step.text is not None else "tool_calls"
+
+
+def _split_tokens(text: str) -> list[str]:
+    """Word-sized tokens that join back to the original text."""
+    tokens = text.split(" ")
+    return [f"{token} " for token in tokens[:-1]] + ([tokens[-1]] if tokens[-1] else [])
+
+
+def _error_response(
+    status_code: int, code: str, headers: dict[str, str] | None = None
+) -> JSONResponse:
+    error = {"message": f"Injected {code}", "type": code, "code": code}
+    return JSONResponse({"error": error}, status_code=status_code, headers=headers)
@@ -0,0 +1,106 @@
+import subprocess
+import sys
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from operator import itemgetter
+from time import perf_counter
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_seconds: float
+    """Time spent executing the module itself."""
+
+    cumulative_seconds: float
+    """Time including the modules it imported first."""
+
+    depth: int
+    """Nesting level, 0 for modules imported by the profiled import statement."""
+
+
+@dataclass(frozen=True)
+class ImportProfile:
+    imports: Sequence[ImportTime]
+    wall_seconds: float
+    """Duration of the whole interpreter run, including interpreter start-up."""
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(entry.self_seconds for entry in self.imports)
+
+    def get_package_totals(self) -> dict[str, float]:
+        """Self time per top-level package, slowest first."""
+        totals: defaultdict[str, float] = defaultdict(float)
+        for entry in self.imports:
+            totals[entry.module.partition(".")[0]] += entry.self_seconds
+        return dict(sorted(totals.items(), key=itemgetter(1), reverse=True))
+
+    def format(self, top: int = 15) -> str:
+        total = self.total_seconds or 1.0
+        slowest = sorted(self.imports, key=lambda entry: entry.cumulative_seconds, reverse=True)
+        lines = [
+            (
+                f"Imported {len(self.imports)} modules in {self.total_seconds:.3f}s "
+                f"({self.wall_seconds:.3f}s including interpreter start-up)"
+            ),
+            "",
+            "By package (self time):",
+            *(
+                f"  {seconds:8.3f}s {seconds / total:6.1%}  {package}"
+                for package, seconds in list(self.get_package_totals().items())[:top]
+            ),
+            "",
+            "Slowest imports (cumulative time):",
+            *(
+                (
+                    f"  {entry.cumulative_seconds:8.3f}s "
+                    f"{entry.cumulative_seconds / total:6.1%}  {entry.module}"
+                )
+                for entry in slowest[:top]
+            ),
+        ]
+        return "\n".join(lines)
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Parse the `-X importtime` report, see `python -X importtime --help`."""
+    return list(_parse_lines(output.splitlines()))
+
+
+def _parse_lines(lines: Iterable[str]) -> Iterable[ImportTime]:
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line.removeprefix("import time:").split("|", 2)
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header
+
+        name = fields[2].removeprefix(" ")
+        module = name.lstrip(" ")
+        yield ImportTime(
+            module=module,
+            self_seconds=int(fields[0]) / 1e6,
+            cumulative_seconds=int(fields[1]) / 1e6,
+            depth=(len(name) - len(module)) // 2,
+        )
+
+
+def profile_imports(module: str) -> ImportProfile:
+    """Import `module` in a fresh interpreter and report where the time went."""
+    start = perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    wall_seconds = perf_counter() - start
+
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        msg = f"Importing {module} failed: {error[0]}"
+        raise RuntimeError(msg)
+
+    return ImportProfile(parse_importtime(result.stderr), wall_seconds)
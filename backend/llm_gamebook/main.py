@@ -1,5 +1,7 @@
+import asyncio
 import os
 from dataclasses import dataclass
+from datetime import timedelta
 from pathlib import Path
 from typing import Annotated, cast
 
@@ -43,6 +45,18 @@ def web(
             ),
         ),
     ] = False,
+    record: Annotated[
+        Path | None,
+        typer.Option(
+            help=(
+                "Record model requests and responses to this file. "
+                "Replay reads recordings from the user data [bold]recordings[/bold] directory."
+            ),
+        ),
+    ] = None,
+    ws_deflate: Annotated[
+        bool, typer.Option(help="Offer permessage-deflate compression to websocket clients.")
+    ] = True,
 ) -> None:
     """Run web application."""
     import uvicorn  # noqa: PLC0415
@@ -56,6 +70,8 @@ def web(
         if state.log_file:
             os.environ["LLM_GAMEBOOK_LOG_FILE"] = str(state.log_file)
         os.environ["LLM_GAMEBOOK_DEBUG"] = str(state.debug)
+        if record:
+            os.environ["LLM_GAMEBOOK_RECORD_FILE"] = str(record)
 
         reload_dir = str(Path(__file__).parent)
 
@@ -66,12 +82,103 @@ def web(
             port=port,
             reload=True,
             reload_dirs=reload_dir,
+            ws_per_message_deflate=ws_deflate,
         )
 
     # Normal start-up
     else:
-        app = create_app(state.log_file, debug=state.debug)
-        uvicorn.run(app, host=host, port=port)
+        app = create_app(state.log_file, debug=state.debug, record_file=record)
+        uvicorn.run(app, host=host, port=port, ws_per_message_deflate=ws_deflate)
+
+
+@app.command()
+def fake_llm(  # noqa: PLR0913
+    *,
+    host: Annotated[str, typer.Option(help="The host to serve on.")] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="The port to serve on.")] = 5001,
+    ttft: Annotated[float, typer.Option(help="Seconds before the first token.")] = 0.3,
+    tokens_per_second: Annotated[float, typer.Option(help="Output rate.")] = 30.0,
+    response_tokens: Annotated[
+        int, typer.Option(help="Length of generated responses, in words.")
+    ] = 80,
+    script: Annotated[
+        Path | None,
+        typer.Option(
+            help=(
+                "JSON list of responses to cycle through, "
+                'e.g. [{"tool": "change_location", "args": {"to": "hall"}}, {"text": "…"}].'
+            )
+        ),
+    ] = None,
+    rate_limit_rate: Annotated[float, typer.Option(help="Share of 429 responses.")] = 0.0,
+    server_error_rate: Annotated[float, typer.Option(help="Share of 500 responses.")] = 0.0,
+    stall_rate: Annotated[float, typer.Option(help="Share of stalling streams.")] = 0.0,
+    stall_seconds: Annotated[float, typer.Option(help="Duration of a stall.")] = 30.0,
+    seed: Annotated[int | None, typer.Option(help="Seed for error injection.")] = None,
+) -> None:
+    """Run a fake OpenAI-compatible LLM server for load testing.
+
+    Use it with the OpenAI-compatible provider and base URL http://HOST:PORT/v1.
+    """
+    import uvicorn  # noqa: PLC0415
+    from pydantic import TypeAdapter  # noqa: PLC0415
+
+    from llm_gamebook.fake_llm import FakeLlm, FakeLlmOptions, ScriptStep  # noqa: PLC0415
+
+    steps = TypeAdapter(list[ScriptStep]).validate_json(script.read_bytes()) if script else []
+    options = FakeLlmOptions(
+        ttft=ttft,
+        tokens_per_second=tokens_per_second,
+        response_tokens=response_tokens,
+        script=steps,
+        rate_limit_rate=rate_limit_rate,
+        server_error_rate=server_error_rate,
+        stall_rate=stall_rate,
+        stall_seconds=stall_seconds,
+        seed=seed,
+    )
+    uvicorn.run(FakeLlm(options).app, host=host, port=port)
+
+
+@app.command()
+def profile_startup(
+    *,
+    module: Annotated[str, typer.Option(help="The module to import.")] = "llm_gamebook.web.app",
+    top: Annotated[int, typer.Option(help="Number of entries per section.")] = 15,
+) -> None:
+    """Report which imports slow down start-up."""
+    from llm_gamebook.import_profile import profile_imports  # noqa: PLC0415
+
+    try:
+        profile = profile_imports(module)
+    except RuntimeError as err:
+        typer.echo(str(err), err=True)
+        raise typer.Exit(1) from err
+
+    typer.echo(profile.format(top))
+
+
+@app.command()
+def archive(
+    *,
+    inactive_days: Annotated[
+        float, typer.Option(help="Archive sessions without messages for this many days.")
+    ] = 30,
+    database: Annotated[
+        Path | None, typer.Option(help="The database file, defaults to the user data one.")
+    ] = None,
+    vacuum: Annotated[
+        bool, typer.Option(help="Rebuild the database file to return the freed space.")
+    ] = True,
+) -> None:
+    """Move the messages of inactive sessions into compressed archives.
+
+    Archived sessions are still listed, their messages are restored when they're opened.
+    """
+    from llm_gamebook.db.archival import archive_database  # noqa: PLC0415
+
+    report = asyncio.run(archive_database(timedelta(days=inactive_days), database, vacuum=vacuum))
+    typer.echo(report.format())
 
 
 async def run_tui(log_file: Path | None, *, debug: bool) -> None:
@@ -6,6 +6,7 @@ from types import TracebackType
 from typing import Self, cast
 
 from llm_gamebook.logger import logger
+from llm_gamebook.metrics import BUS_MESSAGES_PUBLISHED
 
 from .messages import BaseMessage, MessageHandler
 
@@ -43,8 +44,14 @@ class MessageBus:
         """Remove all subscriptions."""
         self._subs.clear()
 
+    @property
+    def pending_tasks(self) -> int:
+        """Number of async handlers still running."""
+        return len(self._tasks)
+
     def publish(self, message: BaseMessage) -> None:
         self._log.debug("Publish %s", message)
+        BUS_MESSAGES_PUBLISHED.inc(type(message).__name__)
 
         if handlers := self._subs.get(type(message)):
             for handler in handlers:
@@ -0,0 +1,260 @@
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from time import perf_counter
+from typing import ClassVar, Final
+
+type Labels = tuple[str, ...]
+
+CONTENT_TYPE: Final = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: Final = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metric(ABC):
+    kind: ClassVar[str]
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {_escape_help(self.documentation)}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._render_samples()
+
+    @abstractmethod
+    def _render_samples(self) -> Iterator[str]: ...
+
+    def _check_labels(self, labels: Labels) -> None:
+        if len(labels) != len(self.labelnames):
+            msg = f"{self.name} expects labels {self.labelnames}, got {labels}"
+            raise ValueError(msg)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._check_labels(labels)
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield _sample(self.name, self.labelnames, labels, value)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._check_labels(labels)
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._check_labels(labels)
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield _sample(self.name, self.labelnames, labels, value)
+
+
+class _HistogramValues:
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * buckets
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[Labels, _HistogramValues] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if (values := self._values.get(labels)) is None:
+            self._check_labels(labels)
+            values = self._values[labels] = _HistogramValues(len(self.buckets) + 1)
+        values.counts[bisect_left(self.buckets, value)] += 1
+        values.count += 1
+        values.sum += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Generator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, *labels)
+
+    def get_count(self, *labels: str) -> int:
+        values = self._values.get(labels)
+        return values.count if values else 0
+
+    def _render_samples(self) -> Iterator[str]:
+        labelnames = (*self.labelnames, "le")
+        for labels, values in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), values.counts, strict=True):
+                cumulative += count
+                le = _format_value(bound)
+                yield _sample(f"{self.name}_bucket", labelnames, (*labels, le), cumulative)
+            yield _sample(f"{self.name}_sum", self.labelnames, labels, values.sum)
+            yield _sample(f"{self.name}_count", self.labelnames, labels, values.count)
+
+
+class Registry:
+    """Prometheus-compatible metrics registry.
+
+    Recording a sample is a dictionary update, the text exposition is only rendered on scrape.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register[M: Metric](self, metric: M) -> M:
+        if metric.name in self._metrics:
+            msg = f"Metric {metric.name} already registered"
+            raise ValueError(msg)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self, extra: Iterable[Metric] = ()) -> str:
+        """Text exposition of all metrics, `extra` metrics are collected on scrape."""
+        metrics = [*self._metrics.values(), *extra]
+        return "".join(f"{line}\n" for metric in metrics for line in metric.render())
+
+
+def _sample(name: str, labelnames: Labels, labels: Labels, value: float) -> str:
+    if not labelnames:
+        return f"{name} {_format_value(value)}"
+    pairs = ",".join(
+        f'{key}="{_escape_label(val)}"' for key, val in zip(labelnames, labels, strict=True)
+    )
+    return f"{name}{{{pairs}}} {_format_value(value)}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n")
+
+
+REGISTRY: Final = Registry()
+
+BUS_MESSAGES_PUBLISHED: Final = REGISTRY.counter(
+    "llm_gamebook_bus_messages_published_total",
+    "Messages published on the message bus.",
+    ("message_type",),
+)
+GENERATIONS: Final = REGISTRY.counter(
+    "llm_gamebook_generations_total", "Finished response generations.", ("outcome",)
+)
+GENERATION_SECONDS: Final = REGISTRY.histogram(
+    "llm_gamebook_generation_seconds", "Duration of response generations."
+)
+TTFT_SECONDS: Final = REGISTRY.histogram(
+    "llm_gamebook_ttft_seconds", "Time to first token of response generations."
+)
+DB_QUERY_SECONDS: Final = REGISTRY.histogram(
+    "llm_gamebook_db_query_seconds",
+    "Duration of database queries.",
+    ("statement",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+WEBSOCKET_CONNECTIONS: Final = REGISTRY.gauge(
+    "llm_gamebook_websocket_connections", "Open websocket connections."
+)
+WEBSOCKET_SENDS_IN_FLIGHT: Final = REGISTRY.gauge(
+    "llm_gamebook_websocket_sends_in_flight", "Websocket messages waiting to be sent."
+)
+WEBSOCKET_MESSAGES_SENT: Final = REGISTRY.counter(
+    "llm_gamebook_websocket_messages_sent_total", "Websocket messages sent.", ("kind",)
+)
+WEBSOCKET_BYTES_SENT: Final = REGISTRY.counter(
+    "llm_gamebook_websocket_bytes_sent_total",
+    "Payload bytes of websocket messages sent, before compression.",
+    ("encoding",),
+)
+WEBSOCKET_FRAMES_ENCODED: Final = REGISTRY.counter(
+    "llm_gamebook_websocket_frames_encoded_total",
+    "Websocket frames serialised for broadcasting, once per event and encoding for all receivers.",
+    ("kind", "encoding"),
+)
+WEBSOCKET_RESUMES: Final = REGISTRY.counter(
+    "llm_gamebook_websocket_resumes_total",
+    "Resumed websocket streams, by whether missed frames were replayed or a snapshot was sent.",
+    ("result",),
+)
+WEBSOCKET_OVERRUNS: Final = REGISTRY.counter(
+    "llm_gamebook_websocket_overruns_total",
+    "Frame backlogs of slow websocket clients replaced by a snapshot.",
+)
+CACHE_LOOKUPS: Final = REGISTRY.counter(
+    "llm_gamebook_cache_lookups_total", "Lookups of internal caches.", ("cache", "result")
+)
+HEDGED_REQUESTS: Final = REGISTRY.counter(
+    "llm_gamebook_hedged_requests_total",
+    "Model requests of sessions with a fallback model, by hedge reason and winning model.",
+    ("hedge", "winner"),
+)
+CIRCUIT_BREAKER_TRIPS: Final = REGISTRY.counter(
+    "llm_gamebook_circuit_breaker_trips_total",
+    "Circuit breakers opened for failing or slow provider endpoints.",
+    ("provider",),
+)
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Final
+
+from llm_gamebook.db.models import UsageBase
+from llm_gamebook.providers import ModelProvider
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """Model price in USD per million tokens."""
+
+    input: float
+    output: float
+    cache_write: float | None = None
+    """Defaults to the input price."""
+
+    cache_read: float | None = None
+    """Defaults to the input price."""
+
+    def get_cost(self, usage: UsageBase) -> float:
+        """Cost of `usage` in USD, input tokens include cached tokens."""
+        cache_write = self.input if self.cache_write is None else self.cache_write
+        cache_read = self.input if self.cache_read is None else self.cache_read
+        uncached = max(0, usage.input_tokens - usage.cache_write_tokens - usage.cache_read_tokens)
+        cost = (
+            uncached * self.input
+            + usage.cache_write_tokens * cache_write
+            + usage.cache_read_tokens * cache_read
+            + usage.output_tokens * self.output
+        )
+        return cost / 1_000_000
+
+
+FREE: Final = ModelPrice(input=0.0, output=0.0)
+
+type ModelPriceList = dict[ModelProvider, dict[str, ModelPrice]]
+
+# Keyed by model name prefix, the longest matching prefix wins
+PRICES: Final[ModelPriceList] = {
+    ModelProvider.ANTHROPIC: {
+        "claude-3-5-haiku": ModelPrice(0.8, 4.0, cache_write=1.0, cache_read=0.08),
+        "claude-3-7-sonnet": ModelPrice(3.0, 15.0, cache_write=3.75, cache_read=0.3),
+        "claude-haiku-4": ModelPrice(1.0, 5.0, cache_write=1.25, cache_read=0.1),
+        "claude-opus-4": ModelPrice(15.0, 75.0, cache_write=18.75, cache_read=1.5),
+        "claude-opus-4-5": ModelPrice(5.0, 25.0, cache_write=6.25, cache_read=0.5),
+        "claude-sonnet-4": ModelPrice(3.0, 15.0, cache_write=3.75, cache_read=0.3),
+    },
+    ModelProvider.DEEPSEEK: {
+        "deepseek-chat": ModelPrice(0.28, 0.42, cache_read=0.028),
+        "deepseek-reasoner": ModelPrice(0.28, 0.42, cache_read=0.028),
+    },
+    ModelProvider.GOOGLE: {
+        "gemini-2.5-flash": ModelPrice(0.3, 2.5, cache_read=0.03),
+        "gemini-2.5-flash-lite": ModelPrice(0.1, 0.4, cache_read=0.01),
+        "gemini-2.5-pro": ModelPrice(1.25, 10.0, cache_read=0.125),
+    },
+    ModelProvider.MISTRAL: {
+        "mistral-large": ModelPrice(2.0, 6.0),
+        "mistral-medium": ModelPrice(0.4, 2.0),
+        "mistral-small": ModelPrice(0.1, 0.3),
+    },
+    ModelProvider.OLLAMA: {
+        # Local models
+        "": FREE,
+    },
+    ModelProvider.OPENAI: {
+        "gpt-4.1": ModelPrice(2.0, 8.0, cache_read=0.5),
+        "gpt-4.1-mini": ModelPrice(0.4, 1.6, cache_read=0.1),
+        "gpt-4.1-nano": ModelPrice(0.1, 0.4, cache_read=0.025),
+        "gpt-4o": ModelPrice(2.5, 10.0, cache_read=1.25),
+        "gpt-4o-mini": ModelPrice(0.15, 0.6, cache_read=0.075),
+        "gpt-5": ModelPrice(1.25, 10.0, cache_read=0.125),
+        "gpt-5-mini": ModelPrice(0.25, 2.0, cache_read=0.025),
+        "gpt-5-nano": ModelPrice(0.05, 0.4, cache_read=0.005),
+    },
+    ModelProvider.REPLAY: {
+        # Recorded responses
+        "": FREE,
+    },
+    ModelProvider.XAI: {
+        "grok-3": ModelPrice(3.0, 15.0, cache_read=0.75),
+        "grok-3-mini": ModelPrice(0.3, 0.5, cache_read=0.075),
+        "grok-4": ModelPrice(3.0, 15.0, cache_read=0.75),
+    },
+}
+
+
+def get_model_price(
+    provider: ModelProvider, model_name: str, prices: ModelPriceList = PRICES
+) -> ModelPrice | None:
+    """Price of a model, `None` if unknown."""
+    models = prices.get(provider, {})
+    matches = [prefix for prefix in models if model_name.startswith(prefix)]
+    return models[max(matches, key=len)] if matches else None
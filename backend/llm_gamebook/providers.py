@@ -12,6 +12,7 @@ class ModelProvider(enum.StrEnum):
     OPENAI = "openai"
     OPENAI_COMPATIBLE = "openai-compatible"
     OPENROUTER = "openrouter"
+    REPLAY = "replay"
     XAI = "xai"
 
 
@@ -139,6 +140,19 @@ PROVIDERS: Final[ModelProviderList] = {
         supports_extra_body=True,
         default_base_url="https://openrouter.ai/api/v1",
     ),
+    ModelProvider.REPLAY: ModelProviderInfo(
+        # Base URL is a recording file in the recordings directory, e.g. `run.jsonl?speed=10`
+        label="Replay recording",
+        supports_base_url=True,
+        supports_max_tokens=False,
+        supports_temperature=False,
+        supports_top_p=False,
+        supports_presence_penalty=False,
+        supports_frequency_penalty=False,
+        supports_logit_bias=False,
+        supports_extra_headers=False,
+        supports_extra_body=False,
+    ),
     ModelProvider.XAI: ModelProviderInfo(
         label="xAI",
         supports_base_url=False,
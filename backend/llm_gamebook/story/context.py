@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, cast
 
 import jinja2
 
+from llm_gamebook.metrics import CACHE_LOOKUPS
 from llm_gamebook.story.errors import EntityFieldNotFoundError, EntityNotFoundError
 from llm_gamebook.story.schemas import Project
 
@@ -27,6 +28,7 @@ class StoryContext:
         self._project = project
         initial_state = SessionState(session_state)
         self._store = Store(initial_state)
+        self._system_prompt_prefix: str | None = None
 
     @property
     def project(self) -> "Project":
@@ -69,7 +71,25 @@ class StoryContext:
 
     async def get_system_prompt(self) -> str:
         """Render system prompt."""
-        return await self._render_template("system_prompt")
+        prefix = await self.get_system_prompt_prefix()
+        return f"{prefix}\n\n{await self.get_state_prompt()}".strip()
+
+    async def get_system_prompt_prefix(self) -> str:
+        """Render the static part of the system prompt.
+
+        It doesn't depend on the session state, so it stays byte-identical across requests
+        and can be reused by provider prompt caches.
+        """
+        if self._system_prompt_prefix is None:
+            CACHE_LOOKUPS.inc("system_prompt_prefix", "miss")
+            self._system_prompt_prefix = await self._render_template("system_prompt")
+        else:
+            CACHE_LOOKUPS.inc("system_prompt_prefix", "hit")
+        return self._system_prompt_prefix
+
+    async def get_state_prompt(self) -> str:
+        """Render the state-dependent tail of the system prompt."""
+        return await self._render_template("system_state")
 
     async def get_intro_message(self) -> str:
         """Render first message (request for story introduction)."""
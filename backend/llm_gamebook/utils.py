@@ -1,4 +1,7 @@
+import secrets
+import time
 import unicodedata
+from uuid import UUID
 
 import casefy
 
@@ -18,3 +21,33 @@ def normalized_snake_case(text: str) -> str:
 
 def normalized_pascal_case(text: str) -> str:
     return casefy.pascalcase(normalize(text))
+
+
+_uuid7_last: tuple[int, int] = (0, 0)
+
+
+def uuid7() -> UUID:
+    """A time-ordered UUID (RFC 9562 version 7), increasing within the process.
+
+    Keys of rows inserted one after another end up next to each other in the B-tree. Within the
+    same millisecond the 12 bits after the timestamp count up from a random start.
+    """
+    global _uuid7_last  # noqa: PLW0603
+    millis = time.time_ns() // 1_000_000
+    last_millis, last_counter = _uuid7_last
+    if millis > last_millis:
+        counter = secrets.randbits(11)
+    elif last_counter < 0xFFF:
+        millis, counter = last_millis, last_counter + 1
+    else:
+        millis, counter = last_millis + 1, secrets.randbits(11)
+    _uuid7_last = (millis, counter)
+
+    value = (
+        (millis & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return UUID(int=value)
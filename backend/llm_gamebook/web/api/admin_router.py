@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException
+from sqlalchemy.exc import OperationalError
+
+from llm_gamebook.db import vacuum_db
+from llm_gamebook.db.crud.session import purge_sessions as crud_purge_sessions
+from llm_gamebook.engine.message import SessionDeleted
+from llm_gamebook.logger import logger
+from llm_gamebook.web.schemas.admin import SessionPurge, SessionsPurged
+
+from .dependencies import DbEngineDep, DbSessionDep, MessageBusDep
+
+admin_router = APIRouter(prefix="/admin", tags=["admin"])
+
+_log = logger.getChild("admin")
+
+
+@admin_router.post("/sessions/purge")
+async def purge_sessions(
+    purge: SessionPurge,
+    db_engine: DbEngineDep,
+    db_session: DbSessionDep,
+    message_bus: MessageBusDep,
+) -> SessionsPurged:
+    try:
+        session_ids = await crud_purge_sessions(
+            db_session,
+            project_id=purge.project_id,
+            created_before=purge.created_before,
+            inactive_since=purge.inactive_since,
+        )
+    except ValueError as err:
+        raise HTTPException(status_code=422, detail=str(err)) from err
+
+    for session_id in session_ids:
+        message_bus.publish(SessionDeleted(session_id))
+
+    if purge.vacuum and session_ids:
+        # Hand back the connection first, VACUUM needs the database to itself
+        await db_session.close()
+        try:
+            await vacuum_db(db_engine)
+        except OperationalError:
+            # The purge is committed, a busy database only keeps its free pages
+            _log.warning("Failed to vacuum database after purging sessions", exc_info=True)
+
+    return SessionsPurged(count=len(session_ids))
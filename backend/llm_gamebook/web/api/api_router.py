@@ -1,10 +1,14 @@
 from fastapi import APIRouter
 
+from .admin_router import admin_router
 from .model_config_router import model_config_router
 from .project_router import project_router
 from .session_router import session_router
+from .usage_router import usage_router
 
 api_router = APIRouter()
+api_router.include_router(admin_router)
 api_router.include_router(model_config_router)
 api_router.include_router(project_router)
 api_router.include_router(session_router)
+api_router.include_router(usage_router)
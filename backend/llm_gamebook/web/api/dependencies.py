@@ -9,6 +9,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 from llm_gamebook.engine import EngineManager, StoryEngine
 from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.story.project_manager import ProjectManager
+from llm_gamebook.web.websocket.hub import BroadcastHub
 
 
 def _get_db_engine(request: Request) -> AsyncEngine:
@@ -42,17 +43,23 @@ def _get_project_manager(request: Request) -> ProjectManager:
 ProjectManagerDep = Annotated[ProjectManager, Depends(_get_project_manager)]
 
 
-async def _get_story_engine(
-    request: Request,
-    session_id: UUID,
-    db_session: DbSessionDep,
-    project_manager: ProjectManagerDep,
-) -> StoryEngine:
+def _get_engine_manager(request: Request) -> EngineManager:
     engine_manager = request.app.state.engine_mgr
     if not isinstance(engine_manager, EngineManager):
         msg = "engine_mgr not found"
         raise TypeError(msg)
+    return engine_manager
 
+
+EngineManagerDep = Annotated[EngineManager, Depends(_get_engine_manager)]
+
+
+async def _get_story_engine(
+    session_id: UUID,
+    db_session: DbSessionDep,
+    project_manager: ProjectManagerDep,
+    engine_manager: EngineManagerDep,
+) -> StoryEngine:
     try:
         return await engine_manager.get_or_create(session_id, db_session, project_manager)
     except ValueError as err:
@@ -71,3 +78,14 @@ def _get_message_bus(request: Request) -> MessageBus:
 
 
 MessageBusDep = Annotated[MessageBus, Depends(_get_message_bus)]
+
+
+def _get_hub(request: Request) -> BroadcastHub:
+    hub = request.app.state.hub
+    if not isinstance(hub, BroadcastHub):
+        msg = "Broadcast hub not found"
+        raise TypeError(msg)
+    return hub
+
+
+BroadcastHubDep = Annotated[BroadcastHub, Depends(_get_hub)]
@@ -1,13 +1,13 @@
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
+from pydantic import TypeAdapter
 
 from llm_gamebook.db.crud.model_config import create_model_config as crud_create_model_config
 from llm_gamebook.db.crud.model_config import delete_model_config as crud_delete_model_config
 from llm_gamebook.db.crud.model_config import (
     get_model_config,
-    get_model_config_count,
-    get_model_configs,
+    get_model_config_list,
 )
 from llm_gamebook.db.crud.model_config import update_model_config as crud_update_model_config
 from llm_gamebook.db.models import ModelConfig as SqlModelModelConfig
@@ -24,17 +24,16 @@ from llm_gamebook.web.schemas.model_config import (
 
 model_config_router = APIRouter(prefix="/model-configs", tags=["model-configs"])
 
+model_config_list_adapter = TypeAdapter(list[ModelConfig])
+
 
 @model_config_router.get("/")
 async def read_model_configs(
     db_session: DbSessionDep, skip: int = 0, limit: int = 100
 ) -> ModelConfigs:
+    rows, count = await get_model_config_list(db_session, skip, limit)
     return ModelConfigs(
-        data=[
-            ModelConfig.model_validate(c, from_attributes=True)
-            for c in await get_model_configs(db_session, skip, limit)
-        ],
-        count=await get_model_config_count(db_session),
+        data=model_config_list_adapter.validate_python(rows, from_attributes=True), count=count
     )
 
 
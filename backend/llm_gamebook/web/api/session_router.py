@@ -1,17 +1,26 @@
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
+from pydantic import TypeAdapter
 
+from llm_gamebook.db.crud.archive import restore_session
 from llm_gamebook.db.crud.model_config import get_model_config
 from llm_gamebook.db.crud.session import create_session as crud_create_session
+from llm_gamebook.db.crud.session import delete_session as crud_delete_session
 from llm_gamebook.db.crud.session import (
-    get_session_count,
-    get_sessions,
+    get_session,
+    get_session_list,
+    update_session_fallback_config,
     update_session_model_config,
 )
 from llm_gamebook.db.models import Message
 from llm_gamebook.db.models import Session as SqlModelSession
-from llm_gamebook.engine.message import SessionModelConfigChangedMessage
+from llm_gamebook.engine.message import (
+    SessionDeleted,
+    SessionFallbackConfigChangedMessage,
+    SessionModelConfigChangedMessage,
+)
+from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.story.errors import ProjectNotFoundError
 from llm_gamebook.web.schemas.common import ServerMessage
 from llm_gamebook.web.schemas.session import (
@@ -23,30 +32,47 @@ from llm_gamebook.web.schemas.session import (
 )
 from llm_gamebook.web.schemas.session.message import ModelRequest, ModelRequestCreate
 
-from .dependencies import DbSessionDep, MessageBusDep, ProjectManagerDep, StoryEngineDep
+from .dependencies import (
+    DbSessionDep,
+    EngineManagerDep,
+    MessageBusDep,
+    ProjectManagerDep,
+    StoryEngineDep,
+)
 
 session_router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+session_list_adapter = TypeAdapter(list[Session])
+
 
 @session_router.get("/")
 async def read_sessions(
     db_session: DbSessionDep, project_id: str | None = None, skip: int = 0, limit: int = 100
 ) -> Sessions:
-    sessions = await get_sessions(db_session, project_id, skip, limit)
-
+    rows, count = await get_session_list(db_session, project_id, skip, limit)
     return Sessions(
-        data=[Session.model_validate(s, from_attributes=True) for s in sessions],
-        count=await get_session_count(db_session, project_id),
+        data=session_list_adapter.validate_python(rows, from_attributes=True), count=count
     )
 
 
 @session_router.get("/{session_id}", response_model=SessionFull)
-async def read_session(engine: StoryEngineDep, db_session: DbSessionDep) -> SqlModelSession:
-    session = await engine.session_adapter.get_session(db_session)
-
+async def read_session(
+    session_id: UUID,
+    db_session: DbSessionDep,
+    project_manager: ProjectManagerDep,
+    engine_manager: EngineManagerDep,
+) -> SqlModelSession:
+    session = await get_session(db_session, session_id)
     if not session:
-        # If we get this far, the session must be available
-        raise HTTPException(status_code=500, detail="Story session expected")
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.archived_at is not None:
+        await restore_session(db_session, session_id)
+        await db_session.refresh(session)
+
+    # Reading doesn't need an engine, unless a new session has yet to generate its introduction
+    if session.message_count == 0:
+        await engine_manager.get_or_create(session_id, db_session, project_manager)
 
     return session
 
@@ -59,14 +85,22 @@ async def create_session(
     if not model_config:
         raise HTTPException(status_code=404, detail="Model config not found")
 
+    fallback_config = None
+    if session_in.fallback_config_id:
+        fallback_config = await get_model_config(db_session, session_in.fallback_config_id)
+        if not fallback_config:
+            raise HTTPException(status_code=404, detail="Fallback model config not found")
+
     try:
         project = project_manager.get_project(session_in.project_id)
     except ProjectNotFoundError as err:
         raise HTTPException(status_code=404, detail="Project not found") from err
 
-    session = await crud_create_session(db_session, model_config, project.id, session_in.title)
+    session = await crud_create_session(
+        db_session, model_config, project.id, session_in.title, fallback_config
+    )
 
-    return Session.model_validate({**session.model_dump(), "message_count": 0})
+    return Session.model_validate(session, from_attributes=True)
 
 
 @session_router.patch("/{session_id}")
@@ -77,7 +111,9 @@ async def update_session(
     message_bus: MessageBusDep,
 ) -> ServerMessage:
     session_uuid = UUID(session_id)
-    await update_session_model_config(db_session, session_uuid, session_update.config_id)
+    # Don't drop the model config when only the fallback is updated
+    if "config_id" in session_update.model_fields_set:
+        await update_session_model_config(db_session, session_uuid, session_update.config_id)
 
     if session_update.config_id:
         config = await get_model_config(db_session, session_update.config_id)
@@ -89,12 +125,46 @@ async def update_session(
                     provider=config.provider,
                     base_url=config.base_url,
                     api_key=config.api_key,
+                    context_window=config.context_window,
                 ),
             )
 
+    if session_update.model_fields_set & {"fallback_config_id", "hedge_after_seconds"}:
+        await _update_fallback_config(db_session, session_uuid, session_update, message_bus)
+
     return ServerMessage(message="Session updated successfully.")
 
 
+async def _update_fallback_config(
+    db_session: DbSessionDep, session_id: UUID, session_update: SessionUpdate, bus: MessageBus
+) -> None:
+    session = await get_session(db_session, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    config_id = (
+        session_update.fallback_config_id
+        if "fallback_config_id" in session_update.model_fields_set
+        else session.fallback_config_id
+    )
+    config = await get_model_config(db_session, config_id) if config_id else None
+    if config_id and not config:
+        raise HTTPException(status_code=404, detail="Fallback model config not found")
+
+    hedge_after_seconds = session_update.hedge_after_seconds or session.hedge_after_seconds
+    # The commit expires the loaded config, read it before
+    message = SessionFallbackConfigChangedMessage(
+        session_id=session_id,
+        hedge_after_seconds=hedge_after_seconds,
+        model_name=config.model_name if config else None,
+        provider=config.provider if config else None,
+        base_url=config.base_url if config else None,
+        api_key=config.api_key if config else None,
+    )
+    await update_session_fallback_config(db_session, session_id, config_id, hedge_after_seconds)
+    bus.publish(message)
+
+
 @session_router.post("/{session_id}/request", response_model=ModelRequest)
 async def create_model_request(
     engine: StoryEngineDep, db_session: DbSessionDep, message_in: ModelRequestCreate
@@ -102,7 +172,24 @@ async def create_model_request(
     return await engine.session_adapter.create_user_request(db_session, message_in)
 
 
+@session_router.post("/{session_id}/cancel")
+async def cancel_response(session_id: UUID, engine_manager: EngineManagerDep) -> ServerMessage:
+    # Without an engine there is nothing to cancel, don't create one
+    try:
+        engine = engine_manager.get(session_id)
+    except KeyError:
+        engine = None
+    if engine is None or not engine.cancel_response():
+        raise HTTPException(status_code=409, detail="No response in progress")
+    return ServerMessage(message="Response cancelled.")
+
+
 @session_router.delete("/{session_id}")
-async def delete_session(engine: StoryEngineDep, db_session: DbSessionDep) -> ServerMessage:
-    await engine.session_adapter.delete_session(db_session)
+async def delete_session(
+    session_id: UUID, db_session: DbSessionDep, message_bus: MessageBusDep
+) -> ServerMessage:
+    if not await crud_delete_session(db_session, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    message_bus.publish(SessionDeleted(session_id))
     return ServerMessage(message="Story session deleted successfully.")
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException
+
+from llm_gamebook.db.crud.session import get_session_titles
+from llm_gamebook.db.crud.usage import (
+    UsageRow,
+    get_usage_by_model_config,
+    get_usage_by_project,
+    get_usage_by_session,
+)
+from llm_gamebook.pricing import get_model_price
+from llm_gamebook.web.schemas.usage import (
+    ModelConfigUsage,
+    ModelConfigUsages,
+    ProjectUsage,
+    ProjectUsages,
+    SessionUsage,
+    SessionUsages,
+    UsageTotals,
+)
+
+from .dependencies import DbSessionDep
+
+usage_router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+@usage_router.get("/sessions/")
+async def read_session_usages(
+    db_session: DbSessionDep, project_id: str | None = None, skip: int = 0, limit: int = 100
+) -> SessionUsages:
+    totals = _sum_usage(await get_usage_by_session(db_session, project_id))
+    session_ids = _sort_by_cost(totals)[skip : skip + limit]
+    titles = {
+        sid: (title, pid) for sid, title, pid in await get_session_titles(db_session, session_ids)
+    }
+
+    return SessionUsages(
+        data=[
+            SessionUsage(
+                **totals[sid].model_dump(),
+                session_id=sid,
+                title=titles[sid][0],
+                project_id=titles[sid][1],
+            )
+            for sid in session_ids
+        ],
+        count=len(totals),
+    )
+
+
+@usage_router.get("/sessions/{session_id}")
+async def read_session_usage(db_session: DbSessionDep, session_id: UUID) -> SessionUsage:
+    titles = await get_session_titles(db_session, [session_id])
+    if not titles:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    _, title, project_id = titles[0]
+    totals = _sum_usage(await get_usage_by_session(db_session, session_id=session_id))
+    total = totals.get(session_id, UsageTotals())
+
+    return SessionUsage(
+        **total.model_dump(), session_id=session_id, title=title, project_id=project_id
+    )
+
+
+@usage_router.get("/projects/")
+async def read_project_usages(db_session: DbSessionDep) -> ProjectUsages:
+    totals = _sum_usage(await get_usage_by_project(db_session))
+    return ProjectUsages(
+        data=[
+            ProjectUsage(**totals[pid].model_dump(), project_id=pid)
+            for pid in _sort_by_cost(totals)
+        ],
+        count=len(totals),
+    )
+
+
+@usage_router.get("/model-configs/")
+async def read_model_config_usages(db_session: DbSessionDep) -> ModelConfigUsages:
+    totals = _sum_usage(await get_usage_by_model_config(db_session))
+    return ModelConfigUsages(
+        data=[
+            ModelConfigUsage(**totals[cid].model_dump(), config_id=cid)
+            for cid in _sort_by_cost(totals)
+        ],
+        count=len(totals),
+    )
+
+
+def _sum_usage[K](rows: Iterable[UsageRow[K]]) -> dict[K, UsageTotals]:
+    totals: defaultdict[K, UsageTotals] = defaultdict(UsageTotals)
+
+    # The rows are summed per model already, a key has a row for each model it used
+    for key, provider, model_name, usage in rows:
+        total = totals[key]
+        total.requests += usage.requests
+        total.input_tokens += usage.input_tokens
+        total.output_tokens += usage.output_tokens
+        total.cache_write_tokens += usage.cache_write_tokens
+        total.cache_read_tokens += usage.cache_read_tokens
+
+        price = get_model_price(provider, model_name) if provider and model_name else None
+        if price is None:
+            total.unpriced_requests += usage.requests
+        else:
+            total.cost += price.get_cost(usage)
+
+    return totals
+
+
+def _sort_by_cost[K](totals: dict[K, UsageTotals]) -> list[K]:
+    """Most expensive first, ties are broken by token count."""
+    return sorted(
+        totals,
+        key=lambda key: (totals[key].cost, totals[key].input_tokens + totals[key].output_tokens),
+        reverse=True,
+    )
@@ -1,5 +1,5 @@
 import logging
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -9,39 +9,58 @@ from starlette.types import Lifespan
 
 from llm_gamebook.constants import PROJECT_NAME, PROJECTS_PATH, USER_DATA_PATH
 from llm_gamebook.db import create_async_db_engine
-from llm_gamebook.engine import EngineManager
+from llm_gamebook.engine import EngineManager, create_recording_model_factory
 from llm_gamebook.logger import setup_logger
 from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.story.project_manager import ProjectManager
 
 from .api import api_router
+from .metrics import metrics_router
 from .schemas.websocket.openapi import add_websocket_schema
 from .websocket import websocket_router
+from .websocket.hub import BroadcastHub
 
 
 @asynccontextmanager
 async def app_lifespan(app: FastAPI) -> AsyncIterator[None]:
-    add_websocket_schema(app.openapi())
-
     USER_DATA_PATH.mkdir(parents=True, exist_ok=True)
     PROJECTS_PATH.mkdir(parents=True, exist_ok=True)
 
+    record_file: Path | None = app.state.record_file
+    model_factory = create_recording_model_factory(record_file) if record_file else None
+
     async with (
         create_async_db_engine() as db_engine,
         MessageBus() as bus,
-        EngineManager(bus) as engine_mgr,
+        EngineManager(bus, model_factory=model_factory) as engine_mgr,
+        BroadcastHub(bus, debug=app.state.debug) as hub,
     ):
         app.state.db_engine = db_engine
         app.state.bus = bus
         app.state.engine_mgr = engine_mgr
+        app.state.hub = hub
         app.state.project_mgr = ProjectManager()
         yield
 
 
+def _get_openapi(app: FastAPI) -> Callable[[], dict[str, object]]:
+    """Generate the OpenAPI schema on first request instead of on start-up."""
+
+    def openapi() -> dict[str, object]:
+        if app.openapi_schema is None:
+            schema = FastAPI.openapi(app)  # caches the schema on the app
+            add_websocket_schema(schema)
+            return schema
+        return app.openapi_schema
+
+    return openapi
+
+
 def create_app(
     log_file: Path | None = None,
     *,
     debug: bool = False,
+    record_file: Path | None = None,
     lifespan: Lifespan[FastAPI] | None = None,
 ) -> FastAPI:
     uvicorn_logger = logging.getLogger("uvicorn.error")
@@ -49,6 +68,9 @@ def create_app(
     setup_logger("web", log_level, log_file)
 
     app = FastAPI(title=PROJECT_NAME, lifespan=lifespan or app_lifespan)
+    app.openapi = _get_openapi(app)  # type: ignore[method-assign]
+    app.state.debug = debug
+    app.state.record_file = record_file
 
     @app.get("/", include_in_schema=False)
     async def get() -> HTMLResponse:
@@ -56,5 +78,6 @@ def create_app(
 
     app.include_router(api_router, prefix="/api")
     app.include_router(websocket_router, prefix="/ws")
+    app.include_router(metrics_router)
 
     return app
@@ -7,5 +7,10 @@ from .app import create_app
 
 is_debug = os.getenv("LLM_GAMEBOOK_DEBUG", "True").lower() in {"1", "true", "yes"}
 log_file = os.getenv("LLM_GAMEBOOK_LOG_FILE")
+record_file = os.getenv("LLM_GAMEBOOK_RECORD_FILE")
 
-app = create_app(Path(log_file) if log_file else None, debug=is_debug)
+app = create_app(
+    Path(log_file) if log_file else None,
+    debug=is_debug,
+    record_file=Path(record_file) if record_file else None,
+)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from llm_gamebook.metrics import CONTENT_TYPE, REGISTRY, Gauge
+
+from .api.dependencies import BroadcastHubDep, EngineManagerDep, MessageBusDep
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics(
+    engine_manager: EngineManagerDep, bus: MessageBusDep, hub: BroadcastHubDep
+) -> PlainTextResponse:
+    engines = Gauge("llm_gamebook_active_engines", "Story engines held in memory.")
+    engines.set(engine_manager.engine_count)
+    bus_tasks = Gauge("llm_gamebook_bus_pending_tasks", "Async message bus handlers still running.")
+    bus_tasks.set(bus.pending_tasks)
+    pending, max_pending = hub.get_pending_frames()
+    frames = Gauge("llm_gamebook_websocket_pending_frames", "Frames queued for websocket sends.")
+    frames.set(pending)
+    max_frames = Gauge(
+        "llm_gamebook_websocket_max_pending_frames",
+        "Frames queued for the websocket connection furthest behind.",
+    )
+    max_frames.set(max_pending)
+
+    return PlainTextResponse(
+        REGISTRY.render((engines, bus_tasks, frames, max_frames)), media_type=CONTENT_TYPE
+    )
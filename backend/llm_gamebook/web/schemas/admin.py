@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SessionPurge(BaseModel):
+    """Filters of the sessions to purge, a session is purged if it matches all given filters."""
+
+    project_id: str | None = None
+    """Purge sessions of this project."""
+
+    created_before: datetime | None = None
+    """Purge sessions created before this time."""
+
+    inactive_since: datetime | None = None
+    """Purge sessions without a message since this time."""
+
+    vacuum: bool = True
+    """Rebuild the database file afterwards, returning the freed space to the file system."""
+
+
+class SessionsPurged(BaseModel):
+    """The result of a purge."""
+
+    count: int
+    """The number of purged sessions."""
@@ -62,6 +62,12 @@ class ModelResponse(BaseModel):
     finish_reason: FinishReason | None = None
     """Reason the model finished generating the response."""
 
+    ttft_seconds: float | None = None
+    """Time to first token in seconds."""
+
+    tokens_per_second: float | None = None
+    """Output token throughput while streaming."""
+
 
 type ModelMessage = Annotated[ModelRequest | ModelResponse, Discriminator("kind")]
 """Any message sent to or returned by an LLM."""
@@ -21,6 +21,9 @@ class SessionCreate(BaseSession):
     project_id: str
     """The ID of the project associated with this session."""
 
+    fallback_config_id: UUID | None = None
+    """The ID of the model config asked when the primary is slow or failing."""
+
 
 class Session(BaseSession):
     """A chat session with an LLM."""
@@ -33,12 +36,27 @@ class Session(BaseSession):
     project_id: str
     """The ID of the project associated with this session."""
 
+    fallback_config_id: UUID | None = None
+    """The ID of the model config asked when the primary is slow or failing."""
+
+    hedge_after_seconds: float = 5.0
+    """Time to first token after which the request is hedged with the fallback model."""
+
     timestamp: datetime = Field(default_factory=datetime.now)
     """The timestamp of the session."""
 
     message_count: int
     """The number of messages in this session."""
 
+    last_message_at: datetime | None = None
+    """The timestamp of the latest message, `null` if the session wasn't played yet."""
+
+    input_tokens: int = 0
+    """The input tokens of all responses in this session."""
+
+    output_tokens: int = 0
+    """The output tokens of all responses in this session."""
+
 
 class SessionUpdate(BaseSession):
     """Update fields for a session."""
@@ -46,6 +64,12 @@ class SessionUpdate(BaseSession):
     config_id: UUID | None = None
     """The ID of the model config associated with this session."""
 
+    fallback_config_id: UUID | None = None
+    """The ID of the fallback model config, only updated if set. `null` removes the fallback."""
+
+    hedge_after_seconds: float | None = Field(default=None, gt=0)
+    """Time to first token after which the request is hedged with the fallback model."""
+
 
 class SessionFull(Session):
     """A chat session with an LLM including the message history."""
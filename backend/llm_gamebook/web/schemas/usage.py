@@ -0,0 +1,66 @@
+from collections.abc import Sequence
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class UsageTotals(BaseModel):
+    """Token usage and cost summed over model requests."""
+
+    requests: int = 0
+    """The number of model requests."""
+
+    input_tokens: int = 0
+    """Input tokens, including cached tokens."""
+
+    output_tokens: int = 0
+    cache_write_tokens: int = 0
+    cache_read_tokens: int = 0
+
+    cost: float = 0.0
+    """The cost in USD of requests with a known model price."""
+
+    unpriced_requests: int = 0
+    """The number of requests without a known model price, not included in the cost."""
+
+
+class SessionUsage(UsageTotals):
+    """Usage of a session."""
+
+    session_id: UUID
+    title: str | None = None
+    project_id: str
+
+
+class ProjectUsage(UsageTotals):
+    """Usage of all sessions of a project."""
+
+    project_id: str
+
+
+class ModelConfigUsage(UsageTotals):
+    """Usage of all sessions using a model config."""
+
+    config_id: UUID | None
+    """The model config ID, `None` for sessions without model config."""
+
+
+class SessionUsages(BaseModel):
+    """Session usages, most expensive first."""
+
+    data: Sequence[SessionUsage]
+    count: int
+
+
+class ProjectUsages(BaseModel):
+    """Project usages, most expensive first."""
+
+    data: Sequence[ProjectUsage]
+    count: int
+
+
+class ModelConfigUsages(BaseModel):
+    """Model config usages, most expensive first."""
+
+    data: Sequence[ModelConfigUsage]
+    count: int
@@ -9,6 +9,8 @@ from llm_gamebook.web.schemas.session.part import ModelResponsePart
 
 if TYPE_CHECKING:
     from llm_gamebook.engine.message import (
+        ResponseQueuedMessage,
+        ResponseTimingMessage,
         StreamMessageMessage,
         StreamPartDeltaMessage,
         StreamPartMessage,
@@ -21,6 +23,8 @@ class BaseWebSocketMessage(BaseModel):
 
 class BaseSessionWebSocketMessage(BaseModel):
     session_id: UUID
+    seq: int | None = None
+    """Position in the frame stream of the session, see `WebSocketResumeMessage`."""
 
 
 # --- Server messages ------------------------------------------------------------------------------
@@ -36,6 +40,9 @@ class WebSocketErrorMessage(BaseWebSocketMessage):
     """An error notification."""
 
     session_id: UUID | None = None
+    seq: int | None = None
+    """Position in the frame stream of the session, only set for session errors."""
+
     kind: Literal["error"] = "error"
     name: str
     message: str
@@ -49,7 +56,45 @@ class WebSocketStreamStatusMessage(BaseSessionWebSocketMessage):
     """A status update."""
 
     kind: Literal["stream_status"] = "stream_status"
-    status: Literal["started", "stopped"]
+    status: Literal["started", "stopped", "cancelled"]
+
+
+class WebSocketStreamQueuedMessage(BaseSessionWebSocketMessage):
+    """A queue position update while the request waits for the LLM provider."""
+
+    kind: Literal["stream_queued"] = "stream_queued"
+    position: int
+    """Position in the request queue, 0 once the request left the queue."""
+
+    wait_seconds: float
+    """Time spent in the queue so far."""
+
+    @classmethod
+    def from_message(cls, msg: "ResponseQueuedMessage") -> Self:
+        return cls.model_validate(msg, from_attributes=True)
+
+
+class WebSocketStreamTimingMessage(BaseSessionWebSocketMessage):
+    """A latency summary of a finished response, only sent in debug mode."""
+
+    kind: Literal["stream_timing"] = "stream_timing"
+    ttft_seconds: float | None
+    """Time to first token of the first model request."""
+
+    tokens_per_second: float | None
+    """Output token throughput while streaming."""
+
+    spans: dict[str, float]
+    """Phase durations in seconds."""
+
+    @classmethod
+    def from_message(cls, msg: "ResponseTimingMessage") -> Self:
+        return cls(
+            session_id=msg.session_id,
+            ttft_seconds=msg.ttft_seconds,
+            tokens_per_second=msg.tokens_per_second,
+            spans=dict(msg.spans),
+        )
 
 
 class WebSocketStreamMessageMessage(BaseSessionWebSocketMessage):
@@ -93,13 +138,34 @@ class WebSocketStreamPartDeltaMessage(BaseSessionWebSocketMessage):
         )
 
 
+class WebSocketStreamSnapshotMessage(BaseSessionWebSocketMessage):
+    """The current response of a session, compacted for a client that resumed too late.
+
+    Sent instead of the missed frames once they are no longer buffered. Clients discard what
+    they streamed of the response and apply `messages`, `parts` and `deltas` in order. `seq`
+    is the last frame covered by the snapshot.
+    """
+
+    kind: Literal["stream_snapshot"] = "stream_snapshot"
+    status: Literal["started", "stopped", "cancelled"] | None = None
+    """Status of the latest response, `None` if there was none."""
+
+    messages: list[WebSocketStreamMessageMessage]
+    parts: list[WebSocketStreamPartMessage]
+    deltas: list[WebSocketStreamPartDeltaMessage]
+    """Streamed content per part, merged into a single delta."""
+
+
 type WebSocketServerMessage = Annotated[
     WebSocketPongMessage
     | WebSocketErrorMessage
     | WebSocketStreamStatusMessage
+    | WebSocketStreamQueuedMessage
+    | WebSocketStreamTimingMessage
     | WebSocketStreamMessageMessage
     | WebSocketStreamPartMessage
-    | WebSocketStreamPartDeltaMessage,
+    | WebSocketStreamPartDeltaMessage
+    | WebSocketStreamSnapshotMessage,
     Discriminator("kind"),
 ]
 """A WebSocket message sent from the backend."""
@@ -113,12 +179,28 @@ class WebSocketPingMessage(BaseWebSocketMessage):
     kind: Literal["ping"] = "ping"
 
 
+class WebSocketCancelMessage(BaseWebSocketMessage):
+    """A request to cancel the response in progress."""
+
+    kind: Literal["cancel"] = "cancel"
+    session_id: UUID
+
+
+class WebSocketResumeMessage(BaseWebSocketMessage):
+    """A request for the frames of a session missed while disconnected."""
+
+    kind: Literal["resume"] = "resume"
+    session_id: UUID
+    seq: int
+    """The last frame received, 0 for none."""
+
+
 class WebSocketDummyMessage(BaseWebSocketMessage):
     kind: Literal["dummy"] = "dummy"
 
 
 type WebSocketClientMessage = Annotated[
-    WebSocketPingMessage | WebSocketDummyMessage,
+    WebSocketPingMessage | WebSocketCancelMessage | WebSocketResumeMessage | WebSocketDummyMessage,
     Discriminator("kind"),
 ]
 """A WebSocket message sent from the frontend."""
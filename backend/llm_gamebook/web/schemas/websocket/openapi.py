@@ -58,6 +58,14 @@ def add_websocket_schema(schema: dict[str, object]) -> None:
                 "receive": {"$ref": f"#/components/schemas/{WebSocketClientMessage.__name__}"},
             },
         },
+        {
+            "name": "Spectator",
+            "path": "/ws/spectate/{session_id}",
+            "messages": {
+                "send": {"$ref": f"#/components/schemas/{WebSocketServerMessage.__name__}"},
+                "receive": {"$ref": f"#/components/schemas/{WebSocketClientMessage.__name__}"},
+            },
+        },
     ]
 
     _fix_refs(schema)
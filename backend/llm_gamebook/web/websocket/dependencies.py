@@ -1,13 +1,14 @@
-from collections.abc import AsyncIterator
 from typing import Annotated
 
 from fastapi import Depends, WebSocket
 from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
+from llm_gamebook.db import DbSessionFactory, create_db_session_factory
 from llm_gamebook.engine import EngineManager
 from llm_gamebook.message_bus import MessageBus
 
+from .hub import BroadcastHub
+
 
 def _get_db_engine(websocket: WebSocket) -> AsyncEngine:
     db_engine = websocket.app.state.db_engine
@@ -21,12 +22,11 @@ def _get_db_engine(websocket: WebSocket) -> AsyncEngine:
 DbEngineDep = Annotated[AsyncEngine, Depends(_get_db_engine)]
 
 
-async def _get_db_session(db_engine: DbEngineDep) -> AsyncIterator[AsyncDbSession]:
-    async with AsyncDbSession(db_engine) as db_session:
-        yield db_session
+def _get_db_session_factory(db_engine: DbEngineDep) -> DbSessionFactory:
+    return create_db_session_factory(db_engine)
 
 
-DbSessionDep = Annotated[AsyncDbSession, Depends(_get_db_session)]
+DbSessionFactoryDep = Annotated[DbSessionFactory, Depends(_get_db_session_factory)]
 
 
 def _get_message_bus(websocket: WebSocket) -> MessageBus:
@@ -51,3 +51,15 @@ async def _get_engine_mgr(websocket: WebSocket) -> EngineManager:
 
 
 StoryEngineManagerDep = Annotated[EngineManager, Depends(_get_engine_mgr)]
+
+
+def _get_hub(websocket: WebSocket) -> BroadcastHub:
+    hub = websocket.app.state.hub
+    if not isinstance(hub, BroadcastHub):
+        msg = "Broadcast hub not found"
+        raise TypeError(msg)
+
+    return hub
+
+
+BroadcastHubDep = Annotated[BroadcastHub, Depends(_get_hub)]
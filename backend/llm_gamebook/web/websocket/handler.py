@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import suppress
 from typing import TYPE_CHECKING
 from uuid import UUID
 
@@ -5,32 +7,30 @@ from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
 from openai import APIError
 from pydantic import TypeAdapter, ValidationError
-from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
-
-from llm_gamebook.engine.message import (
-    EngineCreated,
-    ResponseErrorMessage,
-    ResponseStartedMessage,
-    ResponseStoppedMessage,
-    ResponseUserRequestMessage,
-    StreamMessageMessage,
-    StreamPartDeltaMessage,
-    StreamPartMessage,
-)
+
+from llm_gamebook.db import DbSessionFactory
+from llm_gamebook.engine.message import EngineCreated, ResponseUserRequestMessage
 from llm_gamebook.logger import logger
 from llm_gamebook.message_bus import BusSubscriber, MessageBus
+from llm_gamebook.metrics import (
+    WEBSOCKET_BYTES_SENT,
+    WEBSOCKET_CONNECTIONS,
+    WEBSOCKET_MESSAGES_SENT,
+    WEBSOCKET_SENDS_IN_FLIGHT,
+)
 from llm_gamebook.web.schemas.websocket.message import (
+    WebSocketCancelMessage,
     WebSocketClientMessage,
     WebSocketErrorMessage,
     WebSocketPingMessage,
     WebSocketPongMessage,
+    WebSocketResumeMessage,
     WebSocketServerMessage,
-    WebSocketStreamMessageMessage,
-    WebSocketStreamPartDeltaMessage,
-    WebSocketStreamPartMessage,
-    WebSocketStreamStatusMessage,
 )
 
+from .binary import BINARY_SUBPROTOCOL
+from .hub import BroadcastHub, Frame, Subscription
+
 if TYPE_CHECKING:
     from llm_gamebook.engine.engine import StoryEngine
     from llm_gamebook.engine.manager import EngineManager
@@ -42,31 +42,50 @@ _log = logger.getChild("websocket")
 
 
 class WebSocketHandler(BusSubscriber):
-    """Handles WebSocket connections for chat sessions."""
+    """Handles WebSocket connections for chat sessions.
+
+    Engine events reach the connection through the broadcast hub. With a `session_id`, the
+    connection is a read-only spectator of that session: it neither triggers nor cancels
+    responses. Clients requesting the `BINARY_SUBPROTOCOL` receive MessagePack frames, see
+    `encode_binary`, and still send JSON text.
+
+    Connections can stay open for hours, so no database session is held for their lifetime.
+    Every operation opens its own session from `db_sessions`.
+    """
 
     def __init__(
-        self, db_session: AsyncDbSession, engine_mgr: "EngineManager", bus: MessageBus
+        self,
+        db_sessions: DbSessionFactory,
+        engine_mgr: "EngineManager",
+        bus: MessageBus,
+        hub: BroadcastHub,
+        *,
+        session_id: UUID | None = None,
     ) -> None:
-        self._db_session = db_session
+        self._db_sessions = db_sessions
         self._engine_mgr = engine_mgr
         self._bus = bus
+        self._hub = hub
         self._websocket: WebSocket
+        self._subscription = Subscription(session_id)
+        self._spectator = session_id is not None
+        self._binary = False
 
-        self._subscribe(EngineCreated, self._on_engine_created)
-        self._subscribe(ResponseUserRequestMessage, self._on_engine_response_user_request)
-        self._subscribe(ResponseStartedMessage, self._on_engine_response_started)
-        self._subscribe(ResponseStoppedMessage, self._on_engine_response_stopped)
-        self._subscribe(ResponseErrorMessage, self._on_engine_response_error)
-        self._subscribe(StreamMessageMessage, self._on_engine_stream_message)
-        self._subscribe(StreamPartMessage, self._on_engine_stream_part)
-        self._subscribe(StreamPartDeltaMessage, self._on_engine_stream_part_delta)
+        if not self._spectator:
+            self._subscribe(EngineCreated, self._on_engine_created)
+            self._subscribe(ResponseUserRequestMessage, self._on_engine_response_user_request)
 
     async def handle_connection(self, websocket: WebSocket) -> None:
         """Main connection handler for WebSocket connections."""
+        self._websocket = websocket
+        self._binary = BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", ())
+        connected = False
         try:
-            self._websocket = websocket
-            await self._websocket.accept()
-            await self._handle_messages()
+            await self._websocket.accept(subprotocol=BINARY_SUBPROTOCOL if self._binary else None)
+            WEBSOCKET_CONNECTIONS.inc()
+            connected = True
+            with self._hub.subscribe(self._subscription):
+                await self._serve()
         except WebSocketDisconnect:
             pass
         except Exception as exc:
@@ -74,14 +93,33 @@ class WebSocketHandler(BusSubscriber):
             await self._send_message(error_message)
             raise
         finally:
+            if connected:
+                WEBSOCKET_CONNECTIONS.dec()
             self.close()
 
+    async def _serve(self) -> None:
+        """Send broadcast frames while handling incoming messages."""
+        sender = asyncio.create_task(self._send_frames())
+        try:
+            await self._handle_messages()
+        finally:
+            sender.cancel()
+            with suppress(asyncio.CancelledError):
+                await sender
+
+    async def _send_frames(self) -> None:
+        """Send the frames queued by the hub, one at a time to keep their order."""
+        while True:
+            await self._send_frame(await self._subscription.get())
+
     async def _send_introduction_if_needed(self, session_id: UUID) -> None:
         """Generate introduction message if this is a new session."""
         engine = self._engine_mgr.get(session_id)
-        message_count = await engine.session_adapter.get_message_count(self._db_session)
+        async with self._db_sessions() as db_session:
+            message_count = await engine.session_adapter.get_message_count(db_session)
         if message_count == 0:
-            await self._generate_response(engine)
+            # The introduction is keyed by the session ID
+            await self._generate_response(engine, session_id)
 
     async def _handle_messages(self) -> None:
         """Handle incoming WebSocket messages."""
@@ -94,11 +132,33 @@ class WebSocketHandler(BusSubscriber):
             else:
                 if isinstance(msg, WebSocketPingMessage):
                     await self._send_message(WebSocketPongMessage())
+                elif isinstance(msg, WebSocketCancelMessage) and not self._spectator:
+                    self._cancel_response(msg.session_id)
+                elif isinstance(msg, WebSocketResumeMessage):
+                    self._resume(msg.session_id, msg.seq)
 
-    async def _generate_response(self, engine: "StoryEngine") -> None:
+    def _cancel_response(self, session_id: UUID) -> None:
+        """Cancel the response in progress for a session."""
+        try:
+            engine = self._engine_mgr.get(session_id)
+        except KeyError:
+            _log.warning("Cancel requested for unknown session %s", session_id)
+        else:
+            engine.cancel_response()
+
+    def _resume(self, session_id: UUID, seq: int) -> None:
+        """Queue the frames of a session missed since `seq`."""
+        if self._subscription.session_id not in {None, session_id}:
+            _log.warning(
+                "Spectator of %s can't resume %s", self._subscription.session_id, session_id
+            )
+            return
+        self._hub.resume(self._subscription, session_id, seq)
+
+    async def _generate_response(self, engine: "StoryEngine", request_id: UUID) -> None:
         """Generate response from engine and notify Web UI."""
         try:
-            await engine.generate_response(self._db_session)
+            await engine.request_response(self._db_sessions, request_id)
         except APIError as err:
             msg = WebSocketErrorMessage(
                 name=type(err).__name__,
@@ -107,9 +167,23 @@ class WebSocketHandler(BusSubscriber):
             await self._send_message(msg)
 
     async def _send_message(self, message: WebSocketServerMessage) -> None:
-        """Send a WebSocket message."""
+        """Send a WebSocket message to this connection only."""
+        await self._send_frame(Frame(message))
+
+    async def _send_frame(self, frame: Frame) -> None:
         if self._websocket.client_state == WebSocketState.CONNECTED:
-            await self._websocket.send_text(message.model_dump_json())
+            WEBSOCKET_SENDS_IN_FLIGHT.inc()
+            try:
+                if self._binary:
+                    data = self._subscription.get_data(frame)
+                    await self._websocket.send_bytes(data)
+                    WEBSOCKET_BYTES_SENT.inc("msgpack", amount=len(data))
+                else:
+                    await self._websocket.send_text(frame.text)
+                    WEBSOCKET_BYTES_SENT.inc("json", amount=frame.text_size)
+            finally:
+                WEBSOCKET_SENDS_IN_FLIGHT.dec()
+            WEBSOCKET_MESSAGES_SENT.inc(frame.kind)
         else:
             _log.warning("Trying to send message while not connected")
 
@@ -117,28 +191,5 @@ class WebSocketHandler(BusSubscriber):
         await self._send_introduction_if_needed(message.session_id)
 
     async def _on_engine_response_user_request(self, message: ResponseUserRequestMessage) -> None:
-        session_id = message.session_id
-        await self._generate_response(self._engine_mgr.get(session_id))
-
-    async def _on_engine_response_started(self, message: ResponseStartedMessage) -> None:
-        session_id = message.session_id
-        ws_msg = WebSocketStreamStatusMessage(session_id=session_id, status="started")
-        await self._send_message(ws_msg)
-
-    async def _on_engine_response_stopped(self, message: ResponseStoppedMessage) -> None:
-        session_id = message.session_id
-        ws_msg = WebSocketStreamStatusMessage(session_id=session_id, status="stopped")
-        await self._send_message(ws_msg)
-
-    async def _on_engine_response_error(self, message: ResponseErrorMessage) -> None:
-        ws_msg = WebSocketErrorMessage.from_exception(message.session_id, message.error)
-        await self._send_message(ws_msg)
-
-    async def _on_engine_stream_message(self, message: StreamMessageMessage) -> None:
-        await self._send_message(WebSocketStreamMessageMessage.from_message(message))
-
-    async def _on_engine_stream_part(self, message: StreamPartMessage) -> None:
-        await self._send_message(WebSocketStreamPartMessage.from_message(message))
-
-    async def _on_engine_stream_part_delta(self, message: StreamPartDeltaMessage) -> None:
-        await self._send_message(WebSocketStreamPartDeltaMessage.from_message(message))
+        engine = self._engine_mgr.get(message.session_id)
+        await self._generate_response(engine, message.message_id)
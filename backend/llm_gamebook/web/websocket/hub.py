@@ -0,0 +1,476 @@
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Callable, Generator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cached_property, partial
+from itertools import islice
+from types import TracebackType
+from typing import Final, Self
+from uuid import UUID
+
+from llm_gamebook.engine.message import (
+    ContentDelta,
+    Delta,
+    ResponseCancelledMessage,
+    ResponseErrorMessage,
+    ResponseQueuedMessage,
+    ResponseStartedMessage,
+    ResponseStoppedMessage,
+    ResponseTimingMessage,
+    SessionDeleted,
+    StreamMessageMessage,
+    StreamPartDeltaMessage,
+    StreamPartMessage,
+    ToolArgsDelta,
+    ToolNameDelta,
+)
+from llm_gamebook.logger import logger
+from llm_gamebook.message_bus import BaseMessage, MessageBus
+from llm_gamebook.metrics import (
+    WEBSOCKET_FRAMES_ENCODED,
+    WEBSOCKET_OVERRUNS,
+    WEBSOCKET_RESUMES,
+)
+from llm_gamebook.web.schemas.websocket.message import (
+    WebSocketErrorMessage,
+    WebSocketServerMessage,
+    WebSocketStreamMessageMessage,
+    WebSocketStreamPartDeltaMessage,
+    WebSocketStreamPartMessage,
+    WebSocketStreamQueuedMessage,
+    WebSocketStreamSnapshotMessage,
+    WebSocketStreamStatusMessage,
+    WebSocketStreamTimingMessage,
+)
+
+from .binary import encode_binary
+
+type SessionMessage = (
+    WebSocketErrorMessage
+    | WebSocketStreamStatusMessage
+    | WebSocketStreamQueuedMessage
+    | WebSocketStreamTimingMessage
+    | WebSocketStreamMessageMessage
+    | WebSocketStreamPartMessage
+    | WebSocketStreamPartDeltaMessage
+)
+"""A server message about a session, numbered in the frame stream of the session."""
+
+BUFFER_SIZE: Final = 512
+"""Recent frames kept per session for resuming clients."""
+
+MAX_SESSIONS: Final = 256
+"""Sessions with a frame buffer, the least recently active ones are dropped."""
+
+MAX_PENDING: Final = 1024
+"""Frames queued per connection, a client falling further behind gets a snapshot instead."""
+
+_log = logger.getChild("websocket-hub")
+
+
+@dataclass(frozen=True)
+class Frame:
+    """A server message shared by all receiving connections.
+
+    Each encoding is serialised at most once, on first use.
+    """
+
+    message: WebSocketServerMessage
+    handles: Mapping[UUID, int] = field(default_factory=dict)
+    """Integer handles of the ids in the message, for the binary encoding."""
+
+    announced: frozenset[int] = frozenset()
+    """Handles introduced by the message, the others refer to earlier messages."""
+
+    @property
+    def kind(self) -> str:
+        return self.message.kind
+
+    @property
+    def session_id(self) -> UUID | None:
+        session_id: UUID | None = getattr(self.message, "session_id", None)
+        return session_id
+
+    @property
+    def seq(self) -> int | None:
+        seq: int | None = getattr(self.message, "seq", None)
+        return seq
+
+    @cached_property
+    def text(self) -> str:
+        WEBSOCKET_FRAMES_ENCODED.inc(self.kind, "json")
+        return self.message.model_dump_json()
+
+    @cached_property
+    def text_size(self) -> int:
+        """Size of the JSON encoding in bytes."""
+        return len(self.text.encode())
+
+    @cached_property
+    def data(self) -> bytes:
+        WEBSOCKET_FRAMES_ENCODED.inc(self.kind, "msgpack")
+        return encode_binary(self.message, self.handles)
+
+    def get_data(self, known_handles: set[int]) -> bytes:
+        """Binary encoding for a client that was told `known_handles`.
+
+        Ids whose handle the client can't know yet, e.g. after joining mid-response, are sent
+        in full. Only then the frame is encoded for this client alone.
+        """
+        handles = {
+            id_: handle
+            for id_, handle in self.handles.items()
+            if handle in known_handles or handle in self.announced
+        }
+        if len(handles) == len(self.handles):
+            return self.data
+        WEBSOCKET_FRAMES_ENCODED.inc(self.kind, "msgpack")
+        return encode_binary(self.message, handles)
+
+
+class Subscription:
+    """Frames for one websocket connection, in publishing order.
+
+    `session_id` limits the frames to a single session, `None` receives all sessions.
+    """
+
+    def __init__(self, session_id: UUID | None = None, max_pending: int = MAX_PENDING) -> None:
+        self.session_id = session_id
+        self._max_pending = max_pending
+        self._frames: deque[Frame] = deque()
+        self._ready = asyncio.Event()
+        self._known_handles: dict[UUID, set[int]] = {}
+        """Handles announced to the connection, by session."""
+
+    @property
+    def pending(self) -> int:
+        return len(self._frames)
+
+    def put(self, frame: Frame) -> bool:
+        """Queue a frame, returns `False` if the connection is too far behind to take it."""
+        if len(self._frames) >= self._max_pending:
+            return False
+        self._frames.append(frame)
+        self._ready.set()
+        return True
+
+    async def get(self) -> Frame:
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._frames.popleft()
+
+    def get_data(self, frame: Frame) -> bytes:
+        """Binary encoding of a frame, to be called in sending order."""
+        if frame.session_id is None:
+            return frame.data
+        if isinstance(frame.message, WebSocketStreamStatusMessage) and (
+            frame.message.status == "started"
+        ):
+            # Handles of earlier responses aren't referred to anymore
+            self._known_handles.pop(frame.session_id, None)
+        if not frame.handles:
+            return frame.data
+
+        known_handles = self._known_handles.setdefault(frame.session_id, set())
+        data = frame.get_data(known_handles)
+        known_handles.update(frame.announced)
+        return data
+
+    def resume(self, session_id: UUID, frames: Sequence[Frame]) -> None:
+        """Queue `frames` of a session first, replacing its frames queued so far."""
+        others = [frame for frame in self._frames if frame.session_id != session_id]
+        self._frames = deque([*frames, *others])
+        if self._frames:
+            self._ready.set()
+
+
+class SessionStream:
+    """The frame stream of one session, numbered in publishing order.
+
+    The last `maxlen` frames are buffered for clients resuming after a reconnect. The current
+    response is also kept compacted, with its deltas merged per part, for clients whose missed
+    frames are no longer buffered.
+    """
+
+    def __init__(self, session_id: UUID, maxlen: int = BUFFER_SIZE) -> None:
+        self.session_id = session_id
+        self.seq = 0
+        self._frames: deque[Frame] = deque(maxlen=maxlen)
+        self._status: WebSocketStreamStatusMessage | None = None
+        self._messages: dict[UUID, WebSocketStreamMessageMessage] = {}
+        self._parts: dict[UUID, WebSocketStreamPartMessage] = {}
+        self._deltas: dict[tuple[UUID, UUID, str], list[str]] = {}
+        """Delta texts by message, part and delta kind."""
+
+        self._handles: dict[UUID, int] = {}
+        self._next_handle = 1
+
+    def append(self, message: SessionMessage) -> Frame:
+        self.seq += 1
+        message.seq = self.seq
+        frame = self._create_frame(message)
+        self._frames.append(frame)
+        self._compact(message)
+        return frame
+
+    def get_frames_since(self, seq: int) -> list[Frame] | None:
+        """Frames after `seq`, `None` if some of them are no longer buffered."""
+        first = self.seq - len(self._frames) + 1
+        if seq > self.seq or seq + 1 < first:
+            return None
+        return list(islice(self._frames, seq + 1 - first, None))
+
+    def get_snapshot(self) -> Frame:
+        snapshot = WebSocketStreamSnapshotMessage(
+            session_id=self.session_id,
+            seq=self.seq,
+            status=self._status.status if self._status else None,
+            messages=list(self._messages.values()),
+            parts=list(self._parts.values()),
+            deltas=[
+                WebSocketStreamPartDeltaMessage(
+                    session_id=self.session_id,
+                    message_id=message_id,
+                    part_id=part_id,
+                    delta=_create_delta(kind, "".join(texts)),
+                )
+                for (message_id, part_id, kind), texts in self._deltas.items()
+            ],
+        )
+        # The snapshot contains every message and part with a handle
+        handles = dict(self._handles)
+        return Frame(snapshot, handles, frozenset(handles.values()))
+
+    def _create_frame(self, message: SessionMessage) -> Frame:
+        """Frame with the handles of the ids in a message, messages and parts get one when
+        announced."""
+        if isinstance(message, WebSocketStreamMessageMessage):
+            ids = [message.message.id]
+            announced = {self._add_handle(message.message.id)}
+        elif isinstance(message, WebSocketStreamPartMessage):
+            ids = [message.message_id, message.part.id]
+            announced = {self._add_handle(message.part.id)}
+        elif isinstance(message, WebSocketStreamPartDeltaMessage):
+            ids = [message.message_id, message.part_id]
+            announced = set()
+        else:
+            return Frame(message)
+        handles = {id_: self._handles[id_] for id_ in ids if id_ in self._handles}
+        return Frame(message, handles, frozenset(announced))
+
+    def _add_handle(self, id_: UUID) -> int:
+        if id_ not in self._handles:
+            self._handles[id_] = self._next_handle
+            self._next_handle += 1
+        return self._handles[id_]
+
+    def _compact(self, message: SessionMessage) -> None:
+        if isinstance(message, WebSocketStreamStatusMessage):
+            if message.status == "started":
+                self._messages.clear()
+                self._parts.clear()
+                self._deltas.clear()
+                self._handles.clear()
+            self._status = message
+        elif isinstance(message, WebSocketStreamMessageMessage):
+            self._messages[message.message.id] = message
+        elif isinstance(message, WebSocketStreamPartMessage):
+            self._parts[message.part.id] = message
+        elif isinstance(message, WebSocketStreamPartDeltaMessage):
+            key = (message.message_id, message.part_id, message.delta.kind)
+            self._deltas.setdefault(key, []).append(_get_delta_text(message.delta))
+
+
+def _get_delta_text(delta: Delta) -> str:
+    if isinstance(delta, ContentDelta):
+        return delta.content
+    if isinstance(delta, ToolArgsDelta):
+        return delta.args
+    return delta.tool_name
+
+
+def _create_delta(kind: str, text: str) -> Delta:
+    if kind == "content":
+        return ContentDelta(text)
+    if kind == "tool_args":
+        return ToolArgsDelta(text)
+    return ToolNameDelta(text)
+
+
+class BroadcastHub:
+    """Fans out engine events to websocket connections.
+
+    Each event is converted and serialised once, however many connections receive it, and
+    numbered in the frame stream of its session so reconnecting clients can resume. Handlers
+    run inline on the bus, so the frames of a session are queued in publishing order. With
+    `debug`, response timings are broadcast as well.
+    """
+
+    def __init__(
+        self,
+        bus: MessageBus,
+        *,
+        debug: bool = False,
+        buffer_size: int = BUFFER_SIZE,
+        max_sessions: int = MAX_SESSIONS,
+    ) -> None:
+        self._bus = bus
+        self._buffer_size = buffer_size
+        self._max_sessions = max_sessions
+        self._subscriptions: dict[UUID | None, set[Subscription]] = {}
+        self._streams: OrderedDict[UUID, SessionStream] = OrderedDict()
+        self._unsubscribers: list[Callable[[], None]] = []
+
+        self._subscribe(ResponseStartedMessage, self._on_response_started)
+        self._subscribe(ResponseStoppedMessage, self._on_response_stopped)
+        self._subscribe(ResponseCancelledMessage, self._on_response_cancelled)
+        self._subscribe(ResponseErrorMessage, self._on_response_error)
+        self._subscribe(ResponseQueuedMessage, self._on_response_queued)
+        self._subscribe(StreamMessageMessage, self._on_stream_message)
+        self._subscribe(StreamPartMessage, self._on_stream_part)
+        self._subscribe(StreamPartDeltaMessage, self._on_stream_part_delta)
+        self._subscribe(SessionDeleted, self._on_session_deleted)
+        if debug:
+            self._subscribe(ResponseTimingMessage, self._on_response_timing)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers.clear()
+
+    def get_pending_frames(self) -> tuple[int, int]:
+        """Frames queued for all connections, and for the connection furthest behind."""
+        pending = [
+            subscription.pending
+            for subscriptions in self._subscriptions.values()
+            for subscription in subscriptions
+        ]
+        return sum(pending), max(pending, default=0)
+
+    def get_subscriber_count(self, session_id: UUID) -> int:
+        """Connections receiving the frames of a session."""
+        return len(self._subscriptions.get(session_id, ())) + len(self._subscriptions.get(None, ()))
+
+    @contextmanager
+    def subscribe(self, subscription: Subscription) -> Generator[None]:
+        """Queue broadcast frames on `subscription` while the context is active."""
+        self._subscriptions.setdefault(subscription.session_id, set()).add(subscription)
+        try:
+            yield
+        finally:
+            subscriptions = self._subscriptions[subscription.session_id]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.session_id]
+
+    def broadcast(self, session_id: UUID, create_message: Callable[[], SessionMessage]) -> None:
+        """Queue the message of a session for every subscribed connection.
+
+        Frames are buffered for resuming clients even if nobody is connected. A connection
+        too far behind gets a snapshot of the session instead of its queued frames.
+        """
+        stream = self._get_stream(session_id)
+        try:
+            frame = stream.append(create_message())
+        except ValueError:
+            # Handlers run inside `publish`, don't fail the engine over an invalid frame
+            _log.exception("Failed to convert websocket frame")
+            return
+
+        snapshot: Frame | None = None
+        for key in (session_id, None):
+            for subscription in self._subscriptions.get(key, ()):
+                if not subscription.put(frame):
+                    WEBSOCKET_OVERRUNS.inc()
+                    snapshot = snapshot or stream.get_snapshot()
+                    subscription.resume(session_id, [snapshot])
+
+    def resume(self, subscription: Subscription, session_id: UUID, seq: int) -> None:
+        """Queue the frames of a session after `seq`, or a snapshot if they were dropped."""
+        stream = self._get_stream(session_id)
+        if (frames := stream.get_frames_since(seq)) is not None:
+            WEBSOCKET_RESUMES.inc("replay")
+        else:
+            WEBSOCKET_RESUMES.inc("snapshot")
+            frames = [stream.get_snapshot()]
+        subscription.resume(session_id, frames)
+
+    def _get_stream(self, session_id: UUID) -> SessionStream:
+        if (stream := self._streams.get(session_id)) is not None:
+            self._streams.move_to_end(session_id)
+            return stream
+
+        stream = self._streams[session_id] = SessionStream(session_id, self._buffer_size)
+        if len(self._streams) > self._max_sessions:
+            self._streams.popitem(last=False)
+        return stream
+
+    def _subscribe[T: BaseMessage](
+        self, message_cls: type[T], handler: Callable[[T], None]
+    ) -> None:
+        # Sync handlers are called inline by the bus, no task per event
+        self._bus.subscribe(message_cls, handler)
+        self._unsubscribers.append(partial(self._bus.unsubscribe, message_cls, handler))
+
+    def _on_session_deleted(self, message: SessionDeleted) -> None:
+        self._streams.pop(message.session_id, None)
+
+    def _on_response_started(self, message: ResponseStartedMessage) -> None:
+        self.broadcast(
+            message.session_id,
+            lambda: WebSocketStreamStatusMessage(session_id=message.session_id, status="started"),
+        )
+
+    def _on_response_stopped(self, message: ResponseStoppedMessage) -> None:
+        self.broadcast(
+            message.session_id,
+            lambda: WebSocketStreamStatusMessage(session_id=message.session_id, status="stopped"),
+        )
+
+    def _on_response_cancelled(self, message: ResponseCancelledMessage) -> None:
+        self.broadcast(
+            message.session_id,
+            lambda: WebSocketStreamStatusMessage(session_id=message.session_id, status="cancelled"),
+        )
+
+    def _on_response_error(self, message: ResponseErrorMessage) -> None:
+        self.broadcast(
+            message.session_id,
+            lambda: WebSocketErrorMessage.from_exception(message.session_id, message.error),
+        )
+
+    def _on_response_queued(self, message: ResponseQueuedMessage) -> None:
+        self.broadcast(
+            message.session_id, lambda: WebSocketStreamQueuedMessage.from_message(message)
+        )
+
+    def _on_response_timing(self, message: ResponseTimingMessage) -> None:
+        self.broadcast(
+            message.session_id, lambda: WebSocketStreamTimingMessage.from_message(message)
+        )
+
+    def _on_stream_message(self, message: StreamMessageMessage) -> None:
+        self.broadcast(
+            message.session_id, lambda: WebSocketStreamMessageMessage.from_message(message)
+        )
+
+    def _on_stream_part(self, message: StreamPartMessage) -> None:
+        self.broadcast(message.session_id, lambda: WebSocketStreamPartMessage.from_message(message))
+
+    def _on_stream_part_delta(self, message: StreamPartDeltaMessage) -> None:
+        self.broadcast(
+            message.session_id, lambda: WebSocketStreamPartDeltaMessage.from_message(message)
+        )
@@ -1,6 +1,8 @@
+from uuid import UUID
+
 from fastapi import APIRouter, WebSocket
 
-from .dependencies import DbSessionDep, MessageBusDep, StoryEngineManagerDep
+from .dependencies import BroadcastHubDep, DbSessionFactoryDep, MessageBusDep, StoryEngineManagerDep
 from .handler import WebSocketHandler
 
 websocket_router = APIRouter()
@@ -9,10 +11,27 @@ websocket_router = APIRouter()
 @websocket_router.websocket("")
 async def websocket_endpoint(
     websocket: WebSocket,
-    db_session: DbSessionDep,
+    db_sessions: DbSessionFactoryDep,
     story_engine_manager: StoryEngineManagerDep,
     message_bus: MessageBusDep,
+    hub: BroadcastHubDep,
 ) -> None:
     """WebSocket endpoint for chat sessions."""
-    handler = WebSocketHandler(db_session, story_engine_manager, message_bus)
+    handler = WebSocketHandler(db_sessions, story_engine_manager, message_bus, hub)
+    await handler.handle_connection(websocket)
+
+
+@websocket_router.websocket("/spectate/{session_id}")
+async def spectator_endpoint(
+    websocket: WebSocket,
+    session_id: UUID,
+    db_sessions: DbSessionFactoryDep,
+    story_engine_manager: StoryEngineManagerDep,
+    message_bus: MessageBusDep,
+    hub: BroadcastHubDep,
+) -> None:
+    """Read-only WebSocket endpoint for watching a single session."""
+    handler = WebSocketHandler(
+        db_sessions, story_engine_manager, message_bus, hub, session_id=session_id
+    )
     await handler.handle_connection(websocket)
@@ -4,6 +4,7 @@ from uuid import UUID
 from pydantic_ai import ModelResponse, TextPart, ToolCallPart
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
+from llm_gamebook.db import DbSessionFactory
 from llm_gamebook.db.crud.message import get_messages
 from llm_gamebook.db.models.message import MessageKind
 from llm_gamebook.db.models.part import PartKind
@@ -31,13 +32,14 @@ async def test_story_flow(
     test_player: MockPlayer,
     story_engine: StoryEngine,
     db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
 ) -> None:
     # Bedroom
     test_model.add_responses(
         lambda _, info: len(info.function_tools) == 0,  # No tool calls on introduction
         ModelResponse([TextPart("Introduction")]),
     )
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     system_prompt = test_model.current_system_prompt
     assert "You are the narrator of a branching interactive story." in system_prompt
@@ -57,7 +59,7 @@ async def test_story_flow(
         lambda msgs, _: msgs[-1].parts[0].part_kind == "tool-return",
         ModelResponse(parts=[TextPart("You are in the living room now…")]),
     )
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     system_prompt = test_model.current_system_prompt
     assert "run-down living room" in system_prompt
@@ -75,7 +77,7 @@ async def test_story_flow(
         lambda msgs, _: msgs[-1].parts[0].part_kind == "tool-return",
         ModelResponse(parts=[TextPart("You pick up the leaflet…")]),
     )
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     system_prompt = test_model.current_system_prompt
     assert "A leaflet was placed under" not in system_prompt
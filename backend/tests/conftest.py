@@ -7,6 +7,12 @@ from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
+from llm_gamebook.db import (
+    DbSessionFactory,
+    configure_sqlite_connections,
+    create_db_session_factory,
+)
+from llm_gamebook.db.crud.message import create_message
 from llm_gamebook.db.models import Message, ModelConfig, Part, Session
 from llm_gamebook.db.models.message import MessageKind
 from llm_gamebook.db.models.part import PartKind
@@ -19,6 +25,7 @@ from llm_gamebook.story import Project, ProjectManager, StoryContext
 @pytest.fixture
 async def db_engine() -> AsyncIterator[AsyncEngine]:
     engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    configure_sqlite_connections(engine)
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
     try:
@@ -33,6 +40,11 @@ async def db_session(db_engine: AsyncEngine) -> AsyncIterator[AsyncDbSession]:
         yield session
 
 
+@pytest.fixture
+def db_session_factory(db_engine: AsyncEngine) -> DbSessionFactory:
+    return create_db_session_factory(db_engine)
+
+
 @pytest.fixture
 async def model_config(db_session: AsyncDbSession) -> ModelConfig:
     config = ModelConfig(
@@ -83,10 +95,7 @@ async def message(db_session: AsyncDbSession, session: Session) -> Message:
         kind=MessageKind.REQUEST,
         session=session,
     )
-    db_session.add(msg)
-    await db_session.commit()
-    await db_session.refresh(msg)
-    return msg
+    return await create_message(db_session, msg)
 
 
 @pytest.fixture
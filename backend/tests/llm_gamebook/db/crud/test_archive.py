@@ -0,0 +1,147 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db.crud import archive as archive_crud
+from llm_gamebook.db.crud import message as message_crud
+from llm_gamebook.db.crud import session as session_crud
+from llm_gamebook.db.crud import usage as usage_crud
+from llm_gamebook.db.models import Message, ModelConfig, Part, Session, SessionArchive, Usage
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.part import PartKind
+
+
+async def _play(db_session: AsyncDbSession, session: Session, timestamp: datetime) -> None:
+    await message_crud.create_messages(
+        db_session,
+        [
+            Message(
+                kind=MessageKind.REQUEST,
+                session_id=session.id,
+                timestamp=timestamp,
+                parts=[
+                    Part(
+                        kind=PartKind.USER_PROMPT,
+                        content="Look around",
+                        tool_name=None,
+                        tool_call_id=None,
+                        args=None,
+                    )
+                ],
+            ),
+            Message(
+                kind=MessageKind.RESPONSE,
+                session_id=session.id,
+                timestamp=timestamp,
+                state={"turn": 1},
+                parts=[
+                    Part(
+                        kind=PartKind.THINKING,
+                        content="The player wants... " * 50,
+                        tool_name=None,
+                        tool_call_id=None,
+                        args=None,
+                    ),
+                    Part(
+                        kind=PartKind.TEXT,
+                        content="A dark room.",
+                        tool_name=None,
+                        tool_call_id=None,
+                        args=None,
+                    ),
+                ],
+                usage=Usage(
+                    input_tokens=100, output_tokens=20, cache_read_tokens=0, cache_write_tokens=0
+                ),
+            ),
+        ],
+    )
+
+
+async def _count(db_session: AsyncDbSession, model: type[Message | Part | Usage]) -> int:
+    result = await db_session.exec(select(func.count()).select_from(model))
+    return result.one()
+
+
+async def test_archive_session(db_session: AsyncDbSession, session: Session) -> None:
+    await _play(db_session, session, datetime(2025, 1, 1, tzinfo=UTC))
+
+    archive = await archive_crud.archive_session(db_session, session.id)
+
+    assert archive is not None
+    assert archive.message_count == 2
+    assert len(archive.data) < archive.json_size
+    assert (archive.requests, archive.input_tokens, archive.output_tokens) == (1, 100, 20)
+    assert [await _count(db_session, model) for model in (Message, Part, Usage)] == [0, 0, 0]
+
+    await db_session.refresh(session)
+    assert session.archived_at is not None
+    assert session.message_count == 2
+    assert session.input_tokens == 100
+
+
+async def test_archive_session_without_messages(
+    db_session: AsyncDbSession, session: Session
+) -> None:
+    assert await archive_crud.archive_session(db_session, session.id) is None
+
+
+async def test_restore_session(db_session: AsyncDbSession, session: Session) -> None:
+    await _play(db_session, session, datetime(2025, 1, 1, tzinfo=UTC))
+    before = await message_crud.get_messages(db_session, session.id)
+    expected = [(m.id, m.seq, [(p.id, p.kind, p.content) for p in m.parts]) for m in before]
+    await archive_crud.archive_session(db_session, session.id)
+
+    assert await archive_crud.restore_session(db_session, session.id)
+
+    messages = await message_crud.get_messages(db_session, session.id)
+    assert [(m.id, m.seq, [(p.id, p.kind, p.content) for p in m.parts]) for m in messages] == (
+        expected
+    )
+    assert messages[1].usage is not None
+    assert messages[1].usage.input_tokens == 100
+    assert messages[1].state == {"turn": 1}
+    assert await db_session.get(SessionArchive, session.id) is None
+
+    await db_session.refresh(session)
+    assert session.archived_at is None
+    assert not await archive_crud.restore_session(db_session, session.id)
+
+
+async def test_usage_includes_archived_sessions(
+    db_session: AsyncDbSession, session: Session
+) -> None:
+    await _play(db_session, session, datetime(2025, 1, 1, tzinfo=UTC))
+    await _play(db_session, session, datetime(2025, 1, 2, tzinfo=UTC))
+    expected = await usage_crud.get_usage_by_session(db_session, session_id=session.id)
+
+    await archive_crud.archive_session(db_session, session.id)
+    archived = await usage_crud.get_usage_by_session(db_session, session_id=session.id)
+    await archive_crud.restore_session(db_session, session.id)
+    restored = await usage_crud.get_usage_by_session(db_session, session_id=session.id)
+
+    assert expected[0][3].requests == 2
+    assert archived == expected
+    assert restored == expected
+
+
+async def test_archive_inactive_sessions(
+    db_session: AsyncDbSession, model_config: ModelConfig
+) -> None:
+    now = datetime.now(UTC)
+    idle = await session_crud.create_session(db_session, model_config, "foo/bar", "Idle")
+    active = await session_crud.create_session(db_session, model_config, "foo/bar", "Active")
+    await session_crud.create_session(db_session, model_config, "foo/bar", "Unplayed")
+    await _play(db_session, idle, now - timedelta(days=60))
+    await _play(db_session, active, now - timedelta(days=1))
+
+    stats = await archive_crud.archive_inactive_sessions(db_session, now - timedelta(days=30))
+
+    assert (stats.sessions, stats.messages) == (1, 2)
+    assert 0 < stats.compressed_size < stats.json_size
+    assert await db_session.get(SessionArchive, idle.id) is not None
+    assert await message_crud.get_message_count(db_session, active.id) == 2
+
+    stats = await archive_crud.archive_inactive_sessions(db_session, now - timedelta(days=30))
+    assert stats.sessions == 0
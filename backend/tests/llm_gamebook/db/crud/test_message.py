@@ -3,8 +3,9 @@ from datetime import UTC, datetime
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
 from llm_gamebook.db.crud import message as message_crud
-from llm_gamebook.db.models import Message, Session
+from llm_gamebook.db.models import Message, Part, Session, Usage
 from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.part import PartKind
 
 
 async def test_get_message_count(db_session: AsyncDbSession, session: Session) -> None:
@@ -93,3 +94,115 @@ async def test_create_messages_batch(db_session: AsyncDbSession, session: Sessio
     count = await message_crud.get_message_count(db_session, session.id)
 
     assert count == 3
+
+
+async def test_create_messages_updates_session_counters(
+    db_session: AsyncDbSession, session: Session
+) -> None:
+    """Test that storing messages keeps the session counters up to date."""
+    last_at = datetime(2025, 1, 1, 12, 0, tzinfo=UTC)
+    await message_crud.create_messages(
+        db_session,
+        [
+            Message(kind=MessageKind.REQUEST, session_id=session.id, timestamp=last_at),
+            Message(
+                kind=MessageKind.RESPONSE,
+                session_id=session.id,
+                timestamp=datetime(2025, 1, 1, 11, 0, tzinfo=UTC),
+                usage=Usage(
+                    input_tokens=100, output_tokens=20, cache_read_tokens=0, cache_write_tokens=0
+                ),
+            ),
+        ],
+    )
+    await message_crud.create_message(
+        db_session,
+        Message(
+            kind=MessageKind.RESPONSE,
+            session_id=session.id,
+            timestamp=datetime(2025, 1, 1, 10, 0, tzinfo=UTC),
+            usage=Usage(
+                input_tokens=50, output_tokens=5, cache_read_tokens=0, cache_write_tokens=0
+            ),
+        ),
+    )
+    await db_session.refresh(session)
+
+    assert session.message_count == 3
+    assert session.last_message_at is not None
+    assert session.last_message_at.replace(tzinfo=UTC) == last_at
+    assert session.input_tokens == 150
+    assert session.output_tokens == 25
+
+
+async def test_create_messages_numbers_messages_and_parts(
+    db_session: AsyncDbSession, session: Session
+) -> None:
+    """Test that stored messages are numbered per session and parts per message."""
+    same_tick = datetime(2025, 1, 1, 12, 0, tzinfo=UTC)
+    first = await message_crud.create_message(
+        db_session, Message(kind=MessageKind.REQUEST, session_id=session.id, timestamp=same_tick)
+    )
+    response = Message(
+        kind=MessageKind.RESPONSE,
+        session_id=session.id,
+        timestamp=same_tick,
+        parts=[
+            Part(
+                kind=PartKind.THINKING, content="Hmm", tool_name=None, tool_call_id=None, args=None
+            ),
+            Part(kind=PartKind.TEXT, content="Hello", tool_name=None, tool_call_id=None, args=None),
+        ],
+    )
+    request = Message(kind=MessageKind.REQUEST, session_id=session.id, timestamp=same_tick)
+    await message_crud.create_messages(db_session, [response, request])
+
+    messages = await message_crud.get_messages(db_session, session.id)
+
+    assert [(m.id, m.seq) for m in messages] == [(first.id, 1), (response.id, 2), (request.id, 3)]
+    assert [(p.kind, p.seq) for p in messages[1].parts] == [
+        (PartKind.THINKING, 0),
+        (PartKind.TEXT, 1),
+    ]
+    assert first.id < response.id < request.id
+
+
+async def test_get_messages_page(db_session: AsyncDbSession, session: Session) -> None:
+    """Test paging through messages by sequence number."""
+    await message_crud.create_messages(
+        db_session, [Message(kind=MessageKind.REQUEST, session_id=session.id) for _ in range(5)]
+    )
+
+    page = await message_crud.get_messages(db_session, session.id, limit=2)
+    assert [m.seq for m in page] == [1, 2]
+
+    page = await message_crud.get_messages(db_session, session.id, after_seq=page[-1].seq, limit=2)
+    assert [m.seq for m in page] == [3, 4]
+
+    page = await message_crud.get_messages(db_session, session.id, after_seq=4, limit=2)
+    assert [m.seq for m in page] == [5]
+
+
+async def test_get_latest_message_with_state(db_session: AsyncDbSession, session: Session) -> None:
+    """Test finding the last message carrying a state."""
+    same_tick = datetime(2025, 1, 1, 12, 0, tzinfo=UTC)
+    await message_crud.create_messages(
+        db_session,
+        [
+            Message(
+                kind=MessageKind.RESPONSE,
+                session_id=session.id,
+                timestamp=same_tick,
+                state={"turn": number},
+            )
+            for number in range(3)
+        ],
+    )
+    await message_crud.create_message(
+        db_session, Message(kind=MessageKind.REQUEST, session_id=session.id, timestamp=same_tick)
+    )
+
+    message = await message_crud.get_latest_message_with_state(db_session, session.id)
+
+    assert message is not None
+    assert message.state == {"turn": 2}
@@ -7,6 +7,7 @@ from llm_gamebook.db.crud.model_config import (
     delete_model_config,
     get_model_config,
     get_model_config_count,
+    get_model_config_list,
     get_model_configs,
     update_model_config,
 )
@@ -91,6 +92,18 @@ async def test_get_model_config_count(db_session: AsyncDbSession) -> None:
     assert count == 1
 
 
+async def test_get_model_config_list(db_session: AsyncDbSession, model_config: ModelConfig) -> None:
+    rows, count = await get_model_config_list(db_session)
+    assert count == 1
+    assert rows[0][0] == model_config.id
+    assert rows[0][2] == model_config.provider
+    assert rows[0][5] == model_config.api_key
+
+    rows, count = await get_model_config_list(db_session, skip=1)
+    assert rows == []
+    assert count == 1
+
+
 async def test_get_model_config_found(
     db_session: AsyncDbSession, model_config: ModelConfig
 ) -> None:
@@ -1,9 +1,15 @@
+from datetime import UTC, datetime
 from uuid import uuid4
 
+import pytest
+from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
+from llm_gamebook.db.crud import message as message_crud
 from llm_gamebook.db.crud import session as session_crud
-from llm_gamebook.db.models import ModelConfig, Session
+from llm_gamebook.db.models import Message, ModelConfig, Part, Session, Usage
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.part import PartKind
 
 
 async def test_create_session(db_session: AsyncDbSession, model_config: ModelConfig) -> None:
@@ -49,6 +55,76 @@ async def test_get_sessions_with_project_filter(
     assert sessions[0].project_id == "foo/bar"
 
 
+async def test_get_session_list(db_session: AsyncDbSession, model_config: ModelConfig) -> None:
+    session_1 = await session_crud.create_session(db_session, model_config, "foo/bar", "Session 1")
+    await session_crud.create_session(db_session, model_config, "baz/quz", "Session 2")
+    await message_crud.create_messages(
+        db_session, (Message(kind=MessageKind.REQUEST, session_id=session_1.id) for _ in range(3))
+    )
+
+    rows, count = await session_crud.get_session_list(db_session, None, skip=0, limit=10)
+
+    assert count == 2
+    # Played sessions come first
+    assert [row[1] for row in rows] == ["Session 1", "Session 2"]
+    assert [row[7] for row in rows] == [3, 0]
+    assert rows[0][0] == session_1.id
+    assert rows[0][3] == model_config.id
+    assert rows[0][8] is not None
+    assert rows[1][8] is None
+
+
+async def test_get_sessions_by_last_activity(
+    db_session: AsyncDbSession, model_config: ModelConfig
+) -> None:
+    session_1 = await session_crud.create_session(db_session, model_config, "foo/bar", "Session 1")
+    session_2 = await session_crud.create_session(db_session, model_config, "foo/bar", "Session 2")
+    await message_crud.create_message(
+        db_session,
+        Message(
+            kind=MessageKind.REQUEST,
+            session_id=session_2.id,
+            timestamp=datetime(2025, 1, 1, tzinfo=UTC),
+        ),
+    )
+    await message_crud.create_message(
+        db_session,
+        Message(
+            kind=MessageKind.REQUEST,
+            session_id=session_1.id,
+            timestamp=datetime(2025, 1, 2, tzinfo=UTC),
+        ),
+    )
+    await session_crud.create_session(db_session, model_config, "foo/bar", "Session 3")
+
+    sessions = await session_crud.get_sessions(db_session, project_id=None, skip=0, limit=10)
+
+    assert [s.title for s in sessions] == ["Session 1", "Session 2", "Session 3"]
+
+
+async def test_get_session_list_pages(
+    db_session: AsyncDbSession, model_config: ModelConfig
+) -> None:
+    for number in range(5):
+        await session_crud.create_session(db_session, model_config, "foo/bar", f"Session {number}")
+    await session_crud.create_session(db_session, model_config, "baz/quz", "Other")
+
+    rows, count = await session_crud.get_session_list(db_session, "foo/bar", skip=2, limit=2)
+    assert len(rows) == 2
+    assert count == 5
+
+    rows, count = await session_crud.get_session_list(db_session, "foo/bar", skip=10, limit=2)
+    assert rows == []
+    assert count == 5
+
+
+async def test_get_session_list_empty(db_session: AsyncDbSession) -> None:
+    rows, count = await session_crud.get_session_list(db_session, None, skip=0, limit=10)
+
+    assert rows == []
+    assert count == 0
+
+
 async def test_get_session_count(db_session: AsyncDbSession, model_config: ModelConfig) -> None:
     initial_count = await session_crud.get_session_count(db_session, project_id=None)
 
@@ -102,3 +178,68 @@ async def test_delete_session(db_session: AsyncDbSession, session: Session) -> N
     deleted_session = await session_crud.get_session(db_session, session_id)
 
     assert deleted_session is None
+
+
+async def test_delete_session_cascades(db_session: AsyncDbSession, session: Session) -> None:
+    await message_crud.create_message(
+        db_session,
+        Message(
+            kind=MessageKind.RESPONSE,
+            session_id=session.id,
+            parts=[
+                Part(
+                    kind=PartKind.TEXT,
+                    content="Hello",
+                    tool_name=None,
+                    tool_call_id=None,
+                    args=None,
+                )
+            ],
+            usage=Usage(input_tokens=1, output_tokens=1, cache_read_tokens=0, cache_write_tokens=0),
+        ),
+    )
+
+    assert await session_crud.delete_session(db_session, session.id)
+
+    for model in (Message, Part, Usage):
+        result = await db_session.exec(select(func.count()).select_from(model))
+        assert result.one() == 0
+
+
+async def test_delete_session_not_found(db_session: AsyncDbSession) -> None:
+    assert not await session_crud.delete_session(db_session, uuid4())
+
+
+async def test_purge_sessions(db_session: AsyncDbSession, model_config: ModelConfig) -> None:
+    for number in range(5):
+        await session_crud.create_session(db_session, model_config, "foo/bar", f"Session {number}")
+    kept = await session_crud.create_session(db_session, model_config, "baz/quz", "Other")
+
+    deleted = await session_crud.purge_sessions(db_session, project_id="foo/bar", chunk_size=2)
+
+    assert len(deleted) == 5
+    assert kept.id not in deleted
+    assert await session_crud.get_session_count(db_session, project_id=None) == 1
+
+
+async def test_purge_sessions_inactive(
+    db_session: AsyncDbSession, model_config: ModelConfig
+) -> None:
+    played = await session_crud.create_session(db_session, model_config, "foo/bar", "Played")
+    idle = await session_crud.create_session(db_session, model_config, "foo/bar", "Idle")
+    await message_crud.create_message(
+        db_session, Message(kind=MessageKind.REQUEST, session_id=played.id)
+    )
+    idle.timestamp = datetime(2025, 1, 1, tzinfo=UTC)
+    await db_session.commit()
+
+    deleted = await session_crud.purge_sessions(
+        db_session, inactive_since=datetime(2025, 6, 1, tzinfo=UTC)
+    )
+
+    assert deleted == [idle.id]
+
+
+async def test_purge_sessions_without_filter(db_session: AsyncDbSession) -> None:
+    with pytest.raises(ValueError, match="At least one filter"):
+        await session_crud.purge_sessions(db_session)
@@ -0,0 +1,46 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from llm_gamebook.db import create_async_db_engine, create_db_session_factory
+from llm_gamebook.db.archival import archive_database
+from llm_gamebook.db.crud.message import create_messages
+from llm_gamebook.db.models import Message, Part, Session
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.part import PartKind
+
+
+async def test_archive_database(tmp_path: Path) -> None:
+    database_path = tmp_path / "test.db"
+    async with create_async_db_engine(database_path) as db_engine:
+        db_sessions = create_db_session_factory(db_engine)
+        async with db_sessions() as db_session:
+            sessions = [Session(title=None, project_id="foo/bar") for _ in range(20)]
+            db_session.add_all(sessions)
+            await db_session.commit()
+            await create_messages(
+                db_session,
+                [
+                    Message(
+                        kind=MessageKind.RESPONSE,
+                        session_id=session.id,
+                        timestamp=datetime.now(UTC) - timedelta(days=60),
+                        parts=[
+                            Part(
+                                kind=PartKind.THINKING,
+                                content="Let me think about the dark room. " * 200,
+                                tool_name=None,
+                                tool_call_id=None,
+                                args=None,
+                            )
+                        ],
+                    )
+                    for session in sessions
+                ],
+            )
+
+    report = await archive_database(timedelta(days=30), database_path)
+
+    assert report.stats.sessions == 20
+    assert report.stats.messages == 20
+    assert report.size_after < report.size_before
+    assert "Archived 20 sessions with 20 messages" in report.format()
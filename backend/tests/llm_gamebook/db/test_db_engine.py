@@ -0,0 +1,62 @@
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from llm_gamebook.db import create_async_db_engine, create_db_session_factory, vacuum_db
+from llm_gamebook.db.crud.message import create_messages
+from llm_gamebook.db.crud.session import delete_session
+from llm_gamebook.db.models import Message, Session
+from llm_gamebook.db.models.message import MessageKind
+
+
+async def test_foreign_keys_enforced(tmp_path: Path) -> None:
+    async with create_async_db_engine(tmp_path / "test.db") as db_engine:
+        db_sessions = create_db_session_factory(db_engine)
+        async with db_sessions() as db_session:
+            db_session.add(Message(kind=MessageKind.REQUEST, session_id=uuid4()))
+
+            with pytest.raises(IntegrityError):
+                await db_session.commit()
+
+
+async def test_vacuum_db(tmp_path: Path) -> None:
+    async with create_async_db_engine(tmp_path / "test.db") as db_engine:
+        db_sessions = create_db_session_factory(db_engine)
+        async with db_sessions() as db_session:
+            session = Session(title=None, project_id="foo/bar")
+            db_session.add(session)
+            await db_session.commit()
+            await create_messages(
+                db_session,
+                [
+                    Message(
+                        kind=MessageKind.REQUEST, session_id=session.id, instructions="x" * 1000
+                    )
+                    for _ in range(100)
+                ],
+            )
+            await delete_session(db_session, session.id)
+
+        async with db_engine.connect() as conn:
+            result = await conn.exec_driver_sql("PRAGMA freelist_count")
+            assert result.scalar_one() > 0
+
+        await vacuum_db(db_engine)
+
+        async with db_engine.connect() as conn:
+            result = await conn.exec_driver_sql("PRAGMA freelist_count")
+            assert result.scalar_one() == 0
+
+
+async def test_failed_query_drops_start_time(tmp_path: Path) -> None:
+    async with (
+        create_async_db_engine(tmp_path / "test.db") as db_engine,
+        db_engine.connect() as conn,
+    ):
+        with pytest.raises(OperationalError):
+            await conn.exec_driver_sql("SELECT * FROM missing")
+        await conn.exec_driver_sql("SELECT 1")
+
+        assert conn.info["query_start"] == []
@@ -0,0 +1,245 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Connection, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel, text
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db.crud.archive import archive_session
+from llm_gamebook.db.crud.message import get_messages
+from llm_gamebook.db.migrations import MIGRATIONS, create_or_migrate_schema
+from llm_gamebook.db.models import Message, Session, SessionArchive, Usage
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.part import PartKind
+
+# The schema of the first release, before any migration
+_BASELINE_SCHEMA = (
+    """
+    CREATE TABLE modelconfig (
+        name VARCHAR NOT NULL,
+        provider VARCHAR(17),
+        model_name VARCHAR NOT NULL,
+        base_url VARCHAR,
+        api_key TEXT,
+        context_window INTEGER NOT NULL,
+        max_tokens INTEGER NOT NULL,
+        temperature FLOAT NOT NULL,
+        top_p FLOAT NOT NULL,
+        presence_penalty FLOAT NOT NULL,
+        frequency_penalty FLOAT NOT NULL,
+        id CHAR(32) NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE session (
+        timestamp DATETIME NOT NULL,
+        id CHAR(32) NOT NULL,
+        title VARCHAR,
+        project_id VARCHAR NOT NULL,
+        config_id CHAR(32),
+        PRIMARY KEY (id),
+        FOREIGN KEY(config_id) REFERENCES modelconfig (id)
+    )
+    """,
+    """
+    CREATE TABLE message (
+        timestamp DATETIME NOT NULL,
+        kind VARCHAR(8),
+        finish_reason VARCHAR(14),
+        id CHAR(32) NOT NULL,
+        session_id CHAR(32),
+        instructions VARCHAR,
+        state JSON,
+        PRIMARY KEY (id),
+        FOREIGN KEY(session_id) REFERENCES session (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE part (
+        timestamp DATETIME NOT NULL,
+        kind VARCHAR(12),
+        content VARCHAR,
+        tool_name VARCHAR,
+        tool_call_id VARCHAR,
+        args VARCHAR,
+        duration_seconds INTEGER,
+        id CHAR(32) NOT NULL,
+        message_id CHAR(32),
+        PRIMARY KEY (id),
+        FOREIGN KEY(message_id) REFERENCES message (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE usage (
+        input_tokens INTEGER NOT NULL,
+        output_tokens INTEGER NOT NULL,
+        cache_write_tokens INTEGER NOT NULL,
+        cache_read_tokens INTEGER NOT NULL,
+        id CHAR(32) NOT NULL,
+        message_id CHAR(32) NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(message_id) REFERENCES message (id) ON DELETE CASCADE
+    )
+    """,
+)
+
+_SESSION_ID = uuid4()
+_EARLIER_ID = uuid4()
+_LATER_ID = uuid4()
+
+
+def _create_baseline_database(conn: Connection) -> None:
+    """Replace the current schema with the baseline one, holding a session with two messages."""
+    SQLModel.metadata.drop_all(conn)
+    for statement in _BASELINE_SCHEMA:
+        conn.execute(text(statement))
+    conn.execute(text("PRAGMA user_version = 0"))
+
+    config_id = uuid4().hex
+    conn.execute(
+        text("""
+            INSERT INTO modelconfig VALUES (
+                'Test Config', 'OPENAI_COMPATIBLE', 'gpt-4', NULL, NULL,
+                4096, 1024, 0.7, 0.9, 0.0, 0.0, :id
+            )
+        """),
+        {"id": config_id},
+    )
+    conn.execute(
+        text("""
+            INSERT INTO session VALUES ('2025-01-01 11:00:00.000000', :id, NULL, 'test', :config)
+        """),
+        {"id": _SESSION_ID.hex, "config": config_id},
+    )
+    # Inserted out of order, messages had random IDs
+    conn.execute(
+        text("""
+            INSERT INTO message VALUES
+                ('2025-01-01 12:01:00.000000', 'RESPONSE', 'STOP', :later, :session, NULL, NULL),
+                ('2025-01-01 12:00:00.000000', 'REQUEST', NULL, :earlier, :session, NULL, NULL)
+        """),
+        {"later": _LATER_ID.hex, "earlier": _EARLIER_ID.hex, "session": _SESSION_ID.hex},
+    )
+    conn.execute(
+        text("""
+            INSERT INTO part VALUES
+                ('2025-01-01 12:01:00.000000', 'THINKING', 'Hmm', NULL, NULL, NULL, NULL,
+                 :thinking, :message),
+                ('2025-01-01 12:01:00.000000', 'TEXT', 'Hello', NULL, NULL, NULL, NULL,
+                 :text, :message)
+        """),
+        {"thinking": uuid4().hex, "text": uuid4().hex, "message": _LATER_ID.hex},
+    )
+    conn.execute(
+        text("INSERT INTO usage VALUES (100, 20, 0, 0, :id, :message)"),
+        {"id": uuid4().hex, "message": _LATER_ID.hex},
+    )
+
+
+def _user_version(conn: Connection) -> int:
+    version: int = conn.execute(text("PRAGMA user_version")).scalar_one()
+    return version
+
+
+def _missing_columns(conn: Connection) -> set[str]:
+    inspector = inspect(conn)
+    return {
+        f"{table.name}.{column.name}"
+        for table in SQLModel.metadata.sorted_tables
+        for column in table.columns
+        if column.name not in {c["name"] for c in inspector.get_columns(table.name)}
+    }
+
+
+async def test_create_new_database(db_engine: AsyncEngine) -> None:
+    async with db_engine.begin() as conn:
+        await conn.run_sync(lambda c: c.execute(text("DROP TABLE session")))
+        await conn.run_sync(create_or_migrate_schema)
+
+        assert await conn.run_sync(_user_version) == len(MIGRATIONS)
+
+
+async def test_migrate_baseline_database(db_engine: AsyncEngine) -> None:
+    async with db_engine.begin() as conn:
+        await conn.run_sync(_create_baseline_database)
+        await conn.run_sync(create_or_migrate_schema)
+        # Up to date, nothing left to apply
+        await conn.run_sync(create_or_migrate_schema)
+
+        assert await conn.run_sync(_user_version) == len(MIGRATIONS)
+        assert await conn.run_sync(_missing_columns) == set()
+
+
+async def test_migrate_backfills_session_counters(db_engine: AsyncEngine) -> None:
+    async with db_engine.begin() as conn:
+        await conn.run_sync(_create_baseline_database)
+        await conn.run_sync(create_or_migrate_schema)
+
+    async with AsyncDbSession(db_engine) as db_session:
+        migrated = await db_session.get(Session, _SESSION_ID)
+
+    assert migrated is not None
+    assert migrated.message_count == 2
+    assert migrated.last_message_at is not None
+    assert migrated.input_tokens == 100
+    assert migrated.output_tokens == 20
+    assert migrated.archived_at is None
+    assert migrated.fallback_config_id is None
+    assert migrated.hedge_after_seconds == pytest.approx(5.0)
+
+
+async def test_migrate_numbers_messages_and_parts(db_engine: AsyncEngine) -> None:
+    async with db_engine.begin() as conn:
+        await conn.run_sync(_create_baseline_database)
+        await conn.run_sync(create_or_migrate_schema)
+
+    async with AsyncDbSession(db_engine) as db_session:
+        messages = await get_messages(db_session, _SESSION_ID)
+
+        assert [(m.id, m.seq) for m in messages] == [(_EARLIER_ID, 1), (_LATER_ID, 2)]
+        assert all(m.ttft_seconds is None and m.timings is None for m in messages)
+        assert [(p.kind, p.seq) for p in messages[1].parts] == [
+            (PartKind.THINKING, 0),
+            (PartKind.TEXT, 1),
+        ]
+
+
+async def test_migrate_sums_up_archived_usage(
+    db_engine: AsyncEngine, db_session: AsyncDbSession, session: Session
+) -> None:
+    db_session.add(
+        Message(
+            kind=MessageKind.RESPONSE,
+            session_id=session.id,
+            usage=Usage(
+                input_tokens=100, output_tokens=20, cache_read_tokens=5, cache_write_tokens=0
+            ),
+        )
+    )
+    await db_session.commit()
+    await archive_session(db_session, session.id)
+    await db_session.close()
+
+    async with db_engine.begin() as conn:
+        # Archived before the usage was summed up
+        await conn.run_sync(
+            lambda c: c.execute(
+                text("""
+                    UPDATE sessionarchive SET
+                        input_tokens = 0, output_tokens = 0, cache_read_tokens = 0, requests = 0
+                """)
+            )
+        )
+        await conn.run_sync(
+            lambda c: c.execute(text(f"PRAGMA user_version = {len(MIGRATIONS) - 1}"))
+        )
+        await conn.run_sync(create_or_migrate_schema)
+
+    async with AsyncDbSession(db_engine) as fresh_session:
+        archive = await fresh_session.get(SessionArchive, session.id)
+
+    assert archive is not None
+    assert (archive.requests, archive.input_tokens, archive.output_tokens) == (1, 100, 20)
+    assert archive.cache_read_tokens == 5
@@ -0,0 +1,152 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from llm_gamebook.engine.coordinator import GenerationCoordinator
+
+
+class _Generator:
+    """Counts generations and blocks each one until released."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+
+
+@pytest.fixture
+def coordinator() -> GenerationCoordinator:
+    return GenerationCoordinator(uuid4())
+
+
+async def test_submit_runs_generation(coordinator: GenerationCoordinator) -> None:
+    generate = _Generator()
+    generate.release.set()
+
+    await coordinator.submit(uuid4(), generate)
+
+    assert generate.calls == 1
+    assert not coordinator.is_running
+
+
+async def test_submit_duplicate_request_runs_once(coordinator: GenerationCoordinator) -> None:
+    generate = _Generator()
+    request_id = uuid4()
+
+    waiters = [asyncio.create_task(coordinator.submit(request_id, generate)) for _ in range(10)]
+    await generate.started.wait()
+    generate.release.set()
+    await asyncio.gather(*waiters)
+
+    assert generate.calls == 1
+
+
+async def test_submit_finished_request_is_ignored(coordinator: GenerationCoordinator) -> None:
+    generate = _Generator()
+    generate.release.set()
+    request_id = uuid4()
+
+    await coordinator.submit(request_id, generate)
+    await coordinator.submit(request_id, generate)
+
+    assert generate.calls == 1
+
+
+async def test_submit_coalesces_requests_while_running(
+    coordinator: GenerationCoordinator,
+) -> None:
+    generate = _Generator()
+
+    first = asyncio.create_task(coordinator.submit(uuid4(), generate))
+    await generate.started.wait()
+    assert coordinator.is_running
+
+    queued = [asyncio.create_task(coordinator.submit(uuid4(), generate)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert generate.calls == 1
+
+    generate.release.set()
+    await asyncio.gather(first, *queued)
+
+    # One run for the first request, one follow-up run for all queued requests
+    assert generate.calls == 2
+    assert not coordinator.is_running
+
+
+async def test_submit_error_propagates_to_all_waiters(
+    coordinator: GenerationCoordinator,
+) -> None:
+    request_id = uuid4()
+    started = asyncio.Event()
+
+    async def fail() -> None:
+        started.set()
+        await asyncio.sleep(0)
+        msg = "Generation failed"
+        raise RuntimeError(msg)
+
+    waiters = [asyncio.create_task(coordinator.submit(request_id, fail)) for _ in range(3)]
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert started.is_set()
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_submit_cancelled_waiter_does_not_cancel_generation(
+    coordinator: GenerationCoordinator,
+) -> None:
+    generate = _Generator()
+    request_id = uuid4()
+
+    waiter = asyncio.create_task(coordinator.submit(request_id, generate))
+    await generate.started.wait()
+    waiter.cancel()
+    await asyncio.sleep(0)
+
+    assert coordinator.is_running
+
+    generate.release.set()
+    await coordinator.submit(request_id, generate)
+
+    assert generate.calls == 1
+
+
+async def test_cancel_without_generation(coordinator: GenerationCoordinator) -> None:
+    assert not coordinator.cancel()
+
+
+async def test_cancel_running_generation(coordinator: GenerationCoordinator) -> None:
+    generate = _Generator()
+
+    waiter = asyncio.create_task(coordinator.submit(uuid4(), generate))
+    await generate.started.wait()
+
+    assert coordinator.cancel()
+    await waiter  # Waiters return normally
+
+    assert not coordinator.is_running
+
+
+async def test_cancel_starts_queued_run(coordinator: GenerationCoordinator) -> None:
+    generate = _Generator()
+
+    first = asyncio.create_task(coordinator.submit(uuid4(), generate))
+    await generate.started.wait()
+    second = asyncio.create_task(coordinator.submit(uuid4(), generate))
+    await asyncio.sleep(0)
+
+    generate.started.clear()
+    assert coordinator.cancel()
+    await first
+
+    await generate.started.wait()
+    generate.release.set()
+    await second
+
+    assert generate.calls == 2
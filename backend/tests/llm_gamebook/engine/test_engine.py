@@ -1,4 +1,6 @@
+import asyncio
 from collections.abc import AsyncIterator
+from uuid import uuid4
 
 import httpx
 import pytest
@@ -9,6 +11,7 @@ from pydantic_ai import (
     ModelHTTPError,
     ModelMessage,
     ModelRequest,
+    ModelResponse,
     RunContext,
     RunUsage,
     ToolDefinition,
@@ -18,19 +21,25 @@ from pydantic_ai.models.function import AgentInfo, FunctionModel
 from pydantic_ai.models.test import TestModel
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
+from llm_gamebook.db import DbSessionFactory
+from llm_gamebook.db.crud.message import get_messages
 from llm_gamebook.db.models import Session
-from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.message import FinishReason, MessageKind
 from llm_gamebook.db.models.part import PartKind
 from llm_gamebook.engine.engine import StoryEngine
 from llm_gamebook.engine.message import (
     ContentDelta,
+    HistoryWindowMessage,
+    ResponseCancelledMessage,
     ResponseStartedMessage,
     ResponseStoppedMessage,
+    ResponseTimingMessage,
     StreamMessageMessage,
     StreamPartDeltaMessage,
     StreamPartMessage,
 )
 from llm_gamebook.engine.session_adapter import SessionAdapter
+from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.story.context import StoryContext
 from llm_gamebook.story.traits.graph import GraphTransitionAction
 from llm_gamebook.web.schemas.session.message import ModelRequestCreate
@@ -41,7 +50,7 @@ from .conftest import EngineErrorMessages, EngineMessages, StreamMessages
 
 async def test_story_engine_generate_response_streaming(
     story_engine: StoryEngine,
-    db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     engine_messages: EngineMessages,
     engine_error_messages: EngineErrorMessages,
     stream_messages: StreamMessages,
@@ -56,7 +65,7 @@ async def test_story_engine_generate_response_streaming(
     func_model = FunctionModel(stream_function=stream_function)
     story_engine.set_model(func_model)
 
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     assert len(engine_messages) == 2
     start_message, stop_message = engine_messages
@@ -118,7 +127,7 @@ async def test_story_engine_generate_response_streaming(
 )
 async def test_story_engine_generate_response_error(
     story_engine: StoryEngine,
-    db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     engine_messages: EngineMessages,
     engine_error_messages: EngineErrorMessages,
     session: Session,
@@ -131,7 +140,7 @@ async def test_story_engine_generate_response_error(
     error_model = FunctionModel(stream_function=mock_fail_stream)
     story_engine.set_model(error_model)
 
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     assert len(engine_messages) == 2
     start_message, stop_message = engine_messages
@@ -195,7 +204,7 @@ async def test_set_model_creates_new_agent_instance(story_engine: StoryEngine) -
 
 async def test_set_model_allows_subsequent_requests_with_new_model(
     story_engine: StoryEngine,
-    db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     engine_messages: EngineMessages,
     engine_error_messages: EngineErrorMessages,
     session: Session,
@@ -203,7 +212,7 @@ async def test_set_model_allows_subsequent_requests_with_new_model(
     new_model = TestModel(custom_output_text="Response from new model")
     story_engine.set_model(new_model)
 
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     assert len(engine_messages) == 2
     start_message, stop_message = engine_messages
@@ -259,6 +268,7 @@ async def test_prepare_tools_returns_tools_for_conversation(
 async def test_state_persists_after_response(
     story_engine: StoryEngine,
     db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     engine_error_messages: EngineErrorMessages,
 ) -> None:
     action = GraphTransitionAction(entity_id="main", to="spark_of_hope")
@@ -270,7 +280,7 @@ async def test_state_persists_after_response(
     func_model = FunctionModel(stream_function=stream_fn)
     story_engine.set_model(func_model)
 
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     assert len(engine_error_messages) == 0
 
@@ -284,6 +294,7 @@ async def test_state_persists_after_response(
 async def test_generate_response_persists_response_messages(
     story_engine: StoryEngine,
     db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     session: Session,
 ) -> None:
     async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
@@ -293,7 +304,7 @@ async def test_generate_response_persists_response_messages(
     story_engine.set_model(func_model)
 
     count_before = await story_engine.session_adapter.get_message_count(db_session)
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
     count_after = await story_engine.session_adapter.get_message_count(db_session)
 
     assert count_before == 0
@@ -308,6 +319,7 @@ async def test_generate_response_persists_response_messages(
 async def test_generate_response_first_run_has_intro_message(
     story_engine: StoryEngine,
     db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     session: Session,
 ) -> None:
     async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
@@ -316,7 +328,7 @@ async def test_generate_response_first_run_has_intro_message(
     func_model = FunctionModel(stream_function=stream_fn)
     story_engine.set_model(func_model)
 
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
 
     messages = [msg async for msg in story_engine.session_adapter.get_message_history(db_session)]
     assert len(messages) == 2
@@ -332,6 +344,7 @@ async def test_generate_response_first_run_has_intro_message(
 async def test_generate_response_no_duplicate_messages_after_multiple_calls(
     story_engine: StoryEngine,
     db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     session: Session,
 ) -> None:
     call_count = 0
@@ -351,10 +364,10 @@ async def test_generate_response_no_duplicate_messages_after_multiple_calls(
     func_model = FunctionModel(stream_function=stream_fn)
     story_engine.set_model(func_model)
 
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
     count_after_first = await story_engine.session_adapter.get_message_count(db_session)
 
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
     count_after_second = await story_engine.session_adapter.get_message_count(db_session)
 
     assert count_after_first == 2
@@ -364,6 +377,7 @@ async def test_generate_response_no_duplicate_messages_after_multiple_calls(
 async def test_generate_response_does_not_persist_input_request_messages(
     story_engine: StoryEngine,
     db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
     session: Session,
 ) -> None:
     adapter = SessionAdapter(session.id, story_engine._context, story_engine._bus)
@@ -377,7 +391,7 @@ async def test_generate_response_does_not_persist_input_request_messages(
     story_engine.set_model(func_model)
 
     count_before = await story_engine.session_adapter.get_message_count(db_session)
-    await story_engine.generate_response(db_session)
+    await story_engine.generate_response(db_session_factory)
     count_after = await story_engine.session_adapter.get_message_count(db_session)
 
     assert count_before == 1
@@ -388,3 +402,133 @@ async def test_generate_response_does_not_persist_input_request_messages(
     response_messages = [m for m in messages if m.kind == "response"]
     assert len(request_messages) == 1
     assert len(response_messages) == 1
+
+
+async def test_story_engine_cancel_response_persists_partial_response(
+    story_engine: StoryEngine,
+    db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
+    message_bus: MessageBus,
+    session: Session,
+) -> None:
+    streaming = asyncio.Event()
+
+    async def stream_function(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        yield "Once upon"
+        yield " a time"
+        streaming.set()
+        await asyncio.Event().wait()  # Stall the stream
+        yield "Unreachable"
+
+    story_engine.set_model(FunctionModel(stream_function=stream_function))
+
+    cancelled: list[ResponseCancelledMessage] = []
+
+    def track_cancelled(msg: ResponseCancelledMessage) -> None:
+        cancelled.append(msg)
+
+    message_bus.subscribe(ResponseCancelledMessage, track_cancelled)
+
+    assert not story_engine.cancel_response()
+
+    task = asyncio.create_task(story_engine.request_response(db_session_factory, uuid4()))
+    await streaming.wait()
+    assert story_engine.cancel_response()
+    await task
+
+    assert len(cancelled) == 1
+    assert cancelled[0].session_id == session.id
+
+    messages = await get_messages(db_session, session.id)
+    response = messages[-1]
+    assert response.kind == MessageKind.RESPONSE
+    assert response.finish_reason == FinishReason.CANCELLED
+    assert response.parts[0].content == "Once upon a time"
+
+    # Cancelled responses remain valid message history
+    model_response = response.to_model_message()
+    assert isinstance(model_response, ModelResponse)
+    assert model_response.finish_reason is None
+
+
+async def test_story_engine_trims_history_to_context_window(
+    story_engine: StoryEngine,
+    db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
+    message_bus: MessageBus,
+    session: Session,
+) -> None:
+    async def reply(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        yield "Response"
+
+    story_engine.set_model(FunctionModel(stream_function=reply))
+    adapter = story_engine.session_adapter
+    for idx in range(10):
+        message_in = ModelRequestCreate(parts=[UserPromptPartCreate(content=f"{idx} " * 200)])
+        await adapter.create_user_request(db_session, message_in)
+        await story_engine.generate_response(db_session_factory)
+
+    message_in = ModelRequestCreate(parts=[UserPromptPartCreate(content="Latest")])
+    await adapter.create_user_request(db_session, message_in)
+
+    windows: list[HistoryWindowMessage] = []
+
+    def track_window(msg: HistoryWindowMessage) -> None:
+        windows.append(msg)
+
+    message_bus.subscribe(HistoryWindowMessage, track_window)
+    received: list[ModelMessage] = []
+
+    async def stream_function(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        received.extend(messages)
+        yield "Response"
+
+    story_engine.set_model(FunctionModel(stream_function=stream_function), context_window=1000)
+    await story_engine.generate_response(db_session_factory)
+
+    assert len(windows) == 1
+    assert windows[0].trimmed_messages > 0
+    assert windows[0].trimmed_tokens > 0
+    assert windows[0].tokens <= 500
+
+    # The most recent request is still sent
+    last_request = received[-1]
+    assert isinstance(last_request, ModelRequest)
+    assert last_request.parts[0].content == "Latest"
+
+
+async def test_story_engine_publishes_timing(
+    story_engine: StoryEngine,
+    db_session: AsyncDbSession,
+    db_session_factory: DbSessionFactory,
+    message_bus: MessageBus,
+    session: Session,
+) -> None:
+    timings: list[ResponseTimingMessage] = []
+
+    def track_timing(msg: ResponseTimingMessage) -> None:
+        timings.append(msg)
+
+    message_bus.subscribe(ResponseTimingMessage, track_timing)
+
+    async def stream_function(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        yield "Timed"
+        yield " response"
+
+    story_engine.set_model(FunctionModel(stream_function=stream_function))
+    await story_engine.generate_response(db_session_factory)
+
+    assert len(timings) == 1
+    timing = timings[0]
+    assert timing.session_id == session.id
+    assert timing.ttft_seconds is not None
+    assert {"history", "prompt", "model_request", "agent_run", "commit", "total"} <= set(
+        timing.spans
+    )
+
+    # Persisted with the response
+    response = (await get_messages(db_session, session.id))[-1]
+    assert response.kind == MessageKind.RESPONSE
+    assert response.ttft_seconds is not None
+    assert response.timings is not None
+    assert "stream" in response.timings
@@ -0,0 +1,160 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from pydantic_ai import Agent, ModelAPIError, ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from llm_gamebook.engine.hedging import BreakerState, CircuitBreaker, CircuitBreakers, HedgedModel
+from llm_gamebook.metrics import HEDGED_REQUESTS
+
+
+def _provider_down(model_name: str) -> ModelAPIError:
+    msg = "Provider down"
+    return ModelAPIError(model_name, msg)
+
+
+def _model(name: str, text: str, delay: float = 0.0, *, fail: bool = False) -> FunctionModel:
+    async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        await asyncio.sleep(delay)
+        if fail:
+            raise _provider_down(name)
+        yield text
+
+    return FunctionModel(stream_function=stream_fn, model_name=name)
+
+
+async def _run(model: HedgedModel) -> tuple[str, str | None]:
+    agent = Agent(model, output_type=str)
+    async with agent.run_stream("Hi") as result:
+        output = await result.get_output()
+    return output, result.response.model_name
+
+
+async def test_hedged_model_fast_primary_wins() -> None:
+    before = HEDGED_REQUESTS.get("none", "primary")
+    model = HedgedModel(_model("primary", "Fast"), _model("fallback", "Fallback"), hedge_after=1.0)
+
+    assert await _run(model) == ("Fast", "primary")
+    assert HEDGED_REQUESTS.get("none", "primary") == before + 1
+
+
+async def test_hedged_model_slow_primary_is_hedged() -> None:
+    before = HEDGED_REQUESTS.get("slow", "fallback")
+    primary = _model("primary", "Slow", delay=1.0)
+    model = HedgedModel(primary, _model("fallback", "Fallback"), hedge_after=0.05)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await _run(model) == ("Fallback", "fallback")
+    assert loop.time() - start < 0.5  # the primary was cancelled, not waited for
+    assert HEDGED_REQUESTS.get("slow", "fallback") == before + 1
+
+
+async def test_hedged_model_primary_wins_hedge() -> None:
+    before = HEDGED_REQUESTS.get("slow", "primary")
+    primary = _model("primary", "Primary", delay=0.1)
+    model = HedgedModel(primary, _model("fallback", "Fallback", delay=1.0), hedge_after=0.05)
+
+    assert await _run(model) == ("Primary", "primary")
+    assert HEDGED_REQUESTS.get("slow", "primary") == before + 1
+
+
+async def test_hedged_model_slow_failing_primary_counts_once() -> None:
+    breakers = CircuitBreakers(failure_threshold=2, cooldown=60.0)
+    primary = _model("primary", "Unreachable", delay=0.1, fail=True)
+    model = HedgedModel(primary, _model("fallback", "Fallback", delay=0.3), 0.05, breakers)
+
+    assert await _run(model) == ("Fallback", "fallback")
+    assert breakers.get(model.wrapped).state is BreakerState.CLOSED
+
+
+async def test_hedged_model_slow_primary_win_closes_breaker() -> None:
+    breakers = CircuitBreakers(failure_threshold=2, cooldown=60.0)
+    primary = _model("primary", "Primary", delay=0.1)
+    model = HedgedModel(primary, _model("fallback", "Fallback", delay=1.0), 0.05, breakers)
+    breakers.get(model.wrapped).record_failure()
+
+    assert await _run(model) == ("Primary", "primary")
+    breakers.get(model.wrapped).record_failure()
+    assert breakers.get(model.wrapped).state is BreakerState.CLOSED
+
+
+async def test_hedged_model_fails_over_on_error() -> None:
+    before = HEDGED_REQUESTS.get("error", "fallback")
+    primary = _model("primary", "Unreachable", fail=True)
+    model = HedgedModel(primary, _model("fallback", "Fallback"), hedge_after=1.0)
+
+    assert await _run(model) == ("Fallback", "fallback")
+    assert HEDGED_REQUESTS.get("error", "fallback") == before + 1
+
+
+async def test_hedged_model_raises_if_all_fail() -> None:
+    primary = _model("primary", "Unreachable", fail=True)
+    model = HedgedModel(primary, _model("fallback", "Unreachable", fail=True), hedge_after=1.0)
+
+    with pytest.raises(ModelAPIError, match="Provider down"):
+        await _run(model)
+
+
+async def test_hedged_model_routes_around_open_breaker() -> None:
+    calls: list[str] = []
+
+    def counting(name: str, *, fail: bool = False) -> FunctionModel:
+        async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+            calls.append(name)
+            if fail:
+                raise _provider_down(name)
+            yield name
+
+        return FunctionModel(stream_function=stream_fn, model_name=name)
+
+    breakers = CircuitBreakers(failure_threshold=2, cooldown=60.0)
+    model = HedgedModel(counting("primary", fail=True), counting("fallback"), 1.0, breakers)
+
+    for _ in range(3):
+        assert await _run(model) == ("fallback", "fallback")
+
+    # The third request skipped the primary
+    assert calls == ["primary", "fallback", "primary", "fallback", "fallback"]
+    assert breakers.get(model.wrapped).state is BreakerState.OPEN
+
+
+async def test_hedged_model_request_fails_over() -> None:
+    error = _provider_down("primary")
+
+    async def primary_fn(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        raise error
+
+    async def fallback_fn(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        return ModelResponse(parts=[TextPart("Fallback")])
+
+    model = HedgedModel(
+        FunctionModel(primary_fn, model_name="primary"),
+        FunctionModel(fallback_fn, model_name="fallback"),
+        hedge_after=1.0,
+    )
+    result = await Agent(model, output_type=str).run("Hi")
+
+    assert result.output == "Fallback"
+
+
+def test_circuit_breaker_opens_and_recovers() -> None:
+    breaker = CircuitBreaker(("function", None, "model"), failure_threshold=2, cooldown=60.0)
+
+    breaker.record_failure()
+    state_after_one = breaker.state
+    breaker.record_failure()
+    assert (state_after_one, breaker.state) == (BreakerState.CLOSED, BreakerState.OPEN)
+    assert not breaker.allow()
+
+    # After the cooldown a single trial is admitted
+    assert breaker._opened_at is not None
+    breaker._opened_at -= 60.0
+    state_after_cooldown = breaker.state
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert (state_after_cooldown, breaker.state) == (BreakerState.HALF_OPEN, BreakerState.CLOSED)
+    assert breaker.allow()
@@ -0,0 +1,86 @@
+from uuid import UUID, uuid4
+
+from pydantic_ai import ModelMessage, ModelRequest, ModelResponse, TextPart, UserPromptPart
+
+from llm_gamebook.engine.history import (
+    MESSAGE_OVERHEAD_TOKENS,
+    TokenEstimator,
+    apply_history_window,
+)
+
+
+def _request(content: str) -> tuple[UUID, ModelMessage]:
+    return uuid4(), ModelRequest(parts=[UserPromptPart(content=content)])
+
+
+def _response(content: str) -> tuple[UUID, ModelMessage]:
+    return uuid4(), ModelResponse(parts=[TextPart(content=content)])
+
+
+def _history(turns: int) -> list[tuple[UUID, ModelMessage]]:
+    # Every message is 10 + 4 tokens
+    messages = [_request("i" * 40), _response("o" * 40)]
+    for idx in range(turns):
+        messages += [_request(f"{idx}" * 40), _response(f"{idx}" * 40)]
+    return messages
+
+
+def test_token_estimator_estimate() -> None:
+    estimator = TokenEstimator()
+    message_id, message = _request("a" * 40)
+
+    assert estimator.estimate(message_id, message) == 10 + MESSAGE_OVERHEAD_TOKENS
+
+
+def test_token_estimator_caches_by_message_id() -> None:
+    estimator = TokenEstimator()
+    message_id, message = _request("a" * 40)
+    estimator.estimate(message_id, message)
+
+    # Persisted messages don't change, the cached value is returned
+    message.parts = []
+    assert estimator.estimate(message_id, message) == 10 + MESSAGE_OVERHEAD_TOKENS
+
+
+def test_apply_history_window_without_budget() -> None:
+    messages = _history(5)
+
+    window = apply_history_window(messages, TokenEstimator(), None)
+
+    assert len(window.messages) == len(messages)
+    assert window.tokens == 14 * len(messages)
+    assert window.trimmed_tokens == 0
+    assert window.trimmed_messages == 0
+
+
+def test_apply_history_window_keeps_intro_and_recent_turns() -> None:
+    messages = _history(5)
+
+    # Intro (2 messages) and two turns (4 messages)
+    window = apply_history_window(messages, TokenEstimator(), 14 * 6 + 10)
+
+    assert window.messages[:2] == [msg for _, msg in messages[:2]]
+    assert window.messages[2:] == [msg for _, msg in messages[-4:]]
+    assert window.tokens == 14 * 6
+    assert window.trimmed_tokens == 14 * 6
+    assert window.trimmed_messages == 6
+
+
+def test_apply_history_window_keeps_latest_turn_over_budget() -> None:
+    messages = [*_history(3), _request("x" * 4000)]
+
+    window = apply_history_window(messages, TokenEstimator(), 100)
+
+    assert len(window.messages) == 3
+    assert window.messages[-1] is messages[-1][1]
+    assert window.trimmed_messages == 6
+
+
+def test_apply_history_window_trims_whole_turns() -> None:
+    messages = _history(3)
+
+    window = apply_history_window(messages, TokenEstimator(), 14 * 5)
+
+    # A turn is never split, so the history resumes with a request
+    assert isinstance(window.messages[2], ModelRequest)
+    assert len(window.messages) == 4
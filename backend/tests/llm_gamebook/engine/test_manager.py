@@ -1,11 +1,19 @@
-from uuid import uuid4
+import asyncio
+from unittest.mock import patch
+from uuid import UUID, uuid4
 
 import pytest
+from pydantic_ai.models import Model
 from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
-from llm_gamebook.db.models import Session
+from llm_gamebook.db.crud.archive import archive_session
+from llm_gamebook.db.crud.message import get_messages
+from llm_gamebook.db.models import Message, ModelConfig, Session
+from llm_gamebook.engine.hedging import HedgedModel
 from llm_gamebook.engine.manager import EngineManager
+from llm_gamebook.engine.message import EngineCreated
 from llm_gamebook.message_bus import MessageBus
+from llm_gamebook.story.context import StoryContext
 from llm_gamebook.story.project_manager import ProjectManager
 
 
@@ -50,12 +58,46 @@ async def test_engine_manager_create_model_and_state(
     project_manager: ProjectManager,
     engine_manager: EngineManager,
 ) -> None:
-    model, context = await engine_manager._create_model_and_context(
+    model, context, context_window = await engine_manager._create_model_and_context(
         session.id, db_session, project_manager
     )
 
     assert model is not None
     assert context is not None
+    assert context_window == 4096
+
+
+async def test_engine_manager_get_or_create_restores_archived_session(
+    session: Session,
+    message: Message,
+    db_session: AsyncDbSession,
+    project_manager: ProjectManager,
+    engine_manager: EngineManager,
+) -> None:
+    await archive_session(db_session, session.id)
+
+    await engine_manager.get_or_create(session.id, db_session, project_manager)
+
+    assert [m.id for m in await get_messages(db_session, session.id)] == [message.id]
+
+
+async def test_engine_manager_create_model_with_fallback(
+    session: Session,
+    model_config: ModelConfig,
+    db_session: AsyncDbSession,
+    project_manager: ProjectManager,
+    engine_manager: EngineManager,
+) -> None:
+    session.fallback_config_id = model_config.id
+    session.hedge_after_seconds = 2.5
+    await db_session.commit()
+
+    model, _, _ = await engine_manager._create_model_and_context(
+        session.id, db_session, project_manager
+    )
+
+    assert isinstance(model, HedgedModel)
+    assert model.hedge_after == pytest.approx(2.5)
 
 
 async def test_engine_manager_create_model_and_state_missing_session(
@@ -127,3 +169,89 @@ async def test_engine_manager_does_not_create_engine_until_requested(
 
     assert engine is not None
     assert session.id in engine_manager._engines
+
+
+async def test_engine_manager_get_or_create_concurrent_single_flight(
+    session: Session,
+    db_session: AsyncDbSession,
+    project_manager: ProjectManager,
+    engine_manager: EngineManager,
+    message_bus: MessageBus,
+) -> None:
+    created: list[EngineCreated] = []
+
+    def track_created(msg: EngineCreated) -> None:
+        created.append(msg)
+
+    message_bus.subscribe(EngineCreated, track_created)
+
+    with patch.object(
+        engine_manager,
+        "_create_model_and_context",
+        wraps=engine_manager._create_model_and_context,
+    ) as create_mock:
+        engines = await asyncio.gather(
+            *(
+                engine_manager.get_or_create(session.id, db_session, project_manager)
+                for _ in range(500)
+            )
+        )
+
+    assert create_mock.await_count == 1
+    assert all(engine is engines[0] for engine in engines)
+    assert engine_manager._engines[session.id][0] is engines[0]
+    assert len(created) == 1
+    assert not engine_manager._pending
+
+
+async def test_engine_manager_get_or_create_concurrent_error_propagates(
+    db_session: AsyncDbSession, project_manager: ProjectManager, engine_manager: EngineManager
+) -> None:
+    non_existent_session_id = uuid4()
+
+    results = await asyncio.gather(
+        *(
+            engine_manager.get_or_create(non_existent_session_id, db_session, project_manager)
+            for _ in range(100)
+        ),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert non_existent_session_id not in engine_manager._engines
+    assert not engine_manager._pending
+
+
+async def test_engine_manager_get_or_create_creator_cancelled(
+    session: Session,
+    db_session: AsyncDbSession,
+    project_manager: ProjectManager,
+    engine_manager: EngineManager,
+) -> None:
+    original = engine_manager._create_model_and_context
+    blocked = asyncio.Event()
+
+    async def block_first_call(
+        sid: UUID, db: AsyncDbSession, pm: ProjectManager
+    ) -> tuple[Model | None, StoryContext, int | None]:
+        if not blocked.is_set():
+            blocked.set()
+            await asyncio.Event().wait()
+        return await original(sid, db, pm)
+
+    with patch.object(engine_manager, "_create_model_and_context", side_effect=block_first_call):
+        creator = asyncio.create_task(
+            engine_manager.get_or_create(session.id, db_session, project_manager)
+        )
+        await blocked.wait()
+        waiter = asyncio.create_task(
+            engine_manager.get_or_create(session.id, db_session, project_manager)
+        )
+        await asyncio.sleep(0)
+
+        creator.cancel()
+        engine = await waiter
+
+    assert creator.cancelled()
+    assert engine_manager._engines[session.id][0] is engine
+    assert not engine_manager._pending
@@ -46,10 +46,12 @@ def test_session_deleted_message() -> None:
 def test_response_user_request_message() -> None:
     """Test ResponseUserRequestMessage construction."""
     session_id = uuid4()
-    msg = ResponseUserRequestMessage(session_id=session_id)
+    message_id = uuid4()
+    msg = ResponseUserRequestMessage(session_id=session_id, message_id=message_id)
 
     assert isinstance(msg, BaseMessage)
     assert msg.session_id == session_id
+    assert msg.message_id == message_id
 
 
 def test_response_started_message() -> None:
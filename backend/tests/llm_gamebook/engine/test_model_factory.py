@@ -1,3 +1,4 @@
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
@@ -7,7 +8,12 @@ from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.models.openrouter import OpenRouterModel
 from pydantic_ai.models.xai import XaiModel
 
-from llm_gamebook.engine._model_factory import _get_logging_http_client, create_model_from_db_config
+from llm_gamebook.engine._model_factory import (
+    _get_logging_http_client,
+    create_model_from_db_config,
+    create_recording_model_factory,
+)
+from llm_gamebook.engine.recording import RecordingModel, ReplayModel
 from llm_gamebook.providers import ModelProvider
 
 
@@ -19,6 +25,8 @@ def test_create_model_anthropic() -> None:
         api_key="test-key",
     )
     assert isinstance(model, AnthropicModel)
+    assert model.settings is not None
+    assert model.settings.get("anthropic_cache_instructions")
 
 
 def test_create_model_deepseek() -> None:
@@ -111,6 +119,38 @@ def test_create_model_xai_without_api_key() -> None:
         )
 
 
+def test_create_model_replay() -> None:
+    model = create_model_from_db_config(
+        model_name="recorded",
+        provider=ModelProvider.REPLAY,
+        base_url="run.jsonl?speed=10",
+        api_key=None,
+    )
+    assert isinstance(model, ReplayModel)
+    assert model.model_name == "recorded"
+
+
+def test_create_model_replay_without_base_url() -> None:
+    with pytest.raises(ValueError, match="recording file"):
+        create_model_from_db_config(
+            model_name="recorded",
+            provider=ModelProvider.REPLAY,
+            base_url=None,
+            api_key=None,
+        )
+
+
+def test_create_recording_model_factory(tmp_path: Path) -> None:
+    create_model = create_recording_model_factory(tmp_path / "run.jsonl")
+    model = create_model("gpt-4o", ModelProvider.OPENAI, None, "test-key")
+    assert isinstance(model, RecordingModel)
+    assert isinstance(model.wrapped, OpenAIChatModel)
+
+    # Replays are never recorded again
+    replay = create_model("recorded", ModelProvider.REPLAY, "run.jsonl", None)
+    assert isinstance(replay, ReplayModel)
+
+
 def test_create_model_unsupported_provider() -> None:
     with pytest.raises(ValueError, match="Unsupported provider"):
         create_model_from_db_config(
@@ -0,0 +1,110 @@
+import math
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from pydantic_ai import (
+    ModelAPIError,
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    PartDeltaEvent,
+    TextPart,
+    TextPartDelta,
+    UserPromptPart,
+)
+from pydantic_ai.models import Model, ModelRequestParameters
+from pydantic_ai.models.function import AgentInfo, DeltaToolCalls, FunctionModel
+
+from llm_gamebook.engine.recording import (
+    Recording,
+    RecordingModel,
+    ReplayModel,
+    get_request_fingerprint,
+)
+
+
+async def _stream_story(
+    messages: list[ModelMessage], info: AgentInfo
+) -> AsyncIterator[str | DeltaToolCalls]:
+    for chunk in ("The bulb ", "flickers ", "and dies."):
+        yield chunk
+
+
+def _get_messages(prompt: str, timestamp: datetime | None = None) -> list[ModelMessage]:
+    part = UserPromptPart(prompt, timestamp=timestamp or datetime.now(UTC))
+    return [ModelRequest(parts=[part], instructions="You are the narrator.")]
+
+
+async def _stream(model: Model, messages: list[ModelMessage]) -> tuple[list[str], ModelResponse]:
+    async with model.request_stream(messages, None, ModelRequestParameters()) as response:
+        deltas = [
+            event.delta.content_delta
+            async for event in response
+            if isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta)
+        ]
+        return deltas, response.get()
+
+
+def test_fingerprint_ignores_timestamps() -> None:
+    params = ModelRequestParameters()
+    first = get_request_fingerprint(_get_messages("look", datetime(2025, 1, 1, tzinfo=UTC)), params)
+    second = get_request_fingerprint(
+        _get_messages("look", datetime(2026, 1, 1, tzinfo=UTC)), params
+    )
+    other = get_request_fingerprint(_get_messages("run"), params)
+
+    assert first == second
+    assert first != other
+
+
+async def test_record_and_replay(tmp_path: Path) -> None:
+    path = tmp_path / "run.jsonl"
+    messages = _get_messages("look around")
+
+    recording_model = RecordingModel(FunctionModel(stream_function=_stream_story), path)
+    recorded_deltas, recorded = await _stream(recording_model, messages)
+
+    (line,) = path.read_text().splitlines()
+    recording = Recording.model_validate_json(line)
+    assert recording.fingerprint == get_request_fingerprint(messages, ModelRequestParameters())
+    assert len(recording.events) == 3
+
+    replay_model = ReplayModel(path, speed=math.inf)
+    replayed_deltas, replayed = await _stream(replay_model, _get_messages("look around"))
+
+    assert replayed_deltas == recorded_deltas
+    assert replayed.parts == recorded.parts
+    assert replayed.usage == recorded.usage
+    assert isinstance(replayed.parts[0], TextPart)
+    assert replayed.parts[0].content == "The bulb flickers and dies."
+
+
+async def test_replay_unknown_request(tmp_path: Path) -> None:
+    path = tmp_path / "run.jsonl"
+    recording_model = RecordingModel(FunctionModel(stream_function=_stream_story), path)
+    await _stream(recording_model, _get_messages("look around"))
+
+    replay_model = ReplayModel(path)
+    with pytest.raises(ModelAPIError, match="No recording"):
+        await _stream(replay_model, _get_messages("run away"))
+
+
+def test_replay_from_url(tmp_path: Path) -> None:
+    model = ReplayModel.from_url("file:run.jsonl?speed=4", "recorded", tmp_path)
+    assert model._path == tmp_path.resolve() / "run.jsonl"
+    assert model._speed == 4
+    assert model.model_name == "recorded"
+
+    model = ReplayModel.from_url(f"{tmp_path}/run.jsonl", recordings_path=tmp_path)
+    assert model._path == tmp_path.resolve() / "run.jsonl"
+
+    with pytest.raises(ValueError, match="positive"):
+        ReplayModel.from_url("run.jsonl?speed=0", recordings_path=tmp_path)
+
+
+@pytest.mark.parametrize("url", ["/etc/passwd", "file:///etc/passwd", "../run.jsonl"])
+def test_replay_from_url_outside_recordings(tmp_path: Path, url: str) -> None:
+    with pytest.raises(ValueError, match="must be in"):
+        ReplayModel.from_url(url, recordings_path=tmp_path / "recordings")
@@ -1,15 +1,20 @@
+import asyncio
+from collections.abc import AsyncIterator
 from typing import assert_never
 from uuid import UUID, uuid4
 
-from pydantic_ai import Agent, ModelMessage, ModelRequest, UserPromptPart
+import pytest
+from pydantic_ai import Agent, ModelMessage, ModelRequest, ModelResponse, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
 
-from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.message import FinishReason, MessageKind
 from llm_gamebook.engine._runner import StreamRunner
 from llm_gamebook.engine.message import (
     StreamMessageMessage,
     StreamPartDeltaMessage,
     StreamPartMessage,
 )
+from llm_gamebook.engine.timing import Timeline
 from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.story.context import StoryContext
 
@@ -223,3 +228,80 @@ async def test_stream_runner_does_not_store_request_messages(
 
     for stored_msg in stream_runner._messages:
         assert stored_msg.kind == MessageKind.RESPONSE
+
+
+async def test_stream_runner_records_usage(
+    stream_runner: StreamRunner, story_context: StoryContext
+) -> None:
+    messages: list[ModelMessage] = [ModelRequest(parts=[UserPromptPart(content="Hello")])]
+
+    result = list(await stream_runner.run(messages, story_context))
+
+    usage = result[-1].usage
+    assert usage is not None
+    assert usage.input_tokens > 0
+    assert usage.output_tokens > 0
+    assert usage.cache_read_tokens == 0
+
+
+async def test_stream_runner_records_usage_per_response(
+    test_agent: Agent[StoryContext, str], story_context: StoryContext, message_bus: MessageBus
+) -> None:
+    runner = StreamRunner(test_agent, uuid4(), message_bus, debounce=0.0)
+    messages: list[ModelMessage] = [ModelRequest(parts=[UserPromptPart(content="Hello")])]
+
+    result = list(await runner.run(messages, story_context))
+    expected = await test_agent.run(message_history=messages, deps=story_context)
+
+    # Tool calls and the final text are separate requests, each with its own usage
+    assert len(result) > 1
+    assert [m.usage.input_tokens for m in result if m.usage] == [
+        m.usage.input_tokens for m in expected.all_messages() if isinstance(m, ModelResponse)
+    ]
+
+
+async def test_stream_runner_cancel_keeps_partial_response(
+    message_bus: MessageBus, story_context: StoryContext
+) -> None:
+    streaming = asyncio.Event()
+
+    async def stream_function(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        yield "Once upon"
+        yield " a time"
+        streaming.set()
+        await asyncio.Event().wait()  # Stall the stream
+        yield "Unreachable"
+
+    agent = Agent(FunctionModel(stream_function=stream_function), deps_type=StoryContext)
+    runner = StreamRunner(agent, uuid4(), message_bus, debounce=0.0)
+    messages: list[ModelMessage] = [ModelRequest(parts=[UserPromptPart(content="Hello")])]
+
+    task = asyncio.create_task(runner.run(messages, story_context))
+    await streaming.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert len(runner.messages) == 1
+    response = runner.messages[0]
+    assert response.kind == MessageKind.RESPONSE
+    assert response.finish_reason == FinishReason.CANCELLED
+    assert len(response.parts) == 1
+    assert response.parts[0].content == "Once upon a time"
+
+
+async def test_stream_runner_records_timing(
+    test_agent: Agent[StoryContext, str], story_context: StoryContext, message_bus: MessageBus
+) -> None:
+    timeline = Timeline()
+    runner = StreamRunner(test_agent, uuid4(), message_bus, 0.0, timeline)
+    messages: list[ModelMessage] = [ModelRequest(parts=[UserPromptPart(content="Hello")])]
+
+    result = list(await runner.run(messages, story_context))
+
+    response = result[-1]
+    assert response.ttft_seconds is not None
+    assert response.timings is not None
+    assert response.timings["model_request"] >= response.timings["stream"]
+    assert timeline.get_mark("first_token") is not None
+    assert timeline.spans["model_request"] >= response.timings["model_request"]
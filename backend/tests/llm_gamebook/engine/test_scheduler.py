@@ -0,0 +1,266 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+from pydantic_ai import Agent, ModelHTTPError, ModelMessage
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from llm_gamebook.engine.message import ResponseQueuedMessage
+from llm_gamebook.engine.scheduler import (
+    RateLimits,
+    RequestScheduler,
+    SchedulerKey,
+    _get_retry_after,
+)
+from llm_gamebook.message_bus import MessageBus
+from llm_gamebook.providers import ModelProvider
+
+KEY: SchedulerKey = (ModelProvider.OPENAI_COMPATIBLE, "http://localhost:5001/v1")
+
+
+def _scheduler(message_bus: MessageBus, limits: RateLimits) -> RequestScheduler:
+    return RequestScheduler(message_bus, {ModelProvider.OPENAI_COMPATIBLE: limits})
+
+
+def _http_error(status_code: int, headers: dict[str, str] | None = None) -> ModelHTTPError:
+    err = ModelHTTPError(status_code, "fake-model")
+    cause = RuntimeError("Provider error")
+    cause.response = httpx.Response(status_code, headers=headers)  # type: ignore[attr-defined]
+    err.__cause__ = cause
+    return err
+
+
+@pytest.fixture
+def queued_messages(message_bus: MessageBus) -> list[ResponseQueuedMessage]:
+    events: list[ResponseQueuedMessage] = []
+
+    def track_queued(msg: ResponseQueuedMessage) -> None:
+        events.append(msg)
+
+    message_bus.subscribe(ResponseQueuedMessage, track_queued)
+    return events
+
+
+async def test_slot_limits_in_flight_requests(message_bus: MessageBus) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(max_in_flight=2))
+    in_flight = 0
+    max_seen = 0
+
+    async def request() -> None:
+        nonlocal in_flight, max_seen
+        async with scheduler.slot(KEY, uuid4()):
+            in_flight += 1
+            max_seen = max(max_seen, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(request() for _ in range(10)))
+
+    assert max_seen == 2
+
+
+async def test_slot_serves_sessions_round_robin(
+    message_bus: MessageBus, queued_messages: list[ResponseQueuedMessage]
+) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(max_in_flight=1))
+    session_a, session_b = uuid4(), uuid4()
+    order: list[tuple[UUID, int]] = []
+
+    async def request(session_id: UUID, idx: int) -> None:
+        async with scheduler.slot(KEY, session_id):
+            order.append((session_id, idx))
+
+    release = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot(KEY, uuid4()):
+            await release.wait()
+
+    blocking = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+
+    tasks = [asyncio.create_task(request(session_a, idx)) for idx in range(3)]
+    tasks.append(asyncio.create_task(request(session_b, 0)))
+    await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(blocking, *tasks)
+
+    assert order == [(session_a, 0), (session_b, 0), (session_a, 1), (session_a, 2)]
+
+    # Session B was queued behind the first request of session A
+    first_b = next(msg for msg in queued_messages if msg.session_id == session_b)
+    assert first_b.position == 2
+    last_b = [msg for msg in queued_messages if msg.session_id == session_b][-1]
+    assert last_b.position == 0
+
+
+async def test_slot_cancelled_waiter_leaves_queue(message_bus: MessageBus) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(max_in_flight=1))
+    release = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot(KEY, uuid4()):
+            await release.wait()
+
+    async def request() -> None:
+        async with scheduler.slot(KEY, uuid4()):
+            pass
+
+    blocking = asyncio.create_task(blocker())
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(request())
+    await asyncio.sleep(0)
+
+    queue = scheduler._get_queue(KEY)
+    assert queue.queued == 1
+
+    waiting.cancel()
+    await asyncio.sleep(0)
+    assert queue.queued == 0
+
+    release.set()
+    await blocking
+    assert queue.in_flight == 0
+
+
+async def test_release_skips_cancelled_waiter(message_bus: MessageBus) -> None:
+    queue = _scheduler(message_bus, RateLimits(max_in_flight=1))._get_queue(KEY)
+    await queue.acquire(uuid4())
+    waiting = asyncio.create_task(queue.acquire(uuid4()))
+    await asyncio.sleep(0)
+
+    # The waiter is cancelled at once, but leaves the queue only when its task runs
+    waiting.cancel()
+    queue.release()
+
+    assert queue.in_flight == 0
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert queue.queued == 0
+
+    await asyncio.wait_for(queue.acquire(uuid4()), 1)
+    assert queue.in_flight == 1
+
+
+async def test_slot_token_bucket_rate_limit(message_bus: MessageBus) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(requests_per_minute=600, burst=1))
+    session_id = uuid4()
+
+    start = time.monotonic()
+    for _ in range(3):
+        async with scheduler.slot(KEY, session_id):
+            pass
+
+    # 10 requests per second, the first one is admitted immediately
+    assert time.monotonic() - start >= 0.18
+
+
+async def test_scheduled_model_retries_rate_limit(message_bus: MessageBus) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(backoff_base=0.01))
+    calls = 0
+
+    async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise _http_error(429, {"retry-after-ms": "10"})
+        yield "Hello"
+
+    model = scheduler.wrap(FunctionModel(stream_function=stream_fn), KEY, uuid4())
+    agent = Agent(model, output_type=str)
+
+    async with agent.run_stream("Hi") as result:
+        output = await result.get_output()
+
+    assert output == "Hello"
+    assert calls == 2
+
+
+async def test_scheduled_model_releases_slot_during_backoff(message_bus: MessageBus) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(max_in_flight=1))
+    calls = 0
+
+    async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise _http_error(429, {"retry-after-ms": "50"})
+        yield "Hello"
+
+    model = scheduler.wrap(FunctionModel(stream_function=stream_fn), KEY, uuid4())
+    agent = Agent(model, output_type=str)
+
+    async def run() -> str:
+        async with agent.run_stream("Hi") as result:
+            return await result.get_output()
+
+    task = asyncio.create_task(run())
+    await asyncio.sleep(0.02)
+    assert calls == 1
+    assert scheduler._get_queue(KEY).in_flight == 0
+
+    assert await task == "Hello"
+    assert scheduler._get_queue(KEY).in_flight == 0
+
+
+async def test_scheduled_model_does_not_retry_client_error(message_bus: MessageBus) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(backoff_base=0.01))
+    calls = 0
+
+    async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        nonlocal calls
+        calls += 1
+        raise _http_error(400)
+        yield "Unreachable"
+
+    model = scheduler.wrap(FunctionModel(stream_function=stream_fn), KEY, uuid4())
+    agent = Agent(model, output_type=str)
+
+    with pytest.raises(ModelHTTPError):
+        async with agent.run_stream("Hi") as result:
+            await result.get_output()
+
+    assert calls == 1
+    assert scheduler._get_queue(KEY).in_flight == 0
+
+
+async def test_scheduled_model_gives_up_after_max_retries(message_bus: MessageBus) -> None:
+    scheduler = _scheduler(message_bus, RateLimits(max_retries=2, backoff_base=0.01))
+    calls = 0
+
+    async def stream_fn(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str]:
+        nonlocal calls
+        calls += 1
+        raise _http_error(429)
+        yield "Unreachable"
+
+    model = scheduler.wrap(FunctionModel(stream_function=stream_fn), KEY, uuid4())
+    agent = Agent(model, output_type=str)
+
+    with pytest.raises(ModelHTTPError):
+        async with agent.run_stream("Hi") as result:
+            await result.get_output()
+
+    assert calls == 3
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"retry-after": "2"}, 2.0),
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({"retry-after": "invalid"}, None),
+        ({}, None),
+    ],
+)
+def test_get_retry_after(headers: dict[str, str], expected: float | None) -> None:
+    assert _get_retry_after(_http_error(429, headers)) == expected
+
+
+def test_get_retry_after_without_response() -> None:
+    assert _get_retry_after(ModelHTTPError(429, "fake-model")) is None
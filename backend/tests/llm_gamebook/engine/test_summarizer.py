@@ -0,0 +1,137 @@
+from uuid import UUID, uuid4
+
+from pydantic_ai import ModelMessage, ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db.crud.message import create_messages
+from llm_gamebook.db.crud.summary import get_latest_summary
+from llm_gamebook.db.models import Message, Session, Summary
+from llm_gamebook.engine.session_adapter import SessionAdapter
+from llm_gamebook.engine.summarizer import (
+    SUMMARY_HEADING,
+    HistorySummarizer,
+    apply_summary,
+    find_summary_span,
+)
+
+
+def _history(turns: int) -> list[tuple[UUID, ModelMessage]]:
+    messages: list[tuple[UUID, ModelMessage]] = [
+        (uuid4(), ModelRequest(parts=[UserPromptPart(content="Intro")])),
+        (uuid4(), ModelResponse(parts=[TextPart(content="Opening")])),
+    ]
+    for idx in range(turns):
+        messages.extend([
+            (uuid4(), ModelRequest(parts=[UserPromptPart(content=f"Action {idx}")])),
+            (uuid4(), ModelResponse(parts=[TextPart(content=f"Outcome {idx}")])),
+        ])
+    return messages
+
+
+def _summary(history: list[tuple[UUID, ModelMessage]], end: int) -> Summary:
+    return Summary(
+        session_id=uuid4(),
+        content="The story so far",
+        start_message_id=history[2][0],
+        end_message_id=history[end - 1][0],
+        message_count=end - 2,
+    )
+
+
+def test_find_summary_span_too_few_turns() -> None:
+    assert find_summary_span(_history(5), None, 3, 3) is None
+
+
+def test_find_summary_span_without_summary() -> None:
+    # Intro (2 messages), then 3 turns of 2 messages
+    assert find_summary_span(_history(6), None, 3, 3) == (2, 8)
+
+
+def test_find_summary_span_continues_after_summary() -> None:
+    history = _history(9)
+    summary = _summary(history, 8)
+
+    assert find_summary_span(history, summary, 3, 3) == (8, 14)
+    assert find_summary_span(history[:14], summary, 3, 3) is None
+
+
+def test_apply_summary_replaces_summarised_messages() -> None:
+    history = _history(6)
+    summary = _summary(history, 8)
+
+    result = apply_summary(history, summary)
+
+    assert result is not None
+    assert result[:2] == history[:2]
+    assert result[3:] == history[8:]
+    summary_id, summary_request = result[2]
+    assert summary_id == summary.id
+    assert isinstance(summary_request, ModelRequest)
+    part = summary_request.parts[0]
+    assert isinstance(part, UserPromptPart)
+    assert part.content == f"{SUMMARY_HEADING}\n\nThe story so far"
+
+
+def test_apply_summary_stale() -> None:
+    history = _history(6)
+    summary = _summary(history, 8)
+
+    # Summarised messages are gone
+    assert apply_summary(history[:6], summary) is None
+    # Messages were inserted into the summarised span
+    inserted = [*history[:4], _history(1)[2], *history[4:]]
+    assert apply_summary(inserted, summary) is None
+
+
+async def test_summarize(
+    session_adapter: SessionAdapter, db_session: AsyncDbSession, session: Session
+) -> None:
+    history = _history(4)
+    await create_messages(
+        db_session,
+        [
+            Message.from_model_request(session.id, msg)
+            if isinstance(msg, ModelRequest)
+            else Message.from_model_response(session.id, msg)
+            for _, msg in history
+        ],
+    )
+    prompts: list[str] = []
+
+    def summarize(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        part = messages[-1].parts[-1]
+        assert isinstance(part, UserPromptPart)
+        assert isinstance(part.content, str)
+        prompts.append(part.content)
+        return ModelResponse(parts=[TextPart(content=f"Summary {len(prompts)}")])
+
+    summarizer = HistorySummarizer(session_adapter, every_turns=2, keep_turns=2)
+    summarizer.set_model(FunctionModel(summarize))
+
+    summary = await summarizer.summarize(db_session)
+    assert summary is not None
+    assert summary.content == "Summary 1"
+    assert "Player: Action 1" in prompts[0]
+    assert "Action 2" not in prompts[0]
+
+    # Summarised turns are replaced in the message history
+    messages = [msg async for msg in session_adapter.get_message_history(db_session)]
+    assert len(messages) == 2 + 1 + 4
+
+    # Too few turns left to summarise
+    assert await summarizer.summarize(db_session) is None
+    assert await get_latest_summary(db_session, session.id) == summary
+
+
+async def test_get_summary_deletes_stale_summary(
+    session_adapter: SessionAdapter, db_session: AsyncDbSession, session: Session
+) -> None:
+    history = _history(4)
+    summary = _summary(history, 6)
+    summary.session_id = session.id
+    await session_adapter.save_summary(db_session, summary)
+
+    # The summarised messages were never persisted
+    assert await session_adapter.get_summary(db_session, history[:4]) is None
+    assert await get_latest_summary(db_session, session.id) is None
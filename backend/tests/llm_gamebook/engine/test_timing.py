@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+from llm_gamebook.engine.timing import Timeline, get_tokens_per_second
+
+
+def test_timeline_spans_add_up() -> None:
+    timeline = Timeline()
+
+    with timeline.span("tools"):
+        time.sleep(0.01)
+    with timeline.span("tools"):
+        time.sleep(0.01)
+    timeline.add("commit", 0.5)
+
+    assert timeline.spans["tools"] >= 0.02
+    assert timeline.spans["commit"] == pytest.approx(0.5)
+    assert timeline.elapsed() >= timeline.spans["tools"]
+
+
+def test_timeline_mark_keeps_first_occurrence() -> None:
+    timeline = Timeline()
+
+    assert timeline.get_mark("first_token") is None
+    timeline.mark("first_token")
+    first = timeline.get_mark("first_token")
+    time.sleep(0.01)
+    timeline.mark("first_token")
+
+    assert timeline.get_mark("first_token") == first
+
+
+def test_get_tokens_per_second() -> None:
+    assert get_tokens_per_second(100, 2.0) == pytest.approx(50.0)
+    assert get_tokens_per_second(0, 2.0) is None
+    assert get_tokens_per_second(100, 0.0) is None
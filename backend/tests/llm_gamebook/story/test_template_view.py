@@ -259,6 +259,19 @@ async def test_get_system_prompt_renders(simple_story_context: StoryContext) ->
     assert "node_b" not in result
 
 
+async def test_system_prompt_prefix_is_state_independent(simple_project: Project) -> None:
+    context_a = StoryContext(simple_project)
+    session_data = SessionStateData(entities={"test_graph": {"current_node_id": "node_d"}})
+    context_d = StoryContext(simple_project, session_data)
+
+    prefix = await context_a.get_system_prompt_prefix()
+
+    assert prefix == await context_d.get_system_prompt_prefix()
+    assert "node_a" not in prefix
+    assert "node_d" in await context_d.get_state_prompt()
+    assert (await context_d.get_system_prompt()).startswith(prefix)
+
+
 async def test_get_intro_message_renders(simple_story_context: StoryContext) -> None:
     result = await simple_story_context.get_intro_message()
 
@@ -0,0 +1,102 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from pydantic_ai import Agent
+from pydantic_ai.models import override_allow_model_requests
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.providers.openai import OpenAIProvider
+
+from llm_gamebook.fake_llm import FakeLlm, FakeLlmOptions, ScriptStep
+
+FAST = FakeLlmOptions(ttft=0.0, tokens_per_second=1e6)
+
+
+def _request(*, stream: bool = False, last_role: str = "user") -> dict[str, object]:
+    return {
+        "model": "fake",
+        "messages": [
+            {"role": "system", "content": "Narrate."},
+            {"role": last_role, "content": "Hi"},
+        ],
+        "stream": stream,
+        "tools": [{"type": "function", "function": {"name": "change_location"}}],
+    }
+
+
+def test_completion() -> None:
+    client = TestClient(
+        FakeLlm(FakeLlmOptions(ttft=0.0, tokens_per_second=1e6, response_tokens=5)).app
+    )
+    response = client.post("/v1/chat/completions", json=_request())
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["choices"][0]["message"]["content"] == "The corridor stretches ahead, lit"
+    assert data["choices"][0]["finish_reason"] == "stop"
+    assert data["usage"]["completion_tokens"] == 5
+
+
+def test_streaming_completion() -> None:
+    client = TestClient(FakeLlm(FAST).app)
+    response = client.post("/v1/chat/completions", json=_request(stream=True))
+
+    events = [line.removeprefix("data: ") for line in response.text.splitlines() if line]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event) for event in events[:-1]]
+    content = "".join(
+        chunk["choices"][0]["delta"].get("content") or "" for chunk in chunks if chunk["choices"]
+    )
+    assert content.startswith("The corridor stretches ahead")
+    assert len(content.split()) == FAST.response_tokens
+    assert chunks[-1]["usage"]["completion_tokens"] == FAST.response_tokens
+
+
+def test_scripted_tool_call() -> None:
+    script = [ScriptStep(tool="change_location", args={"to": "hall"}), ScriptStep(text="Done.")]
+    client = TestClient(FakeLlm(FakeLlmOptions(ttft=0.0, tokens_per_second=1e6, script=script)).app)
+
+    data = client.post("/v1/chat/completions", json=_request()).json()
+    (tool_call,) = data["choices"][0]["message"]["tool_calls"]
+    assert tool_call["function"]["name"] == "change_location"
+    assert json.loads(tool_call["function"]["arguments"]) == {"to": "hall"}
+    assert data["choices"][0]["finish_reason"] == "tool_calls"
+
+    data = client.post("/v1/chat/completions", json=_request()).json()
+    assert data["choices"][0]["message"]["content"] == "Done."
+
+    # Tool results are never answered with another tool call
+    data = client.post("/v1/chat/completions", json=_request(last_role="tool")).json()
+    assert data["choices"][0]["finish_reason"] == "stop"
+
+
+def test_injected_errors() -> None:
+    client = TestClient(FakeLlm(FakeLlmOptions(rate_limit_rate=1.0)).app)
+    response = client.post("/v1/chat/completions", json=_request())
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+    client = TestClient(FakeLlm(FakeLlmOptions(server_error_rate=1.0)).app)
+    response = client.post("/v1/chat/completions", json=_request())
+    assert response.status_code == 500
+
+
+def test_script_step_validation() -> None:
+    with pytest.raises(ValueError, match="either text or a tool"):
+        ScriptStep()
+
+
+async def test_openai_model_streaming() -> None:
+    script = [ScriptStep(text="You step into the hall.")]
+    fake = FakeLlm(FakeLlmOptions(ttft=0.0, tokens_per_second=1e6, script=script))
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(fake.app))
+    provider = OpenAIProvider(base_url="http://fake/v1", api_key="test", http_client=http_client)
+    agent = Agent(OpenAIChatModel("fake", provider=provider))
+
+    with override_allow_model_requests(allow_model_requests=True):
+        async with agent.run_stream("Go to the hall") as result:
+            output = await result.get_output()
+
+    assert output == "You step into the hall."
+    assert result.usage().output_tokens == 5
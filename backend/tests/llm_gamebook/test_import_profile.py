@@ -0,0 +1,61 @@
+import pytest
+
+from llm_gamebook.import_profile import ImportProfile, parse_importtime, profile_imports
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _json
+import time:       300 |        420 |   json.decoder
+import time:       200 |        620 | json
+import time:     1_000 |      1_000 | broken
+import time:      1000 |       1500 | pydantic
+"""
+
+
+def test_parse_importtime() -> None:
+    imports = parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert [(entry.module, entry.depth) for entry in imports] == [
+        ("_json", 2),
+        ("json.decoder", 1),
+        ("json", 0),
+        ("pydantic", 0),
+    ]
+    assert imports[2].self_seconds == pytest.approx(0.0002)
+    assert imports[2].cumulative_seconds == pytest.approx(0.00062)
+
+
+def test_import_profile_package_totals() -> None:
+    profile = ImportProfile(parse_importtime(IMPORTTIME_OUTPUT), wall_seconds=0.1)
+
+    assert profile.total_seconds == pytest.approx(0.00162)
+    assert list(profile.get_package_totals()) == ["pydantic", "json", "_json"]
+    assert profile.get_package_totals()["json"] == pytest.approx(0.0005)
+
+
+def test_import_profile_format() -> None:
+    profile = ImportProfile(parse_importtime(IMPORTTIME_OUTPUT), wall_seconds=0.1)
+    report = profile.format(top=2)
+
+    assert report.startswith("Imported 4 modules in 0.002s (0.100s including")
+    assert "pydantic" in report
+    assert "_json" not in report
+
+
+def test_web_app_does_not_import_provider_sdks() -> None:
+    profile = profile_imports("llm_gamebook.web.app")
+    modules = {entry.module for entry in profile.imports}
+
+    assert "llm_gamebook.web.app" in modules
+    assert not modules & {
+        "pydantic_ai.models.anthropic",
+        "pydantic_ai.models.google",
+        "pydantic_ai.models.mistral",
+        "pydantic_ai.models.openrouter",
+        "pydantic_ai.models.xai",
+    }
+
+
+def test_profile_imports_failure() -> None:
+    with pytest.raises(RuntimeError, match="Importing does_not_exist failed"):
+        profile_imports("does_not_exist")
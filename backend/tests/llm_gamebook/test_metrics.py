@@ -0,0 +1,83 @@
+import pytest
+
+from llm_gamebook.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_render() -> None:
+    counter = Counter("requests_total", "Handled requests.", ("method",))
+    counter.inc("GET")
+    counter.inc("GET", amount=2)
+    counter.inc("POST")
+
+    assert counter.get("GET") == 3
+    assert list(counter.render()) == [
+        "# HELP requests_total Handled requests.",
+        "# TYPE requests_total counter",
+        'requests_total{method="GET"} 3',
+        'requests_total{method="POST"} 1',
+    ]
+
+
+def test_counter_wrong_labels() -> None:
+    counter = Counter("requests_total", "Handled requests.", ("method",))
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc()
+
+
+def test_gauge() -> None:
+    gauge = Gauge("connections", "Open connections.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.get() == 1
+
+    gauge.set(0.5)
+    assert list(gauge.render())[-1] == "connections 0.5"
+
+
+def test_histogram_render() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(2.0)
+
+    assert histogram.get_count() == 4
+    assert list(histogram.render())[2:] == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 2.65",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_histogram_time() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("op",))
+    with histogram.time("read"):
+        pass
+    assert histogram.get_count("read") == 1
+    assert not histogram.get_count("write")
+
+
+def test_label_escaping() -> None:
+    counter = Counter("errors_total", "Errors.\nMultiline.", ("message",))
+    counter.inc('say "hi"\\\n')
+
+    lines = list(counter.render())
+    assert lines[0] == r"# HELP errors_total Errors.\nMultiline."
+    assert lines[2] == r'errors_total{message="say \"hi\"\\\n"} 1'
+
+
+def test_registry() -> None:
+    registry = Registry()
+    registry.counter("a_total", "A.").inc()
+    extra = Gauge("b", "B.")
+    extra.set(2)
+
+    assert registry.render([extra]) == (
+        "# HELP a_total A.\n# TYPE a_total counter\na_total 1\n# HELP b B.\n# TYPE b gauge\nb 2\n"
+    )
+
+    with pytest.raises(ValueError, match="already registered"):
+        registry.gauge("a_total", "Again.")
@@ -0,0 +1,44 @@
+import pytest
+
+from llm_gamebook.db.models import UsageBase
+from llm_gamebook.pricing import FREE, ModelPrice, get_model_price
+from llm_gamebook.providers import ModelProvider
+
+
+@pytest.mark.parametrize(
+    ("provider", "model_name", "expected"),
+    [
+        (ModelProvider.OPENAI, "gpt-4o-2024-08-06", ModelPrice(2.5, 10.0, cache_read=1.25)),
+        (ModelProvider.OPENAI, "gpt-4o-mini", ModelPrice(0.15, 0.6, cache_read=0.075)),
+        (ModelProvider.OLLAMA, "llama3.2", FREE),
+        (ModelProvider.OPENAI, "unknown-model", None),
+        (ModelProvider.OPENAI_COMPATIBLE, "gpt-4o", None),
+    ],
+)
+def test_get_model_price(
+    provider: ModelProvider, model_name: str, expected: ModelPrice | None
+) -> None:
+    """Test that the longest matching model name prefix wins."""
+    assert get_model_price(provider, model_name) == expected
+
+
+def test_model_price_get_cost() -> None:
+    price = ModelPrice(input=2.0, output=10.0, cache_write=4.0, cache_read=0.5)
+    usage = UsageBase(
+        input_tokens=1_000_000,
+        output_tokens=100_000,
+        cache_write_tokens=200_000,
+        cache_read_tokens=500_000,
+    )
+
+    # 300k uncached, 200k written, 500k read
+    assert price.get_cost(usage) == pytest.approx(0.6 + 0.8 + 0.25 + 1.0)
+
+
+def test_model_price_get_cost_defaults_to_input_price() -> None:
+    price = ModelPrice(input=1.0, output=1.0)
+    usage = UsageBase(
+        input_tokens=1_000_000, output_tokens=0, cache_write_tokens=0, cache_read_tokens=500_000
+    )
+
+    assert price.get_cost(usage) == pytest.approx(1.0)
@@ -1,3 +1,6 @@
+import time
+from uuid import RFC_4122
+
 import pytest
 
 from llm_gamebook.utils import (
@@ -5,6 +8,7 @@ from llm_gamebook.utils import (
     normalized_kebab_case,
     normalized_pascal_case,
     normalized_snake_case,
+    uuid7,
 )
 
 
@@ -77,3 +81,17 @@ def test_normalized_pascal_case(value: str, expected: str) -> None:
 )
 def test_normalized_kebab_case(value: str, expected: str) -> None:
     assert normalized_kebab_case(value) == expected
+
+
+def test_uuid7() -> None:
+    """Test that version 7 UUIDs carry the time and sort in creation order."""
+    before = time.time_ns() // 1_000_000
+    ids = [uuid7() for _ in range(5000)]
+    after = time.time_ns() // 1_000_000
+
+    assert all(uid.version == 7 for uid in ids)
+    assert all(uid.variant == RFC_4122 for uid in ids)
+    assert ids == sorted(ids)
+    assert [uid.hex for uid in ids] == sorted(uid.hex for uid in ids)
+    assert len(set(ids)) == len(ids)
+    assert before <= ids[0].int >> 80 <= after + 1
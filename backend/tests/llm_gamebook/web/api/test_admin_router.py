@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db.crud.session import get_session_count
+from llm_gamebook.db.models import Session
+from llm_gamebook.engine.message import SessionDeleted
+from llm_gamebook.message_bus import MessageBus
+
+
+async def test_purge_sessions(
+    client: TestClient, db_session: AsyncDbSession, message_bus: MessageBus, session: Session
+) -> None:
+    deleted: list[SessionDeleted] = []
+    message_bus.subscribe(SessionDeleted, deleted.append)
+
+    response = client.post(
+        "/api/admin/sessions/purge", json={"project_id": session.project_id, "vacuum": False}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"count": 1}
+    assert [message.session_id for message in deleted] == [session.id]
+    assert await get_session_count(db_session, project_id=None) == 0
+
+
+async def test_purge_sessions_vacuum_fails(
+    client: TestClient, db_session: AsyncDbSession, session: Session
+) -> None:
+    locked = OperationalError("VACUUM", None, Exception("database is locked"))
+    with patch("llm_gamebook.web.api.admin_router.vacuum_db", side_effect=locked) as vacuum_db:
+        response = client.post(
+            "/api/admin/sessions/purge", json={"project_id": session.project_id, "vacuum": True}
+        )
+
+    vacuum_db.assert_awaited_once()
+    assert response.status_code == 200
+    assert response.json() == {"count": 1}
+    assert await get_session_count(db_session, project_id=None) == 0
+
+
+def test_purge_sessions_nothing_matches(client: TestClient, session: Session) -> None:
+    response = client.post("/api/admin/sessions/purge", json={"project_id": "foo/none"})
+
+    assert response.status_code == 200
+    assert response.json() == {"count": 0}
+
+
+def test_purge_sessions_without_filter(client: TestClient) -> None:
+    response = client.post("/api/admin/sessions/purge", json={})
+
+    assert response.status_code == 422
@@ -1,5 +1,7 @@
 from fastapi.testclient import TestClient
 
+from llm_gamebook.db.models import ModelConfig, Session
+
 
 def test_create_model_config(client: TestClient) -> None:
     model_data = {
@@ -116,6 +118,34 @@ def test_delete_model_config(client: TestClient) -> None:
     assert get_response.status_code == 404
 
 
+def test_delete_model_config_used_as_fallback(
+    client: TestClient, model_config: ModelConfig, session: Session
+) -> None:
+    model_data = {
+        "name": "Fallback",
+        "provider": "ollama",
+        "model_name": "llama3",
+        "context_window": 4096,
+        "max_tokens": 1024,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "presence_penalty": 0.0,
+        "frequency_penalty": 0.0,
+    }
+    fallback_id = client.post("/api/model-configs/", json=model_data).json()["id"]
+    update_response = client.patch(
+        f"/api/sessions/{session.id}", json={"fallback_config_id": fallback_id}
+    )
+    assert update_response.status_code == 200
+
+    response = client.delete(f"/api/model-configs/{fallback_id}")
+    assert response.status_code == 200
+
+    session_data = client.get(f"/api/sessions/{session.id}").json()
+    assert session_data["config_id"] == str(model_config.id)
+    assert session_data["fallback_config_id"] is None
+
+
 def test_list_providers(client: TestClient) -> None:
     response = client.get("/api/model-configs/providers/")
     assert response.status_code == 200
@@ -1,6 +1,11 @@
+import pytest
 from fastapi.testclient import TestClient
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 
-from llm_gamebook.db.models import ModelConfig, Session
+from llm_gamebook.db.crud.archive import archive_session
+from llm_gamebook.db.models import Message, ModelConfig, Session, SessionArchive
+from llm_gamebook.engine import EngineManager
 from llm_gamebook.story import Project
 
 
@@ -54,11 +59,47 @@ def test_read_session_found(
     assert data["title"] == "Test Session"
 
 
+async def test_read_archived_session(
+    client: TestClient,
+    db_session: AsyncDbSession,
+    engine_manager: EngineManager,
+    session: Session,
+    message: Message,
+) -> None:
+    await archive_session(db_session, session.id)
+
+    response = client.get(f"/api/sessions/{session.id}")
+
+    assert response.status_code == 200
+    assert [msg["id"] for msg in response.json()["messages"]] == [str(message.id)]
+    result = await db_session.exec(select(func.count()).select_from(SessionArchive))
+    assert result.one() == 0
+    assert engine_manager.engine_count == 0
+
+
 def test_read_session_not_found(client: TestClient) -> None:
     response = client.get("/api/sessions/00000000-0000-0000-0000-000000000000")
     assert response.status_code == 404
 
 
+def test_read_session_does_not_create_engine(
+    client: TestClient, engine_manager: EngineManager, session: Session, message: Message
+) -> None:
+    response = client.get(f"/api/sessions/{session.id}")
+    assert response.status_code == 200
+    assert response.json()["id"] == str(session.id)
+    assert engine_manager.engine_count == 0
+
+
+def test_read_new_session_creates_engine(
+    client: TestClient, engine_manager: EngineManager, session: Session
+) -> None:
+    response = client.get(f"/api/sessions/{session.id}")
+    assert response.status_code == 200
+    # The engine generates the introduction
+    assert engine_manager.engine_count == 1
+
+
 def test_create_session_success(
     client: TestClient, model_config: ModelConfig, project: Project
 ) -> None:
@@ -111,6 +152,26 @@ def test_update_session(client: TestClient, model_config: ModelConfig, session:
     assert data["message"] == "Session updated successfully."
 
 
+def test_update_session_fallback_config(
+    client: TestClient, model_config: ModelConfig, session: Session
+) -> None:
+    update_data = {"fallback_config_id": str(model_config.id), "hedge_after_seconds": 2.5}
+    response = client.patch(f"/api/sessions/{session.id}", json=update_data)
+    assert response.status_code == 200
+
+    data = client.get("/api/sessions/").json()["data"][0]
+    assert data["config_id"] == str(model_config.id)
+    assert data["fallback_config_id"] == str(model_config.id)
+    assert data["hedge_after_seconds"] == pytest.approx(2.5)
+
+
+def test_update_session_fallback_config_not_found(client: TestClient, session: Session) -> None:
+    update_data = {"fallback_config_id": "00000000-0000-0000-0000-000000000000"}
+    response = client.patch(f"/api/sessions/{session.id}", json=update_data)
+    assert response.status_code == 404
+    assert "Fallback model config not found" in response.json()["detail"]
+
+
 def test_create_model_request(client: TestClient, session: Session) -> None:
     request_data = {
         "kind": "request",
@@ -125,6 +186,33 @@ def test_create_model_request(client: TestClient, session: Session) -> None:
     assert data["parts"][0]["content"] == "Hello"
 
 
+def test_cancel_response_not_running(client: TestClient, session: Session) -> None:
+    response = client.post(f"/api/sessions/{session.id}/cancel")
+    assert response.status_code == 409
+    content = response.json()
+    assert isinstance(content, dict)
+    assert "No response in progress" in content["detail"]
+
+
+def test_cancel_response_without_engine(
+    client: TestClient, engine_manager: EngineManager, session: Session, message: Message
+) -> None:
+    response = client.post(f"/api/sessions/{session.id}/cancel")
+    assert response.status_code == 409
+    assert engine_manager.engine_count == 0
+
+
+def test_delete_session_without_engine(
+    client: TestClient, engine_manager: EngineManager, session: Session, message: Message
+) -> None:
+    response = client.delete(f"/api/sessions/{session.id}")
+    assert response.status_code == 200
+    assert engine_manager.engine_count == 0
+
+    response = client.delete(f"/api/sessions/{session.id}")
+    assert response.status_code == 404
+
+
 def test_delete_session(client: TestClient, session: Session) -> None:
     response = client.get(f"/api/sessions/{session.id}")
     assert response.status_code == 200
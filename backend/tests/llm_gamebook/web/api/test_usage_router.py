@@ -0,0 +1,128 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db.models import Message, ModelConfig, Session, Usage
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.providers import ModelProvider
+from llm_gamebook.story import Project
+
+
+def _response(session: Session, input_tokens: int, output_tokens: int) -> Message:
+    return Message(
+        kind=MessageKind.RESPONSE,
+        session=session,
+        finish_reason=None,
+        usage=Usage(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_write_tokens=0,
+            cache_read_tokens=0,
+        ),
+    )
+
+
+@pytest.fixture
+async def priced_session(db_session: AsyncDbSession, project: Project) -> Session:
+    config = ModelConfig(
+        name="Priced Config",
+        provider=ModelProvider.OPENAI,
+        model_name="gpt-4o-mini",
+        context_window=128000,
+        max_tokens=1024,
+        temperature=0.7,
+        top_p=0.9,
+        presence_penalty=0.0,
+        frequency_penalty=0.0,
+    )
+    session = Session(title="Priced Session", project_id=project.id, config=config)
+    db_session.add_all([
+        session,
+        _response(session, 1_000_000, 100_000),
+        _response(session, 1_000_000, 100_000),
+    ])
+    await db_session.commit()
+    await db_session.refresh(session)
+    return session
+
+
+@pytest.fixture
+async def unpriced_session(db_session: AsyncDbSession, session: Session) -> Session:
+    db_session.add(_response(session, 1000, 100))
+    await db_session.commit()
+    return session
+
+
+def test_read_session_usages(
+    client: TestClient, priced_session: Session, unpriced_session: Session
+) -> None:
+    response = client.get("/api/usage/sessions/")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+
+    # Most expensive first
+    priced, unpriced = data["data"]
+    assert priced["session_id"] == str(priced_session.id)
+    assert priced["title"] == "Priced Session"
+    assert priced["requests"] == 2
+    assert priced["input_tokens"] == 2_000_000
+    assert priced["output_tokens"] == 200_000
+    assert priced["cost"] == pytest.approx(2 * (0.15 + 0.06))
+    assert priced["unpriced_requests"] == 0
+
+    assert unpriced["session_id"] == str(unpriced_session.id)
+    assert not unpriced["cost"]
+    assert unpriced["unpriced_requests"] == 1
+
+
+def test_read_session_usages_pagination(
+    client: TestClient, priced_session: Session, unpriced_session: Session
+) -> None:
+    response = client.get("/api/usage/sessions/?skip=1&limit=10")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+    assert [s["session_id"] for s in data["data"]] == [str(unpriced_session.id)]
+
+
+def test_read_session_usage(client: TestClient, priced_session: Session) -> None:
+    response = client.get(f"/api/usage/sessions/{priced_session.id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["requests"] == 2
+    assert data["project_id"] == priced_session.project_id
+
+
+def test_read_session_usage_without_usage(client: TestClient, session: Session) -> None:
+    response = client.get(f"/api/usage/sessions/{session.id}")
+    assert response.status_code == 200
+    assert response.json()["requests"] == 0
+
+
+def test_read_session_usage_not_found(client: TestClient) -> None:
+    response = client.get("/api/usage/sessions/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+
+
+def test_read_project_usages(
+    client: TestClient, priced_session: Session, unpriced_session: Session
+) -> None:
+    response = client.get("/api/usage/projects/")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["data"][0]["project_id"] == priced_session.project_id
+    assert data["data"][0]["requests"] == 3
+    assert data["data"][0]["unpriced_requests"] == 1
+
+
+def test_read_model_config_usages(
+    client: TestClient, priced_session: Session, unpriced_session: Session
+) -> None:
+    response = client.get("/api/usage/model-configs/")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+    assert data["data"][0]["config_id"] == str(priced_session.config_id)
+    assert data["data"][1]["config_id"] == str(unpriced_session.config_id)
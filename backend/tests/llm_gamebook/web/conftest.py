@@ -10,7 +10,7 @@ from llm_gamebook.engine import EngineManager
 from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.story.project_manager import ProjectManager
 from llm_gamebook.web.app import create_app
-from llm_gamebook.web.schemas.websocket.openapi import add_websocket_schema
+from llm_gamebook.web.websocket.hub import BroadcastHub
 
 
 @pytest.fixture
@@ -23,12 +23,13 @@ def client(
 ) -> Iterator[TestClient]:
     @asynccontextmanager
     async def _test_lifespan(app: FastAPI) -> AsyncIterator[None]:
-        add_websocket_schema(app.openapi())
         app.state.db_engine = db_engine
         app.state.bus = message_bus
         app.state.engine_mgr = engine_manager
         app.state.project_mgr = project_manager
-        yield
+        async with BroadcastHub(message_bus, debug=app.state.debug) as hub:
+            app.state.hub = hub
+            yield
 
     app = create_app(lifespan=_test_lifespan)
 
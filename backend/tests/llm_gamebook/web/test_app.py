@@ -0,0 +1,12 @@
+from fastapi.testclient import TestClient
+
+
+def test_openapi_is_generated_on_first_request(client: TestClient) -> None:
+    assert client.app.openapi_schema is None  # type: ignore[attr-defined]
+
+    response = client.get("/openapi.json")
+
+    assert response.status_code == 200
+    schema = response.json()
+    assert schema["info"]["x-websockets"][0]["path"] == "/api/ws/{session_id}"
+    assert "WebSocketServerMessage" in schema["components"]["schemas"]
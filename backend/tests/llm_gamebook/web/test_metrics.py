@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+from llm_gamebook.metrics import CONTENT_TYPE
+
+
+def test_get_metrics(client: TestClient) -> None:
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    assert "# TYPE llm_gamebook_generation_seconds histogram" in response.text
+    assert "llm_gamebook_active_engines 0" in response.text
+    assert "llm_gamebook_bus_pending_tasks" in response.text
+    assert "llm_gamebook_websocket_pending_frames 0" in response.text
+    assert "llm_gamebook_websocket_max_pending_frames 0" in response.text
+
+
+def test_metrics_not_in_openapi(client: TestClient) -> None:
+    response = client.get("/openapi.json")
+    assert "/metrics" not in response.json()["paths"]
@@ -1,26 +1,38 @@
+from collections.abc import AsyncIterator
 from unittest.mock import AsyncMock
 
 import pytest
 from fastapi import WebSocket
-from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 from starlette.websockets import WebSocketState
 
+from llm_gamebook.db import DbSessionFactory
 from llm_gamebook.engine.manager import EngineManager
 from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.web.websocket.handler import WebSocketHandler
+from llm_gamebook.web.websocket.hub import BroadcastHub
+
+
+@pytest.fixture
+async def hub(message_bus: MessageBus) -> AsyncIterator[BroadcastHub]:
+    async with BroadcastHub(message_bus) as hub:
+        yield hub
 
 
 @pytest.fixture
 async def handler(
-    db_session: AsyncDbSession, engine_manager: EngineManager, message_bus: MessageBus
+    db_session_factory: DbSessionFactory,
+    engine_manager: EngineManager,
+    message_bus: MessageBus,
+    hub: BroadcastHub,
 ) -> WebSocketHandler:
-    return WebSocketHandler(db_session, engine_manager, message_bus)
+    return WebSocketHandler(db_session_factory, engine_manager, message_bus, hub)
 
 
 @pytest.fixture
 async def mock_websocket() -> AsyncMock:
     ws = AsyncMock(spec=WebSocket)
     ws.client_state = WebSocketState.CONNECTED
+    ws.scope = {"type": "websocket", "subprotocols": []}
     ws.send_text = AsyncMock()
     ws.receive_text = AsyncMock()
     ws.accept = AsyncMock()
@@ -1,7 +1,12 @@
+import asyncio
+import gc
+import tracemalloc
 from contextlib import suppress
-from unittest.mock import AsyncMock, patch
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
+import msgpack
 import pytest
 from fastapi import WebSocketDisconnect
 from openai import APIError
@@ -9,21 +14,30 @@ from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
 from starlette.websockets import WebSocketDisconnect as StarletteDisconnect
 from starlette.websockets import WebSocketState
 
-from llm_gamebook.db.models import Message
+import llm_gamebook
+from llm_gamebook.db import DbSessionFactory
+from llm_gamebook.db.crud.message import create_messages, get_message_count
+from llm_gamebook.db.models import Message, Part
 from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.part import PartKind
 from llm_gamebook.db.models.session import Session
 from llm_gamebook.engine.manager import EngineManager
 from llm_gamebook.engine.message import (
     EngineCreated,
-    ResponseErrorMessage,
     ResponseStartedMessage,
-    ResponseStoppedMessage,
     ResponseUserRequestMessage,
-    StreamMessageMessage,
 )
+from llm_gamebook.message_bus import MessageBus
 from llm_gamebook.story import ProjectManager
-from llm_gamebook.web.schemas.websocket.message import WebSocketPingMessage, WebSocketPongMessage
+from llm_gamebook.web.schemas.websocket.message import (
+    WebSocketCancelMessage,
+    WebSocketPingMessage,
+    WebSocketPongMessage,
+    WebSocketResumeMessage,
+)
+from llm_gamebook.web.websocket.binary import BINARY_SUBPROTOCOL
 from llm_gamebook.web.websocket.handler import WebSocketHandler
+from llm_gamebook.web.websocket.hub import BroadcastHub
 
 
 async def test_handle_connection_success(
@@ -110,6 +124,45 @@ async def test_handle_messages_ping(handler: WebSocketHandler, mock_websocket: A
     assert '"kind":"pong"' in call_args
 
 
+async def test_handle_messages_cancel(
+    handler: WebSocketHandler, mock_websocket: AsyncMock, session: Session
+) -> None:
+    mock_websocket.receive_text = AsyncMock(
+        side_effect=[
+            WebSocketCancelMessage(session_id=session.id).model_dump_json(),
+            StarletteDisconnect(code=1000),
+        ]
+    )
+    handler._websocket = mock_websocket
+    engine = MagicMock()
+
+    with (
+        patch.object(handler._engine_mgr, "get", return_value=engine) as mock_get,
+        suppress(StarletteDisconnect),
+    ):
+        await handler._handle_messages()
+
+    mock_get.assert_called_once_with(session.id)
+    engine.cancel_response.assert_called_once_with()
+
+
+async def test_handle_messages_cancel_unknown_session(
+    handler: WebSocketHandler, mock_websocket: AsyncMock
+) -> None:
+    mock_websocket.receive_text = AsyncMock(
+        side_effect=[
+            WebSocketCancelMessage(session_id=uuid4()).model_dump_json(),
+            StarletteDisconnect(code=1000),
+        ]
+    )
+    handler._websocket = mock_websocket
+
+    with suppress(StarletteDisconnect):
+        await handler._handle_messages()
+
+    mock_websocket.send_text.assert_not_called()
+
+
 async def test_handle_messages_invalid_json(
     handler: WebSocketHandler, mock_websocket: AsyncMock
 ) -> None:
@@ -140,7 +193,7 @@ async def test_generate_response_success(
     engine = await engine_manager.get_or_create(session.id, db_session, project_manager)
 
     with patch.object(engine, "generate_response", new_callable=AsyncMock):
-        await handler._generate_response(engine)
+        await handler._generate_response(engine, uuid4())
 
 
 async def test_generate_response_api_error(
@@ -160,7 +213,7 @@ async def test_generate_response_api_error(
         "generate_response",
         side_effect=APIError(message="API Error", body=None, request=None),  # type: ignore[arg-type]
     ):
-        await handler._generate_response(engine)
+        await handler._generate_response(engine, uuid4())
 
     mock_websocket.send_text.assert_called_once()
     call_args = mock_websocket.send_text.call_args[0][0]
@@ -186,88 +239,180 @@ async def test_on_engine_created(
         await handler._on_engine_created(message)
 
 
-async def test_on_engine_response_started(
+async def test_send_message_disconnected_state(
     handler: WebSocketHandler, mock_websocket: AsyncMock, session: Session
 ) -> None:
+    """Test that send_message handles disconnected WebSocket gracefully."""
     handler._websocket = mock_websocket
+    mock_websocket.client_state = WebSocketState.DISCONNECTED
 
-    message = ResponseStartedMessage(session_id=session.id)
-    await handler._on_engine_response_started(message)
+    message = WebSocketPongMessage()
+    await handler._send_message(message)
 
-    mock_websocket.send_text.assert_called_once()
-    call_args = mock_websocket.send_text.call_args[0][0]
-    assert '"kind":"stream_status"' in call_args
-    assert '"status":"started"' in call_args
-    assert f'"{session.id}"' in call_args
+    mock_websocket.send_text.assert_not_called()
 
 
-async def test_on_engine_response_stopped(
-    handler: WebSocketHandler, mock_websocket: AsyncMock, session: Session
+async def test_on_engine_response_user_request(
+    handler: WebSocketHandler,
+    mock_websocket: AsyncMock,
+    session: Session,
+    engine_manager: EngineManager,
+    db_session: AsyncDbSession,
+    project_manager: ProjectManager,
 ) -> None:
+    """Test handling ResponseUserRequestMessage to trigger response generation."""
     handler._websocket = mock_websocket
 
-    message = ResponseStoppedMessage(session_id=session.id)
-    await handler._on_engine_response_stopped(message)
+    engine = await engine_manager.get_or_create(session.id, db_session, project_manager)
 
-    mock_websocket.send_text.assert_called_once()
-    call_args = mock_websocket.send_text.call_args[0][0]
-    assert '"kind":"stream_status"' in call_args
-    assert '"status":"stopped"' in call_args
-    assert f'"{session.id}"' in call_args
+    with patch.object(handler, "_generate_response", new_callable=AsyncMock) as mock_generate:
+        message = ResponseUserRequestMessage(session_id=session.id, message_id=uuid4())
+        await handler._on_engine_response_user_request(message)
 
+        mock_generate.assert_called_once_with(engine, message.message_id)
 
-async def test_on_engine_response_error(
-    handler: WebSocketHandler, mock_websocket: AsyncMock, session: Session
+
+async def test_on_engine_response_user_request_multiple_handlers_generate_once(
+    handler: WebSocketHandler,
+    mock_websocket: AsyncMock,
+    session: Session,
+    engine_manager: EngineManager,
+    db_session: AsyncDbSession,
+    project_manager: ProjectManager,
 ) -> None:
+    message_bus = handler._bus
+    other_handler = WebSocketHandler(
+        handler._db_sessions, engine_manager, message_bus, handler._hub
+    )
     handler._websocket = mock_websocket
+    other_handler._websocket = mock_websocket
 
-    error = ValueError("Test error")
-    message = ResponseErrorMessage(session_id=session.id, error=error)
-    await handler._on_engine_response_error(message)
+    engine = await engine_manager.get_or_create(session.id, db_session, project_manager)
+    await message_bus.wait_all()  # Let introduction finish
+
+    with patch.object(engine, "generate_response", new_callable=AsyncMock) as mock_generate:
+        message = ResponseUserRequestMessage(session_id=session.id, message_id=uuid4())
+        await asyncio.gather(
+            handler._on_engine_response_user_request(message),
+            other_handler._on_engine_response_user_request(message),
+        )
+
+    mock_generate.assert_awaited_once()
+
+
+async def test_handle_connection_sends_broadcast_frames(
+    handler: WebSocketHandler,
+    hub: BroadcastHub,
+    mock_websocket: AsyncMock,
+    message_bus: MessageBus,
+    session: Session,
+) -> None:
+    disconnect = asyncio.Event()
+
+    async def receive_text() -> str:
+        message_bus.publish(ResponseStartedMessage(session_id=session.id))
+        await disconnect.wait()
+        raise WebSocketDisconnect(code=1000)
+
+    mock_websocket.receive_text = receive_text
+    mock_websocket.send_text = AsyncMock(side_effect=lambda _: disconnect.set())
+
+    with patch.object(handler, "close"):
+        await handler.handle_connection(mock_websocket)
 
     mock_websocket.send_text.assert_called_once()
     call_args = mock_websocket.send_text.call_args[0][0]
-    assert '"kind":"error"' in call_args
-    assert '"name":"ValueError"' in call_args
-    assert '"message":"Test error"' in call_args
+    assert '"status":"started"' in call_args
+    assert hub.get_subscriber_count(session.id) == 0
 
 
-async def test_on_engine_stream_message(
-    handler: WebSocketHandler, mock_websocket: AsyncMock, session: Session
+async def test_spectator_ignores_cancel(
+    db_session_factory: DbSessionFactory,
+    engine_manager: EngineManager,
+    message_bus: MessageBus,
+    hub: BroadcastHub,
+    mock_websocket: AsyncMock,
+    session: Session,
 ) -> None:
-    handler._websocket = mock_websocket
+    spectator = WebSocketHandler(
+        db_session_factory, engine_manager, message_bus, hub, session_id=session.id
+    )
+    mock_websocket.receive_text = AsyncMock(
+        side_effect=[
+            WebSocketCancelMessage(session_id=session.id).model_dump_json(),
+            StarletteDisconnect(code=1000),
+        ]
+    )
+    spectator._websocket = mock_websocket
 
-    message = StreamMessageMessage(
-        session_id=session.id,
-        message=Message(
-            id=uuid4(),
-            session_id=session.id,
-            kind=MessageKind.RESPONSE,
-            finish_reason=None,
-        ),
+    with patch.object(engine_manager, "get") as mock_get, suppress(StarletteDisconnect):
+        await spectator._handle_messages()
+
+    mock_get.assert_not_called()
+
+
+async def test_spectator_does_not_generate_responses(
+    db_session_factory: DbSessionFactory,
+    engine_manager: EngineManager,
+    message_bus: MessageBus,
+    hub: BroadcastHub,
+    session: Session,
+) -> None:
+    spectator = WebSocketHandler(
+        db_session_factory, engine_manager, message_bus, hub, session_id=session.id
     )
-    await handler._on_engine_stream_message(message)
 
-    mock_websocket.send_text.assert_called_once()
-    call_args = mock_websocket.send_text.call_args[0][0]
-    assert '"kind":"stream_message"' in call_args
-    assert f'"{session.id}"' in call_args
+    with patch.object(spectator, "_generate_response", new_callable=AsyncMock) as mock_generate:
+        message_bus.publish(ResponseUserRequestMessage(session_id=session.id, message_id=uuid4()))
+        await message_bus.wait_all()
 
+    mock_generate.assert_not_called()
 
-async def test_send_message_disconnected_state(
-    handler: WebSocketHandler, mock_websocket: AsyncMock, session: Session
+
+async def test_handle_messages_resume(
+    handler: WebSocketHandler,
+    mock_websocket: AsyncMock,
+    message_bus: MessageBus,
+    session: Session,
 ) -> None:
-    """Test that send_message handles disconnected WebSocket gracefully."""
+    message_bus.publish(ResponseStartedMessage(session_id=session.id))
+    mock_websocket.receive_text = AsyncMock(
+        side_effect=[
+            WebSocketResumeMessage(session_id=session.id, seq=0).model_dump_json(),
+            StarletteDisconnect(code=1000),
+        ]
+    )
     handler._websocket = mock_websocket
-    mock_websocket.client_state = WebSocketState.DISCONNECTED
 
-    message = WebSocketPongMessage()
-    await handler._send_message(message)
+    with suppress(StarletteDisconnect):
+        await handler._handle_messages()
+
+    frame = await handler._subscription.get()
+    assert frame.seq == 1
+    assert '"status":"started"' in frame.text
+
+
+async def test_handle_connection_binary(
+    handler: WebSocketHandler, mock_websocket: AsyncMock
+) -> None:
+    mock_websocket.scope["subprotocols"] = [BINARY_SUBPROTOCOL]
+    mock_websocket.receive_text = AsyncMock(
+        side_effect=[
+            WebSocketPingMessage(kind="ping").model_dump_json(),
+            WebSocketDisconnect(code=1000),
+        ]
+    )
 
+    with patch.object(handler, "close"):
+        await handler.handle_connection(mock_websocket)
+
+    mock_websocket.accept.assert_called_once_with(subprotocol=BINARY_SUBPROTOCOL)
     mock_websocket.send_text.assert_not_called()
+    mock_websocket.send_bytes.assert_called_once()
+    assert msgpack.unpackb(mock_websocket.send_bytes.call_args[0][0]) == {"kind": "pong"}
 
 
-async def test_on_engine_response_user_request(
+async def test_generate_response_memory_does_not_grow_over_turns(
     handler: WebSocketHandler,
     mock_websocket: AsyncMock,
     session: Session,
@@ -275,13 +420,62 @@ async def test_on_engine_response_user_request(
     db_session: AsyncDbSession,
     project_manager: ProjectManager,
 ) -> None:
-    """Test handling ResponseUserRequestMessage to trigger response generation."""
     handler._websocket = mock_websocket
-
     engine = await engine_manager.get_or_create(session.id, db_session, project_manager)
-
-    with patch.object(handler, "_generate_response", new_callable=AsyncMock) as mock_generate:
-        message = ResponseUserRequestMessage(session_id=session.id)
-        await handler._on_engine_response_user_request(message)
-
-        mock_generate.assert_called_once_with(engine)
+    await handler._bus.wait_all()  # Let introduction finish
+
+    async def simulate_turn(db_sessions: DbSessionFactory) -> None:
+        async with db_sessions() as turn_session:
+            await get_message_count(turn_session, session.id)
+            request = Message(kind=MessageKind.REQUEST, session_id=session.id)
+            request.parts = [
+                Part(
+                    kind=PartKind.USER_PROMPT,
+                    content="Look around",
+                    tool_name=None,
+                    tool_call_id=None,
+                    args=None,
+                )
+            ]
+            response = Message(kind=MessageKind.RESPONSE, session_id=session.id)
+            response.parts = [
+                Part(
+                    kind=PartKind.TEXT,
+                    content="You see a dark room. " * 20,
+                    tool_name=None,
+                    tool_call_id=None,
+                    args=None,
+                )
+            ]
+            await create_messages(turn_session, [request, response])
+
+    async def run_turns(count: int) -> None:
+        for _ in range(count):
+            message = ResponseUserRequestMessage(session_id=session.id, message_id=uuid4())
+            await handler._on_engine_response_user_request(message)
+
+    package_path = Path(llm_gamebook.__file__).parent
+    # Allocations of the test harness and libraries (SQLAlchemy caches, pytest) don't count
+    package_only = [tracemalloc.Filter(inclusive=True, filename_pattern=f"{package_path}/*")]
+
+    def count_messages() -> int:
+        gc.collect()
+        return sum(isinstance(obj, Message) for obj in gc.get_objects())
+
+    with patch.object(engine, "generate_response", side_effect=simulate_turn):
+        await run_turns(100)  # Warm up caches
+        messages_before = count_messages()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot().filter_traces(package_only)
+            await run_turns(900)
+            messages_after = count_messages()
+            after = tracemalloc.take_snapshot().filter_traces(package_only)
+        finally:
+            tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    assert await get_message_count(db_session, session.id) >= 2000
+    # Every turn loaded and stored two messages, none of them are kept by the connection
+    assert messages_after <= messages_before
+    assert growth < 512 * 1024
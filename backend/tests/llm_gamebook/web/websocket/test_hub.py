@@ -0,0 +1,401 @@
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+import msgpack
+import pytest
+
+from llm_gamebook.db.models import Message
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.session import Session
+from llm_gamebook.engine.message import (
+    ContentDelta,
+    ResponseCancelledMessage,
+    ResponseErrorMessage,
+    ResponseQueuedMessage,
+    ResponseStartedMessage,
+    ResponseStoppedMessage,
+    ResponseTimingMessage,
+    StreamMessageMessage,
+    StreamPartDeltaMessage,
+)
+from llm_gamebook.message_bus import BaseMessage, MessageBus
+from llm_gamebook.metrics import WEBSOCKET_FRAMES_ENCODED
+from llm_gamebook.web.schemas.session.message import ModelResponse
+from llm_gamebook.web.schemas.session.part import TextPart
+from llm_gamebook.web.schemas.websocket.message import (
+    WebSocketPongMessage,
+    WebSocketStreamMessageMessage,
+    WebSocketStreamPartDeltaMessage,
+    WebSocketStreamPartMessage,
+    WebSocketStreamSnapshotMessage,
+    WebSocketStreamStatusMessage,
+)
+from llm_gamebook.web.websocket.hub import BroadcastHub, Frame, SessionStream, Subscription
+
+
+async def _get_text(hub: BroadcastHub, bus: MessageBus, message: BaseMessage) -> str:
+    subscription = Subscription()
+    with hub.subscribe(subscription):
+        bus.publish(message)
+    frame = await subscription.get()
+    return frame.text
+
+
+async def test_broadcast_encodes_once(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    viewers = [Subscription(session.id) for _ in range(3)]
+    everything = Subscription()
+    encoded = WEBSOCKET_FRAMES_ENCODED.get("stream_part_delta", "json")
+
+    with (
+        hub.subscribe(viewers[0]),
+        hub.subscribe(viewers[1]),
+        hub.subscribe(viewers[2]),
+        hub.subscribe(everything),
+    ):
+        assert hub.get_subscriber_count(session.id) == 4
+        message_bus.publish(
+            StreamPartDeltaMessage(session.id, uuid4(), uuid4(), ContentDelta("Hello"))
+        )
+
+    frames = [await subscription.get() for subscription in [*viewers, everything]]
+    assert all(frame is frames[0] for frame in frames)
+    assert frames[0].session_id == session.id
+    assert all('"content":"Hello"' in frame.text for frame in frames)
+    assert WEBSOCKET_FRAMES_ENCODED.get("stream_part_delta", "json") == encoded + 1
+    assert hub.get_subscriber_count(session.id) == 0
+
+
+async def test_broadcast_only_to_subscribed_session(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    other = Subscription(uuid4())
+    viewer = Subscription(session.id)
+
+    with hub.subscribe(other), hub.subscribe(viewer):
+        message_bus.publish(ResponseStartedMessage(session_id=session.id))
+
+    assert viewer.pending == 1
+    assert other.pending == 0
+
+
+async def test_broadcast_sends_snapshot_to_slow_subscriber(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    subscription = Subscription(session.id, max_pending=2)
+    message_id = uuid4()
+    part_id = uuid4()
+
+    with hub.subscribe(subscription):
+        message_bus.publish(ResponseStartedMessage(session_id=session.id))
+        for word in ["You ", "wake ", "up."]:
+            message_bus.publish(
+                StreamPartDeltaMessage(session.id, message_id, part_id, ContentDelta(word))
+            )
+
+    # The backlog is replaced by a snapshot, later frames are queued after it
+    assert subscription.pending == 2
+    snapshot = WebSocketStreamSnapshotMessage.model_validate_json((await subscription.get()).text)
+    assert snapshot.seq == 3
+    assert [delta.delta for delta in snapshot.deltas] == [ContentDelta("You wake ")]
+    frame = await subscription.get()
+    assert frame.seq == 4
+    assert '"content":"up."' in frame.text
+
+
+async def test_broadcast_without_subscribers_buffers_frames(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    subscription = Subscription(session.id)
+
+    message_bus.publish(ResponseStartedMessage(session_id=session.id))
+    with hub.subscribe(subscription):
+        hub.resume(subscription, session.id, 0)
+
+    frame = await subscription.get()
+    assert frame.seq == 1
+    assert '"status":"started"' in frame.text
+
+
+@pytest.mark.parametrize(
+    ("message_cls", "status"),
+    [
+        (ResponseStartedMessage, "started"),
+        (ResponseStoppedMessage, "stopped"),
+        (ResponseCancelledMessage, "cancelled"),
+    ],
+)
+async def test_broadcast_status(
+    hub: BroadcastHub,
+    message_bus: MessageBus,
+    session: Session,
+    message_cls: type[ResponseStartedMessage | ResponseStoppedMessage | ResponseCancelledMessage],
+    status: str,
+) -> None:
+    text = await _get_text(hub, message_bus, message_cls(session_id=session.id))
+
+    assert '"kind":"stream_status"' in text
+    assert f'"status":"{status}"' in text
+    assert f'"{session.id}"' in text
+
+
+async def test_broadcast_queued(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    message = ResponseQueuedMessage(session_id=session.id, position=3, wait_seconds=1.5)
+    text = await _get_text(hub, message_bus, message)
+
+    assert '"kind":"stream_queued"' in text
+    assert '"position":3' in text
+    assert '"wait_seconds":1.5' in text
+
+
+async def test_broadcast_error(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    message = ResponseErrorMessage(session_id=session.id, error=ValueError("Test error"))
+    text = await _get_text(hub, message_bus, message)
+
+    assert '"kind":"error"' in text
+    assert '"name":"ValueError"' in text
+    assert '"message":"Test error"' in text
+
+
+async def test_broadcast_stream_message(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    message = StreamMessageMessage(
+        session_id=session.id,
+        message=Message(
+            id=uuid4(),
+            session_id=session.id,
+            kind=MessageKind.RESPONSE,
+            finish_reason=None,
+        ),
+    )
+    text = await _get_text(hub, message_bus, message)
+
+    assert '"kind":"stream_message"' in text
+    assert f'"{session.id}"' in text
+
+
+async def test_broadcast_timing_only_in_debug_mode(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    message = ResponseTimingMessage(
+        session_id=session.id, ttft_seconds=0.25, tokens_per_second=40.0, spans={"commit": 0.5}
+    )
+    subscription = Subscription()
+    debug_subscription = Subscription()
+
+    async with BroadcastHub(message_bus, debug=True) as debug_hub:
+        with hub.subscribe(subscription), debug_hub.subscribe(debug_subscription):
+            message_bus.publish(message)
+
+    assert subscription.pending == 0
+    frame = await debug_subscription.get()
+    assert '"kind":"stream_timing"' in frame.text
+    assert '"ttft_seconds":0.25' in frame.text
+    assert '"spans":{"commit":0.5}' in frame.text
+
+
+async def test_close_unsubscribes(message_bus: MessageBus, session: Session) -> None:
+    subscription = Subscription()
+
+    async with BroadcastHub(message_bus) as hub:
+        pass
+    with hub.subscribe(subscription):
+        message_bus.publish(ResponseStartedMessage(session_id=session.id))
+
+    assert subscription.pending == 0
+
+
+def test_frame_without_session() -> None:
+    frame = Frame(WebSocketPongMessage())
+
+    assert frame.kind == "pong"
+    assert frame.session_id is None
+    assert frame.text == '{"kind":"pong"}'
+
+
+def _delta(session_id: UUID, part_id: UUID, content: str) -> WebSocketStreamPartDeltaMessage:
+    return WebSocketStreamPartDeltaMessage(
+        session_id=session_id, message_id=part_id, part_id=part_id, delta=ContentDelta(content)
+    )
+
+
+def test_session_stream_numbers_frames() -> None:
+    session_id = uuid4()
+    stream = SessionStream(session_id, maxlen=3)
+
+    frames = [stream.append(_delta(session_id, uuid4(), str(i))) for i in range(5)]
+
+    assert [frame.seq for frame in frames] == [1, 2, 3, 4, 5]
+    assert '"seq":5' in frames[-1].text
+    assert stream.get_frames_since(5) == []
+    assert stream.get_frames_since(3) == frames[3:]
+    assert stream.get_frames_since(2) == frames[2:]
+    assert stream.get_frames_since(1) is None
+    assert stream.get_frames_since(6) is None
+
+
+def test_session_stream_snapshot_merges_deltas() -> None:
+    session_id = uuid4()
+    part_id = uuid4()
+    stream = SessionStream(session_id, maxlen=2)
+
+    stream.append(WebSocketStreamStatusMessage(session_id=session_id, status="started"))
+    for word in ["You ", "wake ", "up."]:
+        stream.append(_delta(session_id, part_id, word))
+    snapshot = stream.get_snapshot().message
+
+    assert isinstance(snapshot, WebSocketStreamSnapshotMessage)
+    assert snapshot.seq == 4
+    assert snapshot.status == "started"
+    assert len(snapshot.deltas) == 1
+    assert snapshot.deltas[0].delta == ContentDelta("You wake up.")
+
+
+def test_session_stream_snapshot_resets_on_start() -> None:
+    session_id = uuid4()
+    stream = SessionStream(session_id)
+
+    stream.append(_delta(session_id, uuid4(), "Old"))
+    stream.append(WebSocketStreamStatusMessage(session_id=session_id, status="started"))
+
+    snapshot = stream.get_snapshot().message
+
+    assert isinstance(snapshot, WebSocketStreamSnapshotMessage)
+    assert snapshot.deltas == []
+
+
+async def test_resume_replays_missed_frames(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    subscription = Subscription(session.id)
+
+    with hub.subscribe(subscription):
+        message_bus.publish(ResponseStartedMessage(session_id=session.id))
+        message_bus.publish(ResponseStoppedMessage(session_id=session.id))
+        hub.resume(subscription, session.id, 1)
+
+    assert subscription.pending == 1
+    frame = await subscription.get()
+    assert frame.seq == 2
+    assert '"status":"stopped"' in frame.text
+
+
+async def test_resume_sends_snapshot_when_behind(message_bus: MessageBus, session: Session) -> None:
+    subscription = Subscription(session.id)
+    message_id = uuid4()
+    part_id = uuid4()
+
+    async with BroadcastHub(message_bus, buffer_size=2) as hub:
+        message_bus.publish(ResponseStartedMessage(session_id=session.id))
+        for word in ["You ", "wake ", "up."]:
+            message_bus.publish(
+                StreamPartDeltaMessage(session.id, message_id, part_id, ContentDelta(word))
+            )
+        with hub.subscribe(subscription):
+            hub.resume(subscription, session.id, 1)
+
+    frame = await subscription.get()
+    snapshot = WebSocketStreamSnapshotMessage.model_validate_json(frame.text)
+    assert snapshot.seq == 4
+    assert snapshot.status == "started"
+    assert [delta.delta for delta in snapshot.deltas] == [ContentDelta("You wake up.")]
+
+
+async def test_resume_replaces_queued_frames(
+    hub: BroadcastHub, message_bus: MessageBus, session: Session
+) -> None:
+    subscription = Subscription()
+    other_id = uuid4()
+
+    with hub.subscribe(subscription):
+        message_bus.publish(ResponseStartedMessage(session_id=session.id))
+        message_bus.publish(ResponseStartedMessage(session_id=other_id))
+        message_bus.publish(ResponseStoppedMessage(session_id=session.id))
+        hub.resume(subscription, session.id, 0)
+
+    frames = [await subscription.get() for _ in range(subscription.pending)]
+    assert [(frame.session_id, frame.seq) for frame in frames] == [
+        (session.id, 1),
+        (session.id, 2),
+        (other_id, 1),
+    ]
+
+
+def test_session_stream_assigns_handles(session: Session) -> None:
+    stream = SessionStream(session.id)
+    message_id = uuid4()
+    part = TextPart(id=uuid4(), timestamp=datetime.now(UTC), content="")
+
+    stream.append(
+        WebSocketStreamMessageMessage(
+            session_id=session.id,
+            message=ModelResponse(id=message_id, parts=[], timestamp=datetime.now(UTC)),
+        )
+    )
+    stream.append(
+        WebSocketStreamPartMessage(session_id=session.id, message_id=message_id, part=part)
+    )
+    frame = stream.append(
+        WebSocketStreamPartDeltaMessage(
+            session_id=session.id, message_id=message_id, part_id=part.id, delta=ContentDelta("Hi")
+        )
+    )
+
+    assert frame.handles == {message_id: 1, part.id: 2}
+    data = msgpack.unpackb(frame.data)
+    assert data == {
+        "session_id": session.id.bytes,
+        "seq": 3,
+        "kind": "stream_part_delta",
+        "message_id": 1,
+        "part_id": 2,
+        "delta": {"content": "Hi", "kind": "content"},
+    }
+
+
+async def test_late_subscriber_gets_ids_without_handles(
+    hub: BroadcastHub, session: Session
+) -> None:
+    message_id = uuid4()
+    part = TextPart(id=uuid4(), timestamp=datetime.now(UTC), content="")
+    early = Subscription(session.id)
+    late = Subscription(session.id)
+
+    with hub.subscribe(early):
+        hub.broadcast(
+            session.id,
+            lambda: WebSocketStreamMessageMessage(
+                session_id=session.id,
+                message=ModelResponse(id=message_id, parts=[], timestamp=datetime.now(UTC)),
+            ),
+        )
+        hub.broadcast(
+            session.id,
+            lambda: WebSocketStreamPartMessage(
+                session_id=session.id, message_id=message_id, part=part
+            ),
+        )
+        # Joins mid-response, without resuming
+        with hub.subscribe(late):
+            hub.broadcast(
+                session.id,
+                lambda: WebSocketStreamPartDeltaMessage(
+                    session_id=session.id,
+                    message_id=message_id,
+                    part_id=part.id,
+                    delta=ContentDelta("Hi"),
+                ),
+            )
+
+    early_data = [msgpack.unpackb(early.get_data(await early.get())) for _ in range(3)]
+    late_data = msgpack.unpackb(late.get_data(await late.get()))
+
+    assert (early_data[0]["message"]["handle"], early_data[1]["part"]["handle"]) == (1, 2)
+    assert (early_data[2]["message_id"], early_data[2]["part_id"]) == (1, 2)
+    assert (late_data["message_id"], late_data["part_id"]) == (message_id.bytes, part.id.bytes)
@@ -1,9 +1,11 @@
 from collections.abc import Callable
 
+import msgpack
 from fastapi.testclient import TestClient
 
 from llm_gamebook.db.models import Session
 from llm_gamebook.web.schemas.websocket.message import WebSocketPingMessage
+from llm_gamebook.web.websocket.binary import BINARY_SUBPROTOCOL
 
 
 async def test_websocket_endpoint_connection(
@@ -34,3 +36,31 @@ async def test_websocket_endpoint_handles_messages(
         assert response["kind"] == "pong"
 
         websocket.send_text('{"kind": "invalid"}')
+
+
+async def test_spectator_endpoint_connection(
+    client: TestClient,
+    session: Session,
+    unused_tcp_port_factory: Callable[[], int],
+) -> None:
+    port = unused_tcp_port_factory()
+    url = f"ws://testclient:{port}/ws/spectate/{session.id}"
+
+    with client.websocket_connect(url) as websocket:
+        websocket.send_text(WebSocketPingMessage(kind="ping").model_dump_json())
+        received = websocket.receive_json()
+        assert received.get("kind") == "pong"
+
+
+async def test_websocket_endpoint_binary(
+    client: TestClient,
+    session: Session,
+    unused_tcp_port_factory: Callable[[], int],
+) -> None:
+    port = unused_tcp_port_factory()
+    url = f"ws://testclient:{port}/ws"
+
+    with client.websocket_connect(url, subprotocols=[BINARY_SUBPROTOCOL]) as websocket:
+        assert websocket.accepted_subprotocol == BINARY_SUBPROTOCOL
+        websocket.send_text(WebSocketPingMessage(kind="ping").model_dump_json())
+        assert msgpack.unpackb(websocket.receive_bytes()) == {"kind": "pong"}
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import socket
+from typing import Annotated
+
+import typer
+
+from llm_gamebook.logger import setup_logger
+
+from .broadcast import benchmark_broadcast, format_broadcast_results
+from .encoding import benchmark_encoding, format_encoding_results
+from .harness import LoadOptions, run_load
+from .keys import benchmark_keys, format_keys_results
+from .listing import benchmark_listing, format_listing_results
+
+app = typer.Typer()
+
+
+@app.command()
+def main(  # noqa: PLR0913
+    *,
+    players: Annotated[int, typer.Option(help="Number of concurrent players.")] = 10,
+    turns: Annotated[int, typer.Option(help="User requests per player.")] = 3,
+    tokens_per_second: Annotated[float, typer.Option(help="Output rate of the fake model.")] = 50.0,
+    first_token_delay: Annotated[
+        float, typer.Option(help="Fake model latency before the first token.")
+    ] = 0.2,
+    think_time: Annotated[float, typer.Option(help="Pause between turns of a player.")] = 0.0,
+    timeout: Annotated[float, typer.Option(help="Maximum duration of a turn.")] = 60.0,
+    max_in_flight: Annotated[
+        int | None, typer.Option(help="Concurrent model request limit.")
+    ] = None,
+    port: Annotated[int, typer.Option(help="The port to serve on, 0 picks a free one.")] = 0,
+    debug: Annotated[bool, typer.Option(help="Enable application logging.")] = False,
+) -> None:
+    """Drive the web app with concurrent players and a scripted fake model."""
+    setup_logger("web", logging.DEBUG if debug else logging.WARNING)
+
+    options = LoadOptions(
+        players=players,
+        turns=turns,
+        tokens_per_second=tokens_per_second,
+        first_token_delay=first_token_delay,
+        think_time=think_time,
+        timeout=timeout,
+        max_in_flight=max_in_flight,
+    )
+    report = asyncio.run(run_load(options, port or _get_free_port()))
+    typer.echo(report.format())
+
+
+@app.command()
+def broadcast(
+    *,
+    viewers: Annotated[
+        list[int] | None, typer.Option(help="Viewer counts to measure, repeatable.")
+    ] = None,
+    deltas: Annotated[int, typer.Option(help="Streamed deltas per measurement.")] = 2000,
+) -> None:
+    """Measure the CPU cost per streamed delta of the websocket broadcast hub."""
+
+    async def run() -> None:
+        results = [await benchmark_broadcast(count, deltas) for count in viewers or [1, 10, 100]]
+        typer.echo(format_broadcast_results(results))
+
+    asyncio.run(run())
+
+
+@app.command()
+def encoding(
+    *,
+    repeat: Annotated[int, typer.Option(help="Repetitions of the scripted response.")] = 20,
+) -> None:
+    """Compare bytes on the wire and encode CPU of the JSON and MessagePack frames."""
+    typer.echo(format_encoding_results(benchmark_encoding(repeat)))
+
+
+@app.command()
+def listing(
+    *,
+    sessions: Annotated[int, typer.Option(help="Number of sessions in the database.")] = 10_000,
+    messages: Annotated[int, typer.Option(help="Messages per session.")] = 4,
+    limit: Annotated[int, typer.Option(help="Page size of the list requests.")] = 100,
+    repeat: Annotated[int, typer.Option(help="Requests per measurement.")] = 5,
+) -> None:
+    """Compare the list endpoints loading entities with the projected column queries."""
+    results = asyncio.run(benchmark_listing(sessions, messages, limit, repeat))
+    typer.echo(format_listing_results(results))
+
+
+@app.command()
+def keys(
+    *,
+    sessions: Annotated[int, typer.Option(help="Number of sessions playing.")] = 100,
+    turns: Annotated[int, typer.Option(help="Turns stored per session.")] = 100,
+) -> None:
+    """Compare storing turns with random and time-ordered message and part keys."""
+    typer.echo(format_keys_results(asyncio.run(benchmark_keys(sessions, turns))))
+
+
+def _get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+if __name__ == "__main__":
+    app()
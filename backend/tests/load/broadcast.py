@@ -0,0 +1,77 @@
+import time
+from collections.abc import Sequence
+from contextlib import ExitStack
+from dataclasses import dataclass
+from uuid import uuid4
+
+from llm_gamebook.engine.message import ContentDelta, StreamPartDeltaMessage
+from llm_gamebook.message_bus import MessageBus
+from llm_gamebook.web.schemas.websocket.message import WebSocketStreamPartDeltaMessage
+from llm_gamebook.web.websocket.hub import BroadcastHub, Subscription
+
+
+@dataclass(frozen=True)
+class BroadcastResult:
+    viewers: int
+    deltas: int
+    hub_cpu_seconds: float
+    """Encoding each delta once in the hub and queuing it for every viewer."""
+
+    per_viewer_cpu_seconds: float
+    """Converting and encoding each delta in a bus handler per viewer, as before the hub."""
+
+    @property
+    def speedup(self) -> float:
+        return self.per_viewer_cpu_seconds / max(self.hub_cpu_seconds, 1e-9)
+
+    def format(self) -> str:
+        hub_us = self.hub_cpu_seconds / self.deltas * 1e6
+        per_viewer_us = self.per_viewer_cpu_seconds / self.deltas * 1e6
+        return (
+            f"{self.viewers:>7}  {hub_us:>10.1f}us  {per_viewer_us:>10.1f}us  {self.speedup:>6.1f}x"
+        )
+
+
+def format_broadcast_results(results: Sequence[BroadcastResult]) -> str:
+    header = f"{'viewers':>7}  {'hub':>12}  {'per viewer':>12}  {'speedup':>7}"
+    return "\n".join([
+        "CPU per delta, excluding the socket writes:",
+        header,
+        *(result.format() for result in results),
+    ])
+
+
+async def benchmark_broadcast(viewers: int, deltas: int = 1000) -> BroadcastResult:
+    """Measure the CPU time of fanning out streamed deltas of one session to `viewers`."""
+    session_id = uuid4()
+    message = StreamPartDeltaMessage(session_id, uuid4(), uuid4(), ContentDelta("word "))
+
+    async with MessageBus() as bus, BroadcastHub(bus) as hub:
+        subscriptions = [Subscription(session_id) for _ in range(viewers)]
+        with ExitStack() as stack:
+            for subscription in subscriptions:
+                stack.enter_context(hub.subscribe(subscription))
+
+            start = time.process_time()
+            for _ in range(deltas):
+                bus.publish(message)
+                for subscription in subscriptions:
+                    await subscription.get()
+            hub_cpu_seconds = time.process_time() - start
+
+    async with MessageBus() as bus:
+        sent: list[str] = []
+
+        async def send(message: StreamPartDeltaMessage) -> None:
+            sent.append(WebSocketStreamPartDeltaMessage.from_message(message).model_dump_json())
+
+        for _ in range(viewers):
+            bus.subscribe(StreamPartDeltaMessage, send)
+
+        start = time.process_time()
+        for _ in range(deltas):
+            bus.publish(message)
+            await bus.wait_all()
+        per_viewer_cpu_seconds = time.process_time() - start
+
+    return BroadcastResult(viewers, deltas, hub_cpu_seconds, per_viewer_cpu_seconds)
@@ -0,0 +1,111 @@
+import time
+import zlib
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from llm_gamebook.engine.message import ContentDelta
+from llm_gamebook.web.schemas.session.message import ModelResponse
+from llm_gamebook.web.schemas.session.part import TextPart
+from llm_gamebook.web.schemas.websocket.message import (
+    WebSocketStreamMessageMessage,
+    WebSocketStreamPartDeltaMessage,
+    WebSocketStreamPartMessage,
+    WebSocketStreamStatusMessage,
+)
+from llm_gamebook.web.websocket.hub import Frame, SessionMessage, SessionStream
+
+from .model import SCRIPT, split_tokens
+
+
+@dataclass(frozen=True)
+class EncodingResult:
+    encoding: str
+    frames: int
+    payload_bytes: int
+    """Size of the frame payloads."""
+
+    deflate_bytes: int
+    """Size after permessage-deflate with context takeover, as negotiated by default."""
+
+    cpu_seconds: float
+    """Encoding all frames, excluding the compression."""
+
+    def format(self) -> str:
+        frames = max(self.frames, 1)
+        return (
+            f"{self.encoding:<8} {self.payload_bytes / frames:>9.1f}B "
+            f"{self.deflate_bytes / frames:>9.1f}B {self.cpu_seconds / frames * 1e6:>9.1f}us"
+        )
+
+
+def format_encoding_results(results: Sequence[EncodingResult]) -> str:
+    header = f"{'encoding':<8} {'payload':>10} {'deflated':>10} {'CPU':>11}"
+    return "\n".join([
+        "Per frame of a streamed response:",
+        header,
+        *map(EncodingResult.format, results),
+    ])
+
+
+def create_stream_messages(repeat: int = 1) -> list[SessionMessage]:
+    """Server messages of a streamed response, one delta per token of the repeated script."""
+    session_id = uuid4()
+    message_id = uuid4()
+    now = datetime.now(UTC)
+    part = TextPart(id=uuid4(), timestamp=now, content="")
+    return [
+        WebSocketStreamStatusMessage(session_id=session_id, status="started"),
+        WebSocketStreamMessageMessage(
+            session_id=session_id,
+            message=ModelResponse(id=message_id, parts=[], timestamp=now, model_name="bench"),
+        ),
+        WebSocketStreamPartMessage(session_id=session_id, message_id=message_id, part=part),
+        *(
+            WebSocketStreamPartDeltaMessage(
+                session_id=session_id,
+                message_id=message_id,
+                part_id=part.id,
+                delta=ContentDelta(token),
+            )
+            for token in split_tokens(" ".join(SCRIPT)) * repeat
+        ),
+        WebSocketStreamStatusMessage(session_id=session_id, status="stopped"),
+    ]
+
+
+def benchmark_encoding(repeat: int = 20) -> list[EncodingResult]:
+    """Compare the JSON and MessagePack encodings of a streamed response."""
+    encoders: dict[str, Callable[[Frame], bytes]] = {
+        "json": lambda frame: frame.text.encode(),
+        "msgpack": lambda frame: frame.data,
+    }
+    results = []
+    for encoding, encode in encoders.items():
+        stream = SessionStream(uuid4(), maxlen=1)
+        frames = [stream.append(message) for message in create_stream_messages(repeat)]
+
+        start = time.process_time()
+        payloads = [encode(frame) for frame in frames]
+        cpu_seconds = time.process_time() - start
+
+        results.append(
+            EncodingResult(
+                encoding=encoding,
+                frames=len(frames),
+                payload_bytes=sum(map(len, payloads)),
+                deflate_bytes=_get_deflate_size(payloads),
+                cpu_seconds=cpu_seconds,
+            )
+        )
+    return results
+
+
+def _get_deflate_size(payloads: Sequence[bytes]) -> int:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    # permessage-deflate strips the trailing empty block of each message
+    return sum(
+        len(compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+        for payload in payloads
+    )
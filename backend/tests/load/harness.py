@@ -0,0 +1,253 @@
+import asyncio
+import math
+import resource
+import time
+from collections.abc import AsyncGenerator, Sequence
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Final
+from uuid import UUID
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from pydantic_ai.models import Model
+from starlette.types import Lifespan
+from websockets.asyncio.client import connect
+
+from llm_gamebook.db import create_async_db_engine
+from llm_gamebook.engine import EngineManager
+from llm_gamebook.engine.scheduler import RateLimits, RequestScheduler
+from llm_gamebook.message_bus import MessageBus
+from llm_gamebook.providers import ModelProvider
+from llm_gamebook.story.project_manager import ProjectManager
+from llm_gamebook.web.app import create_app
+from llm_gamebook.web.schemas.model_config import ModelConfigCreate
+from llm_gamebook.web.websocket.hub import BroadcastHub
+
+from .model import SCRIPT, PacedMockModel
+from .player import LoadPlayer, TurnResult
+
+HOST: Final = "127.0.0.1"
+PROJECT_ID: Final = "llm-gamebook/broken-bulb"
+
+
+@dataclass(frozen=True)
+class LoadOptions:
+    players: int = 10
+    """Number of concurrent players, each with its own session and websocket connection."""
+
+    turns: int = 3
+    """User requests per player, after the introduction."""
+
+    tokens_per_second: float = 50.0
+    """Output rate of the fake model."""
+
+    first_token_delay: float = 0.2
+    """Latency of the fake model before the first token."""
+
+    think_time: float = 0.0
+    """Pause between turns of a player."""
+
+    timeout: float = 60.0
+    """Maximum duration of a turn."""
+
+    max_in_flight: int | None = None
+    """Concurrent model request limit of the scheduler, `None` for no limit."""
+
+
+@dataclass
+class LoadReport:
+    players: int
+    turns: list[TurnResult] = field(default_factory=list)
+    dropped_frames: int = 0
+    """Turns whose streamed frames didn't reassemble into the scripted response."""
+
+    frames: int = 0
+    """Websocket frames received by all players."""
+
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_growth_kib: int = 0
+    """Growth of the peak resident set size of the process, server and clients combined."""
+
+    @property
+    def timeouts(self) -> int:
+        return sum(1 for turn in self.turns if turn.latency is None)
+
+    @property
+    def errors(self) -> int:
+        return sum(1 for turn in self.turns if turn.error)
+
+    def format(self) -> str:
+        ttft = [turn.ttft for turn in self.turns if turn.ttft is not None]
+        latency = [turn.latency for turn in self.turns if turn.latency is not None]
+        players = max(self.players, 1)
+        cpu = self.cpu_seconds
+        rss_mib = self.peak_rss_growth_kib / 1024
+
+        return "\n".join([
+            f"players          {self.players}",
+            f"turns            {len(self.turns)} ({self.timeouts} timed out, {self.errors} errors)",
+            f"dropped frames   {self.dropped_frames} turns",
+            f"frames received  {self.frames} ({self.frames / players:.1f} per player)",
+            f"TTFT             {_format_percentiles(ttft)}",
+            f"turn latency     {_format_percentiles(latency)}",
+            f"CPU              {cpu:.2f}s ({cpu / players:.3f}s per player)",
+            f"peak RSS growth  {rss_mib:.1f} MiB ({rss_mib / players:.2f} MiB per player)",
+            f"wall time        {self.wall_seconds:.1f}s",
+        ])
+
+
+def get_percentile(values: Sequence[float], percent: float) -> float | None:
+    """Nearest-rank percentile, `None` without values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+async def run_load(options: LoadOptions, port: int) -> LoadReport:
+    """Serve the app on `port` and let concurrent players talk to it."""
+    with TemporaryDirectory() as tmp:
+        app = create_app(lifespan=_create_lifespan(Path(tmp), options))
+        server = uvicorn.Server(uvicorn.Config(app, host=HOST, port=port, log_level="warning"))
+        serve_task = asyncio.create_task(server.serve())
+        try:
+            while not server.started:
+                if serve_task.done():
+                    serve_task.result()  # raises the start-up error
+                    msg = "Server stopped during start-up"
+                    raise RuntimeError(msg)
+                await asyncio.sleep(0.01)
+            return await _drive(options, f"{HOST}:{port}")
+        finally:
+            server.should_exit = True
+            await serve_task
+
+
+def _create_lifespan(data_path: Path, options: LoadOptions) -> Lifespan[FastAPI]:
+    def model_factory(*_: object) -> Model:
+        return PacedMockModel(
+            tokens_per_second=options.tokens_per_second,
+            first_token_delay=options.first_token_delay,
+        )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+        async with (
+            create_async_db_engine(data_path / "load.db") as db_engine,
+            MessageBus() as bus,
+            EngineManager(
+                bus,
+                scheduler=RequestScheduler(
+                    bus, {}, RateLimits(max_in_flight=options.max_in_flight)
+                ),
+                model_factory=model_factory,
+            ) as engine_mgr,
+            BroadcastHub(bus) as hub,
+        ):
+            app.state.db_engine = db_engine
+            app.state.bus = bus
+            app.state.engine_mgr = engine_mgr
+            app.state.hub = hub
+            app.state.project_mgr = ProjectManager(local_projects_path=data_path)
+            yield
+
+    return lifespan
+
+
+async def _drive(options: LoadOptions, address: str) -> LoadReport:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=f"http://{address}", limits=limits, timeout=options.timeout
+    ) as http:
+        session_ids = await _create_sessions(http, options.players)
+
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        wall_start = time.perf_counter()
+
+        async with AsyncExitStack() as stack:
+            players: list[LoadPlayer] = []
+            for session_id in session_ids:
+                ws = await stack.enter_async_context(connect(f"ws://{address}/ws", max_size=None))
+                players.append(LoadPlayer(session_id, http, ws, options.timeout))
+
+            receivers = [asyncio.create_task(player.receive()) for player in players]
+            try:
+                results = await asyncio.gather(*(_play(player, options) for player in players))
+            finally:
+                for receiver in receivers:
+                    receiver.cancel()
+                await asyncio.gather(*receivers, return_exceptions=True)
+
+        wall_seconds = time.perf_counter() - wall_start
+        usage_end = resource.getrusage(resource.RUSAGE_SELF)
+
+    report = LoadReport(
+        players=options.players,
+        frames=sum(player.frames for player in players),
+        wall_seconds=wall_seconds,
+        cpu_seconds=(
+            usage_end.ru_utime + usage_end.ru_stime - usage_start.ru_utime - usage_start.ru_stime
+        ),
+        peak_rss_growth_kib=usage_end.ru_maxrss - usage_start.ru_maxrss,
+    )
+    for turns in results:
+        for number, turn in enumerate(turns, start=1):
+            report.turns.append(turn)
+            # The introduction is the first response of each session
+            if turn.latency is not None and turn.text != SCRIPT[number % len(SCRIPT)]:
+                report.dropped_frames += 1
+
+    return report
+
+
+async def _create_sessions(http: httpx.AsyncClient, count: int) -> list[UUID]:
+    config_in = ModelConfigCreate(
+        name="Load test",
+        provider=ModelProvider.OPENAI_COMPATIBLE,
+        model_name="paced-mock",
+        context_window=32768,
+        max_tokens=1024,
+        temperature=0.7,
+        top_p=1.0,
+        presence_penalty=0.0,
+        frequency_penalty=0.0,
+    )
+    response = await http.post("/api/model-configs/", json=config_in.model_dump(mode="json"))
+    response.raise_for_status()
+    config_id = response.json()["id"]
+
+    session_ids: list[UUID] = []
+    for i in range(count):
+        session_in = {"title": f"Player {i}", "config_id": config_id, "project_id": PROJECT_ID}
+        response = await http.post("/api/sessions/", json=session_in)
+        response.raise_for_status()
+        session_ids.append(UUID(response.json()["id"]))
+
+    return session_ids
+
+
+async def _play(player: LoadPlayer, options: LoadOptions) -> list[TurnResult]:
+    intro = await player.start()
+    if intro.latency is None:
+        # Report the stuck introduction as a timed out turn
+        return [intro]
+
+    results: list[TurnResult] = []
+    for number in range(1, options.turns + 1):
+        await asyncio.sleep(options.think_time)
+        results.append(await player.play_turn(f"Look around ({number})"))
+    return results
+
+
+def _format_percentiles(values: Sequence[float]) -> str:
+    if not values:
+        return "-"
+    return "  ".join(
+        f"p{percent} {get_percentile(values, percent):.3f}s" for percent in (50, 95, 99)
+    )
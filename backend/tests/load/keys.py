@@ -0,0 +1,103 @@
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from uuid import UUID, uuid4
+
+from llm_gamebook.db import create_async_db_engine, create_db_session_factory
+from llm_gamebook.db.crud.message import create_messages
+from llm_gamebook.db.models import Message, Part, Session
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.db.models.part import PartKind
+from llm_gamebook.utils import uuid7
+
+KEY_FACTORIES: dict[str, Callable[[], UUID]] = {"uuid4": uuid4, "uuid7": uuid7}
+"""Primary keys of messages and parts, random as before and time-ordered."""
+
+
+@dataclass(frozen=True)
+class KeysResult:
+    keys: str
+    messages: int
+    seconds: float
+    """Duration of storing all turns, one transaction per turn like the engine."""
+
+    database_bytes: int
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+    def format(self) -> str:
+        return (
+            f"{self.keys:<6} {self.messages:>8} {self.messages_per_second:>10.0f}/s"
+            f" {self.database_bytes / 1024:>10.0f}KiB"
+        )
+
+
+def format_keys_results(results: Sequence[KeysResult]) -> str:
+    header = f"{'keys':<6} {'messages':>8} {'throughput':>12} {'db size':>13}"
+    return "\n".join([header, *map(KeysResult.format, results)])
+
+
+def create_turn(session_id: UUID, new_id: Callable[[], UUID]) -> list[Message]:
+    """A request and a response with a part each, keyed by `new_id`."""
+    return [
+        Message(
+            id=new_id(),
+            kind=kind,
+            session_id=session_id,
+            parts=[
+                Part(
+                    id=new_id(),
+                    kind=part_kind,
+                    content="You wake up in a dark room. " * 4,
+                    tool_name=None,
+                    tool_call_id=None,
+                    args=None,
+                )
+            ],
+        )
+        for kind, part_kind in (
+            (MessageKind.REQUEST, PartKind.USER_PROMPT),
+            (MessageKind.RESPONSE, PartKind.TEXT),
+        )
+    ]
+
+
+async def benchmark_keys(sessions: int = 100, turns_per_session: int = 100) -> list[KeysResult]:
+    """Compare storing turns with random and with time-ordered primary keys."""
+    return [
+        await _measure(keys, new_id, sessions, turns_per_session)
+        for keys, new_id in KEY_FACTORIES.items()
+    ]
+
+
+async def _measure(
+    keys: str, new_id: Callable[[], UUID], sessions: int, turns_per_session: int
+) -> KeysResult:
+    with TemporaryDirectory(prefix="llm-gamebook-keys-") as tmp:
+        async with create_async_db_engine(Path(tmp) / "keys.db") as db_engine:
+            db_sessions = create_db_session_factory(db_engine)
+            async with db_sessions() as db_session:
+                session_ids = [uuid4() for _ in range(sessions)]
+                db_session.add_all(
+                    Session(id=session_id, title=None, project_id="llm-gamebook/broken-bulb")
+                    for session_id in session_ids
+                )
+                await db_session.commit()
+
+                # The sessions take turns, like concurrent players
+                start = time.perf_counter()
+                for _ in range(turns_per_session):
+                    for session_id in session_ids:
+                        await create_messages(db_session, create_turn(session_id, new_id))
+                        db_session.expunge_all()
+                seconds = time.perf_counter() - start
+
+                conn = await db_session.connection()
+                page_count = (await conn.exec_driver_sql("PRAGMA page_count")).scalar_one()
+                page_size = (await conn.exec_driver_sql("PRAGMA page_size")).scalar_one()
+
+    return KeysResult(keys, sessions * turns_per_session * 2, seconds, page_count * page_size)
@@ -0,0 +1,177 @@
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession as AsyncDbSession
+
+from llm_gamebook.db import DbSessionFactory, create_async_db_engine, create_db_session_factory
+from llm_gamebook.db.crud.model_config import (
+    get_model_config_count,
+    get_model_config_list,
+    get_model_configs,
+)
+from llm_gamebook.db.crud.session import get_session_count, get_session_list, get_sessions
+from llm_gamebook.db.models import Message, ModelConfig, Session
+from llm_gamebook.db.models.message import MessageKind
+from llm_gamebook.providers import ModelProvider
+from llm_gamebook.web.api.model_config_router import model_config_list_adapter
+from llm_gamebook.web.api.session_router import session_list_adapter
+from llm_gamebook.web.schemas.model_config import ModelConfig as ModelConfigSchema
+from llm_gamebook.web.schemas.model_config import ModelConfigs
+from llm_gamebook.web.schemas.session import Session as SessionSchema
+from llm_gamebook.web.schemas.session import Sessions
+
+type ListPage = Callable[[AsyncDbSession, int], Awaitable[Sessions | ModelConfigs]]
+
+
+@dataclass(frozen=True)
+class ListingResult:
+    endpoint: str
+    query: str
+    """`entities` loads ORM objects, `projection` selects the schema columns only."""
+
+    rows: int
+    seconds: float
+    """Mean duration of listing a page, including the validation into the response schema."""
+
+    def format(self) -> str:
+        return f"{self.endpoint:<14} {self.query:<11} {self.rows:>6} {self.seconds * 1000:>10.1f}ms"
+
+
+def format_listing_results(results: Sequence[ListingResult]) -> str:
+    header = f"{'endpoint':<14} {'query':<11} {'rows':>6} {'duration':>12}"
+    return "\n".join([header, *map(ListingResult.format, results)])
+
+
+async def list_sessions_entities(db_session: AsyncDbSession, limit: int) -> Sessions:
+    sessions = await get_sessions(db_session, None, 0, limit)
+    return Sessions(
+        data=[SessionSchema.model_validate(s, from_attributes=True) for s in sessions],
+        count=await get_session_count(db_session, None),
+    )
+
+
+async def list_sessions_projection(db_session: AsyncDbSession, limit: int) -> Sessions:
+    rows, count = await get_session_list(db_session, None, 0, limit)
+    return Sessions(
+        data=session_list_adapter.validate_python(rows, from_attributes=True), count=count
+    )
+
+
+async def list_model_configs_entities(db_session: AsyncDbSession, limit: int) -> ModelConfigs:
+    configs = await get_model_configs(db_session, 0, limit)
+    return ModelConfigs(
+        data=[ModelConfigSchema.model_validate(c, from_attributes=True) for c in configs],
+        count=await get_model_config_count(db_session),
+    )
+
+
+async def list_model_configs_projection(db_session: AsyncDbSession, limit: int) -> ModelConfigs:
+    rows, count = await get_model_config_list(db_session, 0, limit)
+    return ModelConfigs(
+        data=model_config_list_adapter.validate_python(rows, from_attributes=True), count=count
+    )
+
+
+LIST_PAGES: dict[str, dict[str, ListPage]] = {
+    "sessions": {"entities": list_sessions_entities, "projection": list_sessions_projection},
+    "model-configs": {
+        "entities": list_model_configs_entities,
+        "projection": list_model_configs_projection,
+    },
+}
+"""The list endpoints, as before and after selecting columns only."""
+
+
+async def seed_sessions(db_engine: AsyncEngine, sessions: int, messages_per_session: int) -> None:
+    """Bulk insert sessions with messages, all using the same model config."""
+    db_sessions = create_db_session_factory(db_engine)
+    async with db_sessions() as db_session:
+        config = ModelConfig(
+            name="Benchmark",
+            provider=ModelProvider.OPENAI_COMPATIBLE,
+            model_name="bench",
+            context_window=8192,
+            max_tokens=1024,
+            temperature=0.7,
+            top_p=0.9,
+            presence_penalty=0.0,
+            frequency_penalty=0.0,
+        )
+        db_session.add(config)
+        await db_session.commit()
+
+        start = datetime.now(UTC) - timedelta(days=1)
+        session_ids = [uuid4() for _ in range(sessions)]
+        await db_session.exec(
+            insert(Session),
+            params=[
+                {
+                    "id": session_id,
+                    "title": f"Session {number}",
+                    "project_id": "llm-gamebook/broken-bulb",
+                    "config_id": config.id,
+                    "hedge_after_seconds": 5.0,
+                    "timestamp": start + timedelta(seconds=number),
+                    "message_count": messages_per_session,
+                    "last_message_at": start if messages_per_session else None,
+                }
+                for number, session_id in enumerate(session_ids)
+            ],
+        )
+        await db_session.exec(
+            insert(Message),
+            params=[
+                {
+                    "id": uuid4(),
+                    "session_id": session_id,
+                    "kind": MessageKind.REQUEST if number % 2 == 0 else MessageKind.RESPONSE,
+                    "timestamp": start,
+                    "finish_reason": None,
+                }
+                for session_id in session_ids
+                for number in range(messages_per_session)
+            ],
+        )
+        await db_session.commit()
+
+
+async def benchmark_listing(
+    sessions: int = 10_000, messages_per_session: int = 4, limit: int = 100, repeat: int = 5
+) -> list[ListingResult]:
+    """Compare listing entities and listing projected columns against a seeded database."""
+    with TemporaryDirectory(prefix="llm-gamebook-listing-") as tmp:
+        async with create_async_db_engine(Path(tmp) / "listing.db") as db_engine:
+            await seed_sessions(db_engine, sessions, messages_per_session)
+            db_sessions = create_db_session_factory(db_engine)
+            return [
+                await _measure(db_sessions, endpoint, query, list_page, limit, repeat)
+                for endpoint, pages in LIST_PAGES.items()
+                for query, list_page in pages.items()
+            ]
+
+
+async def _measure(
+    db_sessions: DbSessionFactory,
+    endpoint: str,
+    query: str,
+    list_page: ListPage,
+    limit: int,
+    repeat: int,
+) -> ListingResult:
+    durations = []
+    rows = 0
+    for _ in range(repeat):
+        # A fresh session per request, like the endpoints
+        async with db_sessions() as db_session:
+            start = time.perf_counter()
+            page = await list_page(db_session, limit)
+            durations.append(time.perf_counter() - start)
+        rows = len(page.data)
+    return ListingResult(endpoint, query, rows, sum(durations) / max(len(durations), 1))
@@ -0,0 +1,57 @@
+import asyncio
+import re
+from collections.abc import AsyncIterator, Sequence
+
+from pydantic_ai import ModelMessage, ModelResponse, TextPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall
+
+from tests.broken_bulb.mocks.model import MockModel
+
+SCRIPT = (
+    "You wake up in a dim bedroom. The light bulb above your bed flickers and goes dark.",
+    "You feel your way along the wall. Somewhere in the flat, a tap is dripping steadily.",
+    "The living room smells of stale beer. Empty bottles are scattered across the floor.",
+    "A leaflet has been pushed under the door. Someone wants to meet you tonight.",
+)
+
+
+class PacedMockModel(MockModel):
+    """Mock model streaming a repeating script word by word at a fixed token rate.
+
+    The n-th response of a model instance is `script[n % len(script)]`.
+    """
+
+    def __init__(
+        self,
+        script: Sequence[str] = SCRIPT,
+        tokens_per_second: float = 50.0,
+        first_token_delay: float = 0.0,
+    ) -> None:
+        super().__init__()
+        self._script = script
+        self._count = 0
+        self._token_delay = 1 / tokens_per_second
+        self._first_token_delay = first_token_delay
+
+    async def _stream_response_function(
+        self, messages: list[ModelMessage], info: AgentInfo
+    ) -> AsyncIterator[str | dict[int, DeltaToolCall]]:
+        if not self._response_queue:
+            self.add_responses(
+                ModelResponse([TextPart(self._script[self._count % len(self._script)])])
+            )
+            self._count += 1
+
+        await asyncio.sleep(self._first_token_delay)
+        async for chunk in super()._stream_response_function(messages, info):
+            if isinstance(chunk, str):
+                for token in split_tokens(chunk):
+                    yield token
+                    await asyncio.sleep(self._token_delay)
+            else:
+                yield chunk
+
+
+def split_tokens(text: str) -> list[str]:
+    """Split text into word-sized tokens that join back to the original text."""
+    return re.findall(r"\s*\S+\s*|\s+", text)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import httpx
+from pydantic import TypeAdapter
+from websockets.asyncio.client import ClientConnection
+
+from llm_gamebook.engine.message import ContentDelta
+from llm_gamebook.web.schemas.session.message import ModelRequestCreate
+from llm_gamebook.web.schemas.session.part import TextPart, UserPromptPartCreate
+from llm_gamebook.web.schemas.websocket.message import (
+    WebSocketErrorMessage,
+    WebSocketServerMessage,
+    WebSocketStreamPartDeltaMessage,
+    WebSocketStreamPartMessage,
+    WebSocketStreamStatusMessage,
+)
+
+server_msg_adapter = TypeAdapter[WebSocketServerMessage](WebSocketServerMessage)
+
+
+@dataclass
+class TurnResult:
+    ttft: float | None = None
+    """Seconds from submitting the request to the first text frame."""
+
+    latency: float | None = None
+    """Seconds from submitting the request to the end of the stream, `None` on timeout."""
+
+    text: str = ""
+    """The text reassembled from the streamed frames."""
+
+    error: str | None = None
+
+
+@dataclass
+class _Turn:
+    started: float = field(default_factory=time.perf_counter)
+    result: TurnResult = field(default_factory=TurnResult)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    parts: dict[UUID, str] = field(default_factory=dict)
+
+
+class LoadPlayer:
+    """Simulated player talking to the web app over REST and its own websocket connection."""
+
+    def __init__(
+        self, session_id: UUID, http: httpx.AsyncClient, ws: ClientConnection, turn_timeout: float
+    ) -> None:
+        self.session_id = session_id
+        self.frames = 0
+        self._http = http
+        self._ws = ws
+        self._turn_timeout = turn_timeout
+        self._turn: _Turn | None = None
+
+    async def receive(self) -> None:
+        """Consume websocket frames until the connection is closed."""
+        async for data in self._ws:
+            self.frames += 1
+            message = server_msg_adapter.validate_json(data)
+            if getattr(message, "session_id", None) == self.session_id and self._turn:
+                self._on_message(self._turn, message)
+
+    async def start(self) -> TurnResult:
+        """Load the session, which creates its engine and generates the introduction."""
+        self._turn = _Turn()
+        response = await self._http.get(f"/api/sessions/{self.session_id}")
+        response.raise_for_status()
+        return await self._wait(self._turn)
+
+    async def play_turn(self, content: str) -> TurnResult:
+        self._turn = _Turn()
+        message_in = ModelRequestCreate(parts=[UserPromptPartCreate(content=content)])
+        response = await self._http.post(
+            f"/api/sessions/{self.session_id}/request", json=message_in.model_dump(mode="json")
+        )
+        response.raise_for_status()
+        return await self._wait(self._turn)
+
+    async def _wait(self, turn: _Turn) -> TurnResult:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(turn.done.wait(), self._turn_timeout)
+        turn.result.text = "".join(turn.parts.values())
+        return turn.result
+
+    def _on_message(self, turn: _Turn, message: WebSocketServerMessage) -> None:
+        now = time.perf_counter() - turn.started
+
+        if isinstance(message, WebSocketStreamPartMessage) and isinstance(message.part, TextPart):
+            turn.parts[message.part.id] = message.part.content
+            if turn.result.ttft is None:
+                turn.result.ttft = now
+
+        elif isinstance(message, WebSocketStreamPartDeltaMessage):
+            if isinstance(message.delta, ContentDelta) and message.part_id in turn.parts:
+                turn.parts[message.part_id] += message.delta.content
+
+        elif isinstance(message, WebSocketErrorMessage):
+            turn.result.error = message.message
+
+        elif isinstance(message, WebSocketStreamStatusMessage) and message.status != "started":
+            turn.result.latency = now
+            turn.done.set()
@@ -0,0 +1,79 @@
+from collections.abc import Callable
+
+from .broadcast import benchmark_broadcast, format_broadcast_results
+from .encoding import benchmark_encoding, format_encoding_results
+from .harness import LoadOptions, get_percentile, run_load
+from .keys import benchmark_keys, format_keys_results
+from .listing import benchmark_listing, format_listing_results
+from .model import split_tokens
+
+
+def test_split_tokens() -> None:
+    text = "  You wake up.\nThe bulb  flickers. "
+    tokens = split_tokens(text)
+    assert "".join(tokens) == text
+    assert tokens == ["  You ", "wake ", "up.\n", "The ", "bulb  ", "flickers. "]
+
+
+def test_get_percentile() -> None:
+    values = [float(value) for value in range(1, 101)]
+    assert get_percentile(values, 50) == 50
+    assert get_percentile(values, 99) == 99
+    assert get_percentile([3.0], 95) == 3
+    assert get_percentile([], 50) is None
+
+
+async def test_run_load(unused_tcp_port_factory: Callable[[], int]) -> None:
+    options = LoadOptions(
+        players=3, turns=2, tokens_per_second=1000.0, first_token_delay=0.0, timeout=10.0
+    )
+    report = await run_load(options, unused_tcp_port_factory())
+
+    assert len(report.turns) == 6
+    assert not report.timeouts
+    assert not report.errors
+    assert not report.dropped_frames
+    assert all(turn.ttft is not None for turn in report.turns)
+    assert "players          3" in report.format()
+
+
+async def test_benchmark_broadcast() -> None:
+    result = await benchmark_broadcast(viewers=5, deltas=20)
+
+    assert result.viewers == 5
+    assert result.hub_cpu_seconds >= 0
+    assert result.per_viewer_cpu_seconds >= 0
+    assert "viewers" in format_broadcast_results([result])
+
+
+def test_benchmark_encoding() -> None:
+    json_result, msgpack_result = benchmark_encoding(repeat=2)
+
+    assert json_result.frames == msgpack_result.frames
+    assert msgpack_result.payload_bytes < json_result.payload_bytes
+    assert 0 < json_result.deflate_bytes < json_result.payload_bytes
+    assert "msgpack" in format_encoding_results([json_result, msgpack_result])
+
+
+async def test_benchmark_listing() -> None:
+    results = await benchmark_listing(sessions=30, messages_per_session=2, limit=10, repeat=1)
+
+    assert [(result.endpoint, result.query) for result in results] == [
+        ("sessions", "entities"),
+        ("sessions", "projection"),
+        ("model-configs", "entities"),
+        ("model-configs", "projection"),
+    ]
+    assert [result.rows for result in results] == [10, 10, 1, 1]
+    assert "projection" in format_listing_results(results)
+
+
+async def test_benchmark_keys() -> None:
+    results = await benchmark_keys(sessions=3, turns_per_session=2)
+
+    assert [(result.keys, result.messages) for result in results] == [
+        ("uuid4", 12),
+        ("uuid7", 12),
+    ]
+    assert all(result.database_bytes > 0 for result in results)
+    assert "uuid7" in format_keys_results(results)